@@ -0,0 +1,463 @@
+"""End-to-end-Lasttest: die App unter gunicorn gegen lokale Stand-in-Jobbörsen.
+
+Je Szenario und Rate wird ein frischer gunicorn-Prozess gestartet (Standard
+wie im Procfile: ein Sync-Worker, 30 s Timeout). Die Scraper zeigen auf
+Stand-in-Server (siehe standin.py) mit der Latenz, Fehlerquote, Sperrseiten-
+und Hänger-Quote des Szenarios; gespeichert wird in eine frische SQLite-Datei
+oder mit ``--database-url`` in Postgres.
+
+Die Last ist offen (open loop): Anfragen starten im festen Takt der Ziel-Rate,
+egal wie schnell die App antwortet - so zeigt sich, ab welcher Rate sich
+Anfragen stauen und der gunicorn-Timeout Worker abschießt. Ausgegeben werden
+je Endpunkt p50/p95/p99, Fehler- und Beispieldaten-Quote, außerdem
+Worker-Timeouts sowie CPU, Speicher und Prozesse (inkl. Chrome) des
+gunicorn-Prozessbaums.
+
+    cd backend && python -m benchmarks.loadtest --scenario fast-boards --rps 0.5,1,2
+    python -m benchmarks.loadtest --scenario slow-boards --no-browser --duration 60
+    python -m benchmarks.loadtest --scenario db-only --rps 20,50 --database-url postgresql://...
+    python -m benchmarks.loadtest --gunicorn-args "--workers 2 --threads 4" --output result.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import shlex
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .standin import CITIES, WORDS, StandInServer, synthetic_page
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Szenarien: Verhalten der Stand-in-Server und Anteil der Endpunkte an der Last
+SCENARIOS = {
+    "fast-boards": {
+        "description": "Jobbörsen antworten schnell und fehlerfrei",
+        "stub": {"latency": (0.05, 0.3)},
+        "mix": {"stepstone": 0.35, "monster": 0.35, "db": 0.3},
+    },
+    "slow-boards": {
+        "description": "Jobbörsen brauchen 2-6 s je Seite",
+        "stub": {"latency": (2.0, 6.0)},
+        "mix": {"stepstone": 0.35, "monster": 0.35, "db": 0.3},
+    },
+    "flaky-boards": {
+        "description": "20 % Serverfehler, 15 % Bot-Sperrseiten",
+        "stub": {"latency": (0.1, 1.0), "error_rate": 0.2, "block_rate": 0.15},
+        "mix": {"stepstone": 0.35, "monster": 0.35, "db": 0.3},
+    },
+    "hanging-boards": {
+        "description": "10 % der Seiten antworten erst nach 45 s",
+        "stub": {"latency": (0.1, 1.0), "hang_rate": 0.1, "hang_seconds": 45.0},
+        "mix": {"stepstone": 0.35, "monster": 0.35, "db": 0.3},
+    },
+    "db-only": {
+        "description": "Nur Datenbankabfragen",
+        "stub": {},
+        "mix": {"db": 1.0},
+    },
+}
+
+ENDPOINTS = {
+    "stepstone": "/api/stepstone",
+    "monster": "/api/monster",
+    "db": "/api/db",
+}
+
+# Jobs, mit denen die Datenbank vor dem Lauf gefüllt wird
+DEFAULT_SEED_JOBS = 5000
+
+SEED_SCRIPT = """
+import json, sys
+from src.storage import get_storage
+storage = get_storage()
+storage.bootstrap()
+jobs = json.load(sys.stdin)
+print(storage.save_jobs(jobs) or 0)
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values, fraction):
+    """Perzentil (nächster Rang) einer nicht leeren Liste"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed_jobs(env, count, rng):
+    """Füllt das Speicher-Backend der App mit synthetischen Jobs (eigener Prozess, gleiche Umgebung)"""
+    jobs = [{
+        "title": " ".join(rng.sample(WORDS, 2)) + " (m/w/d)",
+        "company": f"Seed GmbH {index % 97}",
+        "location": rng.choice(CITIES),
+        "url": f"https://example.com/seed/{index}",
+        "source": rng.choice(["stepstone", "monster"]),
+    } for index in range(count)]
+    result = subprocess.run(
+        [sys.executable, "-c", SEED_SCRIPT], cwd=BACKEND_DIR, env=env, input=json.dumps(jobs),
+        capture_output=True, text=True, timeout=600,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Seed fehlgeschlagen:\n{result.stderr[-2000:]}")
+    return int(result.stdout.strip().splitlines()[-1])
+
+
+class AppServer:
+    """gunicorn mit src.app:app als Unterprozess; wartet, bis /health antwortet"""
+
+    def __init__(self, env, gunicorn_args=(), startup_timeout=60):
+        self.env = env
+        self.port = free_port()
+        self.gunicorn_args = list(gunicorn_args)
+        self.startup_timeout = startup_timeout
+        self.log = tempfile.NamedTemporaryFile(prefix="loadtest-gunicorn-", suffix=".log", delete=False)
+        self.process = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        import urllib3
+
+        command = [
+            sys.executable, "-m", "gunicorn", "-c", "python:benchmarks.loadtest_hooks",
+            "--bind", f"127.0.0.1:{self.port}", *self.gunicorn_args, "src.app:app",
+        ]
+        self.process = subprocess.Popen(command, cwd=BACKEND_DIR, env=self.env, stdout=self.log, stderr=self.log)
+        http = urllib3.PoolManager()
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"gunicorn beendet (Exit {self.process.returncode}), Log: {self.log.name}")
+            try:
+                if http.request("GET", f"{self.url}/health", timeout=2, retries=False).status == 200:
+                    return self
+            except urllib3.exceptions.HTTPError:
+                pass
+            time.sleep(0.5)
+        self.__exit__()
+        raise RuntimeError(f"App nicht innerhalb von {self.startup_timeout}s bereit, Log: {self.log.name}")
+
+    def __exit__(self, *exc):
+        if self.process and self.process.poll() is None:
+            self.process.send_signal(signal.SIGTERM)
+            try:
+                self.process.wait(timeout=35)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.log.close()
+
+    def worker_timeouts(self):
+        """Anzahl der vom Master wegen Timeout beendeten Worker"""
+        with open(self.log.name, encoding="utf-8", errors="replace") as log:
+            return sum(1 for line in log if "WORKER TIMEOUT" in line)
+
+
+class ResourceSampler:
+    """Misst CPU, Speicher, Dateideskriptoren und Prozesse des gunicorn-Prozessbaums"""
+
+    def __init__(self, pid, interval=0.5):
+        import psutil
+
+        self.root = psutil.Process(pid)
+        self.interval = interval
+        self.cpu_seconds = {}
+        self.peak_rss = 0
+        self.peak_processes = 0
+        self.peak_chrome = 0
+        self.peak_fds = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="loadtest-sampler", daemon=True)
+
+    def _sample(self):
+        import psutil
+
+        try:
+            processes = [self.root] + self.root.children(recursive=True)
+        except psutil.Error:
+            return
+        rss = fds = chrome = 0
+        for process in processes:
+            try:
+                with process.oneshot():
+                    rss += process.memory_info().rss
+                    times = process.cpu_times()
+                    # Beendete Prozesse behalten ihren letzten Wert
+                    self.cpu_seconds[process.pid] = times.user + times.system
+                    fds += process.num_fds()
+                    if "chrom" in process.name().lower():
+                        chrome += 1
+            except psutil.Error:
+                continue
+        self.peak_rss = max(self.peak_rss, rss)
+        self.peak_fds = max(self.peak_fds, fds)
+        self.peak_processes = max(self.peak_processes, len(processes))
+        self.peak_chrome = max(self.peak_chrome, chrome)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self.started = time.monotonic()
+        self._sample()
+        self.baseline_cpu = sum(self.cpu_seconds.values())
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        wall = time.monotonic() - self.started
+        cpu = sum(self.cpu_seconds.values()) - self.baseline_cpu
+        return {
+            "cpuSeconds": round(cpu, 2),
+            "cpuPercent": round(cpu / wall * 100, 1) if wall else 0.0,
+            "peakRssMb": round(self.peak_rss / 1024 / 1024, 1),
+            "peakProcesses": self.peak_processes,
+            "peakChromeProcesses": self.peak_chrome,
+            "peakOpenFds": self.peak_fds,
+        }
+
+
+def classify(endpoint, status, body):
+    """ok, fallback (Scraper lieferte Beispieldaten) oder http_<status>"""
+    if status != 200:
+        return f"http_{status}"
+    if endpoint == "db":
+        return "ok"
+    try:
+        jobs = json.loads(body).get("jobs") or []
+    except (ValueError, AttributeError):
+        return "invalid_json"
+    fallback = not jobs or all(
+        "error_info" in job or str(job.get("source", "")).endswith("(example)") for job in jobs
+    )
+    return "fallback" if fallback else "ok"
+
+
+class LoadGenerator:
+    """Startet Anfragen im festen Takt (open loop) und sammelt Latenz und Ergebnis"""
+
+    def __init__(self, base_url, rps, duration, mix, max_in_flight=256, timeout=60.0, distinct_queries=50, seed=0):
+        import urllib3
+
+        self.base_url = base_url
+        self.rps = rps
+        self.duration = duration
+        self.endpoints = list(mix)
+        self.weights = [mix[name] for name in self.endpoints]
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.queries = [(self.rng.choice(WORDS), self.rng.choice(CITIES)) for _ in range(distinct_queries)]
+        self.http = urllib3.PoolManager(maxsize=max_in_flight, block=False)
+        self.slots = threading.BoundedSemaphore(max_in_flight)
+        self.max_in_flight = max_in_flight
+        self.results = []
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def _request(self, endpoint, path, params):
+        import urllib3
+
+        start = time.perf_counter()
+        try:
+            response = self.http.request("GET", self.base_url + path, fields=params,
+                                         timeout=urllib3.Timeout(connect=5.0, read=self.timeout), retries=False)
+            outcome = classify(endpoint, response.status, response.data)
+        except urllib3.exceptions.ReadTimeoutError:
+            outcome = "client_timeout"
+        except urllib3.exceptions.HTTPError as e:
+            # Vom Master abgeschossene Worker schließen die Verbindung ohne Antwort
+            outcome = "connection_error" if "RemoteDisconnected" in repr(e) or "reset" in repr(e).lower() \
+                else f"error_{type(e).__name__}"
+        finally:
+            self.slots.release()
+        with self._lock:
+            self.results.append((endpoint, outcome, time.perf_counter() - start))
+
+    def run(self):
+        total = max(1, int(self.rps * self.duration))
+        executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="loadtest")
+        start = time.monotonic()
+        for index in range(total):
+            delay = start + index / self.rps - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            # Mehr offene Anfragen als Slots: der Client ist gesättigt, nicht die App
+            if not self.slots.acquire(blocking=False):
+                self.skipped += 1
+                continue
+            endpoint = self.rng.choices(self.endpoints, self.weights)[0]
+            title, city = self.rng.choice(self.queries)
+            params = {"title": title, "city": city} if endpoint != "db" else {"title": title, "city": city, "limit": 20}
+            executor.submit(self._request, endpoint, ENDPOINTS[endpoint], params)
+        executor.shutdown(wait=True)
+        self.elapsed = time.monotonic() - start
+        return self.results
+
+
+def summarize(results, elapsed):
+    by_endpoint = {}
+    for endpoint, outcome, latency in results:
+        by_endpoint.setdefault(endpoint, []).append((outcome, latency))
+    summary = {}
+    for endpoint, items in sorted(by_endpoint.items()):
+        latencies = [latency for _, latency in items]
+        outcomes = {}
+        for outcome, _ in items:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        errors = sum(count for outcome, count in outcomes.items() if outcome not in ("ok", "fallback"))
+        summary[endpoint] = {
+            "requests": len(items),
+            "p50": round(percentile(latencies, 0.50), 3),
+            "p95": round(percentile(latencies, 0.95), 3),
+            "p99": round(percentile(latencies, 0.99), 3),
+            "max": round(max(latencies), 3),
+            "errorRate": round(errors / len(items), 3),
+            "fallbackRate": round(outcomes.get("fallback", 0) / len(items), 3),
+            "outcomes": outcomes,
+        }
+    completed = len(results)
+    return {"completed": completed, "throughput": round(completed / elapsed, 2) if elapsed else 0.0,
+            "endpoints": summary}
+
+
+def run_scenario(name, rps, args):
+    """Ein Szenario mit einer Rate: Stand-in-Server, gunicorn, Last, Messung"""
+    scenario = SCENARIOS[name]
+    rng = random.Random(args.seed)
+    env = dict(os.environ)
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    if args.database_url:
+        env.update({"JOBS_STORAGE": "postgres", "DATABASE_URL": args.database_url})
+    else:
+        env.update({"JOBS_STORAGE": "sqlite", "JOBS_SQLITE_PATH": os.path.join(workdir, "jobs.sqlite3")})
+    env.update({
+        "LOADTEST_HTTP_PAGES": "0" if args.browser else "1",
+        # Ohne Ergebnis-Cache misst jeder Scrape die volle Strecke
+        "SCRAPE_CACHE_TTL": env.get("SCRAPE_CACHE_TTL", "0"),
+        "TRACE_EXPORT": "",
+    })
+
+    stub = dict(scenario["stub"], seed=args.seed)
+    pages = {source: synthetic_page(source, cards=25, seed=rps_seed, filler_kb=300)
+             for rps_seed, source in enumerate(("stepstone", "monster"))}
+    with StandInServer(default_page=pages["stepstone"], **stub) as stepstone, \
+            StandInServer(default_page=pages["monster"], **stub) as monster:
+        env["STEPSTONE_BASE_URL"] = stepstone.url
+        env["MONSTER_BASE_URL"] = monster.url
+        seeded = seed_jobs(env, args.seed_jobs, rng) if args.seed_jobs and not args.database_url else 0
+
+        with AppServer(env, shlex.split(args.gunicorn_args)) as app:
+            sampler = ResourceSampler(app.process.pid).start()
+            generator = LoadGenerator(app.url, rps, args.duration, scenario["mix"],
+                                      max_in_flight=args.max_in_flight, timeout=args.client_timeout,
+                                      distinct_queries=args.distinct_queries, seed=args.seed)
+            results = generator.run()
+            resources = sampler.stop()
+            worker_timeouts = app.worker_timeouts()
+            log_path = app.log.name
+        stub_stats = {"stepstone": stepstone.stats, "monster": monster.stats}
+
+    result = summarize(results, generator.elapsed)
+    result.update({
+        "scenario": name,
+        "targetRps": rps,
+        "durationSeconds": round(generator.elapsed, 1),
+        "skippedClientSaturated": generator.skipped,
+        "workerTimeouts": worker_timeouts,
+        "resources": resources,
+        "stubs": stub_stats,
+        "seededJobs": seeded,
+        "gunicornLog": log_path,
+    })
+    return result
+
+
+def print_result(result):
+    resources = result["resources"]
+    print(
+        f"\n== {result['scenario']} @ {result['targetRps']} rps, {result['durationSeconds']}s: "
+        f"{result['completed']} fertig ({result['throughput']}/s), "
+        f"Worker-Timeouts {result['workerTimeouts']}, Client gesättigt {result['skippedClientSaturated']}"
+    )
+    print(
+        f"   CPU {resources['cpuPercent']}% ({resources['cpuSeconds']}s), RSS max {resources['peakRssMb']} MB, "
+        f"Prozesse max {resources['peakProcesses']} (Chrome {resources['peakChromeProcesses']}), "
+        f"FDs max {resources['peakOpenFds']}"
+    )
+    print(f"   {'Endpunkt':<10} {'Anz.':>5} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'max s':>7} {'Fehler':>7} {'Beisp.':>7}  Ergebnisse")
+    for endpoint, stats in result["endpoints"].items():
+        outcomes = ", ".join(f"{key}={value}" for key, value in sorted(stats["outcomes"].items()))
+        print(
+            f"   {endpoint:<10} {stats['requests']:>5} {stats['p50']:>7.2f} {stats['p95']:>7.2f} "
+            f"{stats['p99']:>7.2f} {stats['max']:>7.2f} {stats['errorRate']:>7.1%} {stats['fallbackRate']:>7.1%}  {outcomes}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lasttest der App gegen Stand-in-Jobbörsen")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Szenario (mehrfach möglich, Standard: alle)")
+    parser.add_argument("--rps", default="1", help="Ziel-Raten, kommagetrennt (z.B. 0.5,1,2,4)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Sekunden je Szenario und Rate")
+    parser.add_argument("--gunicorn-args", default="", help="Zusätzliche gunicorn-Optionen (Standard wie Procfile)")
+    parser.add_argument("--database-url", help="Postgres statt einer frischen SQLite-Datei verwenden")
+    parser.add_argument("--seed-jobs", type=int, default=DEFAULT_SEED_JOBS, help="Jobs in der SQLite-Datei vorab")
+    parser.add_argument("--no-browser", dest="browser", action="store_false",
+                        help="Seiten per HTTP statt mit Chrome laden")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Obergrenze offener Anfragen des Clients")
+    parser.add_argument("--client-timeout", type=float, default=60.0)
+    parser.add_argument("--distinct-queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Ergebnisse zusätzlich als JSON in diese Datei schreiben")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        rates = [float(value) for value in args.rps.split(",") if value.strip()]
+    except ValueError:
+        parser.error(f"Ungültige Raten: {args.rps}")
+    if not rates or min(rates) <= 0:
+        parser.error("Raten müssen größer als 0 sein")
+
+    results = []
+    for name in args.scenario or list(SCENARIOS):
+        for rps in rates:
+            logger.info(f"Szenario {name} ({SCENARIOS[name]['description']}) mit {rps} rps für {args.duration}s")
+            try:
+                result = run_scenario(name, rps, args)
+            except RuntimeError as e:
+                logger.error(f"Szenario {name} @ {rps} rps abgebrochen: {e}")
+                return 1
+            results.append(result)
+            print_result(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as target:
+            json.dump(results, target, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
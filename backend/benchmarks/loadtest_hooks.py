@@ -0,0 +1,22 @@
+"""Gunicorn-Konfiguration für Lasttests (siehe loadtest.py).
+
+    gunicorn -c python:benchmarks.loadtest_hooks src.app:app
+
+Mit ``LOADTEST_HTTP_PAGES=1`` laden die Worker die Suchseiten per HTTP von
+den Stand-in-Servern statt mit Chrome - für Maschinen ohne Browser oder um
+nur Flask, Parsen und Datenbank zu belasten. Sonst ändert die Datei nichts
+an der Konfiguration aus der Kommandozeile.
+"""
+
+import os
+
+
+def post_worker_init(worker):
+    if os.environ.get("LOADTEST_HTTP_PAGES") != "1":
+        return
+    from src import scraping, tracing
+
+    from benchmarks.standin import fetch_page
+
+    scraping.load_page_with_selenium = tracing.traced("page_load")(fetch_page)
+    worker.log.info("Lasttest: Seiten werden per HTTP statt mit Chrome geladen")
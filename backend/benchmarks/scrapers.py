@@ -0,0 +1,390 @@
+"""Offline-Benchmark der Scraper gegen aufgezeichnete Ergebnisseiten.
+
+Ein Fixture-Satz ist ein Verzeichnis unter ``benchmarks/fixtures/scrapers/``
+mit ``manifest.json``, den gzip-komprimierten Seiten und optional
+``baseline.json``. Neue Aufzeichnungen kommen in einen neuen Satz (Standard:
+heutiges Datum), damit ältere Seiten als Vergleich erhalten bleiben.
+
+- ``record`` ruft den echten Scraper gegen die Live-Seite auf (Selenium) und
+  speichert die Seite, aus der er Jobs gelesen hat
+- ``synth`` erzeugt den synthetischen Satz ohne Netz (siehe standin.py)
+- ``run`` startet je Quelle einen lokalen Stand-in-Server, lässt
+  find_stepstone_jobs/find_monster_jobs dagegen laufen und misst Parse-Zeit,
+  Kartenschleife, Gesamtzeit (jeweils bester Lauf), Spitzen-Speicher (tracemalloc) und die Anzahl
+  extrahierter Jobs. Mit Baseline werden extrahierte Jobs, Zeit und Speicher
+  verglichen; andere Jobs ergeben Exit-Code 1, Zeit und Speicher nur mit
+  ``--strict`` (Baselines für Zeit gelten nur auf derselben Maschine).
+
+Ohne ``--browser`` holt ``run`` die Seiten per HTTP statt mit Chrome, damit
+nur Parsen und Extraktion gemessen werden.
+
+    cd backend && python -m benchmarks.scrapers record --source stepstone --title Elektriker --city Berlin
+    python -m benchmarks.scrapers synth
+    python -m benchmarks.scrapers run --repeat 5
+    python -m benchmarks.scrapers run --update-baseline
+"""
+
+import argparse
+import datetime
+import gzip
+import hashlib
+import json
+import logging
+import os
+import platform
+import re
+import sys
+import tracemalloc
+from urllib.parse import urlsplit
+
+from .standin import StandInServer, fetch_page, synthetic_page
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(BACKEND_DIR, "benchmarks", "fixtures", "scrapers")
+SYNTHETIC_SET = "synthetic"
+
+# Synthetischer Satz: (source, title, city, Karten, Layout, Ballast in KB, Index der alternativen URL, keine Treffer)
+SYNTHETIC_CASES = [
+    ("stepstone", "Elektriker", "Berlin", 25, "primary", 300, 0, False),
+    ("stepstone", "Koch", "Hamburg", 100, "primary", 800, 0, False),
+    ("stepstone", "Lagerhelfer", "Bremen", 25, "fallback", 300, 1, False),
+    ("stepstone", "Astronaut", "Leipzig", 0, "primary", 200, 0, True),
+    ("monster", "Elektriker", "Berlin", 25, "primary", 300, 0, False),
+    ("monster", "Pflegefachkraft", "Dresden", 60, "fallback", 600, 2, False),
+]
+
+# Standard-Toleranz für Zeit und Speicher gegenüber der Baseline
+DEFAULT_TOLERANCE = 0.25
+
+# Zeitunterschiede darunter gelten als Messrauschen
+MIN_TIME_DELTA_MS = 2.0
+
+logger = logging.getLogger(__name__)
+
+
+def slugify(value):
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-") or "x"
+
+
+def set_dir(set_name):
+    return os.path.join(FIXTURES_DIR, set_name)
+
+
+def default_set():
+    """Neuester aufgezeichneter Satz, sonst der synthetische"""
+    if not os.path.isdir(FIXTURES_DIR):
+        return SYNTHETIC_SET
+    recorded = sorted(
+        name for name in os.listdir(FIXTURES_DIR)
+        if name != SYNTHETIC_SET and os.path.isfile(os.path.join(FIXTURES_DIR, name, "manifest.json"))
+    )
+    return recorded[-1] if recorded else SYNTHETIC_SET
+
+
+def load_manifest(set_name):
+    path = os.path.join(set_dir(set_name), "manifest.json")
+    if not os.path.exists(path):
+        return {"version": 1, "fixtures": []}
+    with open(path, encoding="utf-8") as manifest:
+        return json.load(manifest)
+
+
+def save_fixture(set_name, source, title, city, url_path, page, synthetic=False):
+    """Speichert eine Seite im Satz und trägt sie ins Manifest ein (gleicher Name wird ersetzt)"""
+    os.makedirs(set_dir(set_name), exist_ok=True)
+    data = page.encode("utf-8")
+    name = f"{source}-{slugify(title)}-{slugify(city)}"
+    filename = f"{name}.html.gz"
+    # mtime=0, damit gleiche Seiten byte-identische Dateien ergeben
+    with gzip.GzipFile(os.path.join(set_dir(set_name), filename), "wb", mtime=0) as target:
+        target.write(data)
+
+    manifest = load_manifest(set_name)
+    manifest["fixtures"] = [fixture for fixture in manifest["fixtures"] if fixture["name"] != name]
+    manifest["fixtures"].append({
+        "name": name,
+        "source": source,
+        "title": title,
+        "city": city,
+        "path": url_path,
+        "file": filename,
+        "bytes": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "recordedAt": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "synthetic": synthetic,
+    })
+    manifest["fixtures"].sort(key=lambda fixture: fixture["name"])
+    with open(os.path.join(set_dir(set_name), "manifest.json"), "w", encoding="utf-8") as target:
+        json.dump(manifest, target, indent=2, ensure_ascii=False)
+        target.write("\n")
+    return name
+
+
+def load_fixture_page(set_name, fixture):
+    with gzip.open(os.path.join(set_dir(set_name), fixture["file"]), "rb") as source:
+        data = source.read()
+    if hashlib.sha256(data).hexdigest() != fixture["sha256"]:
+        logger.warning(f"Prüfsumme von {fixture['file']} passt nicht zum Manifest")
+    return data
+
+
+def url_path(url):
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+def requested_urls(source, title, city):
+    """Die URLs, die der Scraper der Reihe nach versucht (ohne eine Seite zu laden)"""
+    from src import scraping
+
+    urls = []
+    original = scraping.load_page_with_selenium
+    scraping.load_page_with_selenium = lambda url, *args, **kwargs: urls.append(url)
+    try:
+        scraping.SCRAPERS[source](title, city)
+    finally:
+        scraping.load_page_with_selenium = original
+    return urls
+
+
+def record(set_name, source, title, city):
+    """Ruft den Scraper gegen die Live-Seite auf und speichert die verwendete Seite"""
+    from src import scraping
+
+    captured = []
+    original = scraping.load_page_with_selenium
+
+    def capture(url, *args, **kwargs):
+        page = original(url, *args, **kwargs)
+        if page:
+            captured.append((url, page))
+        return page
+
+    scraping.load_page_with_selenium = capture
+    try:
+        jobs = scraping.SCRAPERS[source](title, city, max_jobs=1000)
+    finally:
+        scraping.load_page_with_selenium = original
+
+    if scraping.is_fallback_result(jobs) or not captured:
+        logger.error(f"{source}: keine echten Treffer für {title} / {city}, nichts aufgezeichnet")
+        return None
+    url, page = captured[-1]
+    name = save_fixture(set_name, source, title, city, url_path(url), page)
+    logger.info(f"{name}: {len(page)} Zeichen, {len(jobs)} Jobs von {url}")
+    return name
+
+
+def synthesize(set_name=SYNTHETIC_SET):
+    """Erzeugt den synthetischen Satz (deterministisch)"""
+    names = []
+    for index, (source, title, city, cards, layout, filler_kb, url_index, no_results) in enumerate(SYNTHETIC_CASES):
+        page = synthetic_page(source, cards=cards, seed=index, layout=layout, filler_kb=filler_kb,
+                              no_results=no_results)
+        path = url_path(requested_urls(source, title, city)[url_index])
+        names.append(save_fixture(set_name, source, title, city, path, page, synthetic=True))
+    return names
+
+
+def measure_fixture(scraper, fixture, repeat, max_jobs):
+    """
+    Misst einen Fixture repeat-mal (Zeit, bester Lauf) und einmal mit tracemalloc (Speicher)
+
+    Der beste statt des mittleren Laufs schwankt auf geteilten Maschinen am wenigsten.
+    """
+    from src import scraping, tracing
+
+    runs = []
+    jobs = []
+    for _ in range(repeat):
+        handle = tracing.start_trace("benchmark")
+        jobs = scraper(fixture["title"], fixture["city"], max_jobs=max_jobs)
+        root = tracing.finish_trace(handle)
+        stages = {}
+        for span in root.trace.spans:
+            if span is not root:
+                stages[span.name] = stages.get(span.name, 0.0) + span.duration
+        runs.append({
+            "parse": stages.get("parse", 0.0),
+            "card_loop": stages.get("card_loop", 0.0),
+            "total": root.duration,
+        })
+
+    tracemalloc.start()
+    scraper(fixture["title"], fixture["city"], max_jobs=max_jobs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    fallback = scraping.is_fallback_result(jobs)
+    return {
+        "bytes": fixture["bytes"],
+        "jobs": 0 if fallback else len(jobs),
+        "fallback": fallback,
+        "parseMs": round(min(run["parse"] for run in runs) * 1000, 2),
+        "cardLoopMs": round(min(run["card_loop"] for run in runs) * 1000, 2),
+        "totalMs": round(min(run["total"] for run in runs) * 1000, 2),
+        "peakMemoryMb": round(peak / 1024 / 1024, 2),
+        "extracted": [] if fallback else [
+            {key: job.get(key) for key in ("title", "company", "location", "url")} for job in jobs
+        ],
+    }
+
+
+def run(set_name, repeat=5, max_jobs=1000, browser=False, only=None):
+    """Führt alle Fixtures eines Satzes gegen die Stand-in-Server aus"""
+    from src import scraping, tracing
+
+    manifest = load_manifest(set_name)
+    if not manifest["fixtures"]:
+        raise ValueError(f"Fixture-Satz '{set_name}' ist leer oder existiert nicht ({set_dir(set_name)})")
+
+    patched = {
+        "STEPSTONE_BASE_URL": scraping.STEPSTONE_BASE_URL,
+        "MONSTER_BASE_URL": scraping.MONSTER_BASE_URL,
+        "load_page_with_selenium": scraping.load_page_with_selenium,
+    }
+    results = {}
+    with StandInServer() as stepstone, StandInServer() as monster:
+        servers = {"stepstone": stepstone, "monster": monster}
+        scraping.STEPSTONE_BASE_URL = stepstone.url
+        scraping.MONSTER_BASE_URL = monster.url
+        if not browser:
+            scraping.load_page_with_selenium = tracing.traced("page_load")(fetch_page)
+        try:
+            for fixture in manifest["fixtures"]:
+                if only and fixture["name"] not in only:
+                    continue
+                servers[fixture["source"]].set_routes({fixture["path"]: load_fixture_page(set_name, fixture)})
+                results[fixture["name"]] = measure_fixture(
+                    scraping.SCRAPERS[fixture["source"]], fixture, repeat, max_jobs
+                )
+        finally:
+            for name, value in patched.items():
+                setattr(scraping, name, value)
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Abweichungen gegenüber der Baseline je Fixture: {name: [(art, Beschreibung), ...]}
+
+    art "result" (fehlender Fixture, andere extrahierte Jobs) ist deterministisch,
+    art "perf" (Zeit, Speicher) hängt von der Maschine ab.
+    """
+    issues = {}
+    for name, expected in baseline.get("fixtures", {}).items():
+        found = []
+        actual = results.get(name)
+        if actual is None:
+            issues[name] = [("result", "fehlt im Lauf")]
+            continue
+        if actual["extracted"] != expected["extracted"]:
+            found.append(("result", f"extrahierte Jobs geändert ({expected['jobs']} -> {actual['jobs']})"))
+        for key, label in (("parseMs", "Parse-Zeit"), ("cardLoopMs", "Kartenschleife")):
+            if actual[key] > expected[key] * (1 + tolerance) and actual[key] - expected[key] > MIN_TIME_DELTA_MS:
+                found.append(("perf", f"{label} {expected[key]:.1f} -> {actual[key]:.1f} ms"))
+        if actual["peakMemoryMb"] > expected["peakMemoryMb"] * (1 + tolerance):
+            found.append(("perf", f"Speicher {expected['peakMemoryMb']:.1f} -> {actual['peakMemoryMb']:.1f} MB"))
+        if found:
+            issues[name] = found
+    return issues
+
+
+def print_results(results, issues):
+    print(f"{'Fixture':<34} {'KB':>6} {'Jobs':>5} {'Parse ms':>9} {'Karten ms':>10} {'Gesamt ms':>10} {'Peak MB':>8}  Status")
+    for name, result in results.items():
+        status = "; ".join(text for _, text in issues.get(name, [])) or "ok"
+        if result["fallback"]:
+            status = f"Beispieldaten, {status}"
+        print(
+            f"{name:<34} {result['bytes'] / 1024:>6.0f} {result['jobs']:>5} {result['parseMs']:>9.1f} "
+            f"{result['cardLoopMs']:>10.1f} {result['totalMs']:>10.1f} {result['peakMemoryMb']:>8.1f}  {status}"
+        )
+    for name in issues:
+        if name not in results:
+            print(f"{name:<34} {'':>6} {'':>5} {'':>9} {'':>10} {'':>10} {'':>8}  {'; '.join(text for _, text in issues[name])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scraper offline gegen aufgezeichnete Seiten messen")
+    parser.add_argument("--set", dest="set_name", help="Fixture-Satz (Standard: neuester aufgezeichneter)")
+    parser.add_argument("--verbose", action="store_true", help="Log-Ausgabe der Scraper anzeigen")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Live-Seite aufzeichnen (benötigt Chrome und Netz)")
+    record_parser.add_argument("--source", required=True, choices=["stepstone", "monster"])
+    record_parser.add_argument("--title", required=True)
+    record_parser.add_argument("--city", required=True)
+
+    commands.add_parser("synth", help="Synthetischen Satz erzeugen")
+
+    run_parser = commands.add_parser("run", help="Benchmark ausführen")
+    run_parser.add_argument("--repeat", type=int, default=5, help="Zeitmessungen je Fixture (bester Lauf zählt)")
+    run_parser.add_argument("--max-jobs", type=int, default=1000, help="max_jobs für die Scraper")
+    run_parser.add_argument("--fixture", action="append", help="Nur diese Fixtures (mehrfach möglich)")
+    run_parser.add_argument("--browser", action="store_true", help="Seiten mit Selenium statt per HTTP laden")
+    run_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                            help="Erlaubte Verschlechterung von Zeit und Speicher (Anteil)")
+    run_parser.add_argument("--strict", action="store_true",
+                            help="Auch bei langsamerer Laufzeit oder mehr Speicher mit Exit-Code 1 enden")
+    run_parser.add_argument("--update-baseline", action="store_true", help="Ergebnis als neue Baseline speichern")
+    run_parser.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    # Eigene Meldungen (aufgezeichnete Seiten) immer zeigen
+    logger.setLevel(logging.INFO)
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+    if args.command == "record":
+        set_name = args.set_name or datetime.date.today().isoformat()
+        return 0 if record(set_name, args.source, args.title, args.city) else 1
+    if args.command == "synth":
+        set_name = args.set_name or SYNTHETIC_SET
+        for name in synthesize(set_name):
+            print(name)
+        return 0
+
+    set_name = args.set_name or default_set()
+    try:
+        results = run(set_name, repeat=max(1, args.repeat), max_jobs=args.max_jobs, browser=args.browser,
+                      only=set(args.fixture) if args.fixture else None)
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+
+    baseline_path = os.path.join(set_dir(set_name), "baseline.json")
+    if args.update_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as target:
+            json.dump({
+                "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "fixtures": results,
+            }, target, indent=2, ensure_ascii=False)
+            target.write("\n")
+        issues = {}
+    elif os.path.exists(baseline_path):
+        with open(baseline_path, encoding="utf-8") as source:
+            baseline = json.load(source)
+        if args.fixture:
+            baseline["fixtures"] = {name: value for name, value in baseline["fixtures"].items() if name in args.fixture}
+        issues = compare(results, baseline, args.tolerance)
+    else:
+        issues = {}
+        print(f"Keine Baseline für '{set_name}' - mit --update-baseline anlegen")
+
+    if args.json:
+        print(json.dumps({"set": set_name, "results": results, "issues": issues}, indent=2, ensure_ascii=False))
+    else:
+        print(f"Fixture-Satz: {set_name}")
+        print_results(results, issues)
+    # Geänderte Ergebnisse sind immer ein Fehler, Zeit und Speicher nur mit --strict
+    kinds = {kind for found in issues.values() for kind, _ in found}
+    return 1 if "result" in kinds or (args.strict and kinds) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,256 @@
+"""Lokaler Stand-in-Server für Stepstone/Monster und synthetische Ergebnisseiten.
+
+Die Scraper lesen ihre Suchseiten von ``STEPSTONE_BASE_URL`` bzw.
+``MONSTER_BASE_URL`` (siehe src/scraping.py). Zeigen diese auf einen
+StandInServer, laufen Benchmarks ohne die echten Seiten: der Server liefert
+für bekannte Pfade (inkl. Query) die hinterlegte Seite, sonst 404 - dann
+probieren die Scraper wie gewohnt die nächste alternative URL.
+
+Für Lasttests kann der Server außerdem jede unbekannte Suche mit einer
+Standardseite beantworten und sich wie eine echte Jobbörse unter Last
+verhalten: Latenz, Serverfehler (500), Bot-Sperrseiten und Verbindungen, die
+erst nach langer Zeit antworten.
+
+Die synthetischen Seiten haben dieselben Selektoren wie die echten
+Ergebnisseiten und ähnlich viel Ballast (Skripte, Navigation, JSON-Zustand),
+sind aber deterministisch erzeugt und kein Ersatz für aufgezeichnete Seiten.
+"""
+
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+WORDS = (
+    "Elektriker Koch Pflegefachkraft Entwickler Vertrieb Lager Logistik Mechatroniker Projektleiter "
+    "Berater Servicetechniker Buchhalter Erzieher Monteur Ingenieur Fachkraft Teamleitung Assistenz "
+    "Energietechnik Gastronomie Software Backend Kundenservice Produktion Qualität Einkauf"
+).split()
+COMPANIES = (
+    "Muster GmbH", "Beispiel AG", "Nordlicht Service GmbH", "Rheinwerk Personal", "Südstern Logistik",
+    "Alpha Technik KG", "Stadtwerke Beispielstadt", "Hanse Gastro GmbH",
+)
+CITIES = ("Berlin", "Hamburg", "München", "Köln", "Bremen", "Leipzig", "Dresden", "Stuttgart")
+
+# Karten-Markup je Quelle und Layout; die Selektoren entsprechen denen in src/scraping.py
+CARD_TEMPLATES = {
+    ("stepstone", "primary"): (
+        '<article data-testid="job-item" class="res-1p8f8en"><div class="res-nehv70">'
+        '<h2><a href="/stellenangebote--{slug}-{id}-inline.html">{title}</a></h2>'
+        '<span data-testid="job-element-company">{company}</span>'
+        '<span data-testid="job-element-location">{location}</span>'
+        '<span class="res-1w8a0v8">{age}</span></div></article>'
+    ),
+    ("stepstone", "fallback"): (
+        '<article class="legacy-card"><h3>{title}</h3><div class="meta"><span>{company}</span>'
+        '<span>{location}</span></div><a href="https://www.stepstone.de/stellenangebote--{slug}-{id}.html">'
+        'Details</a></article>'
+    ),
+    ("monster", "primary"): (
+        '<div data-testid="jobCard" class="job-cardstyle"><a href="/job-openings/{slug}--{id}">'
+        '<h3 data-testid="jobTitle">{title}</h3></a><span data-testid="company">{company}</span>'
+        '<span data-testid="location">{location}</span><span>{age}</span></div>'
+    ),
+    ("monster", "fallback"): (
+        '<article class="results-card"><h2>{title}</h2><div class="name">{company}</div>'
+        '<div class="location">{location}</div><a href="https://www.monster.de/job-openings/{slug}--{id}">'
+        'Mehr</a></article>'
+    ),
+}
+
+
+def synthetic_page(source, cards=25, seed=0, layout="primary", filler_kb=300, no_results=False):
+    """
+    Erzeugt eine Ergebnisseite mit cards Job-Karten
+
+    layout "fallback" trifft erst spätere Selektoren der Kaskade; filler_kb
+    steuert den Ballast um die Karten herum (echte Seiten: einige hundert KB).
+    """
+    rng = random.Random(f"{source}-{seed}-{layout}")
+    template = CARD_TEMPLATES[(source, layout)]
+
+    body = []
+    if no_results:
+        body.append("<p>Leider haben wir keine passenden Stellenangebote gefunden.</p>"
+                    if source == "stepstone" else "<p>Keine Treffer gefunden - keine passenden Jobs.</p>")
+    else:
+        for index in range(cards):
+            title = " ".join(rng.sample(WORDS, 2)) + " (m/w/d)"
+            body.append(template.format(
+                title=html.escape(title),
+                company=html.escape(rng.choice(COMPANIES)),
+                location=html.escape(rng.choice(CITIES)),
+                slug="-".join(title.lower().split()[:2]),
+                id=rng.randint(1_000_000, 9_999_999),
+                age=f"vor {rng.randint(1, 30)} Tagen",
+            ))
+
+    # Ballast wie auf den echten Seiten: Navigation, Filter, eingebetteter Zustand, Skripte
+    filler = []
+    size = 0
+    while size < filler_kb * 1024:
+        block = (
+            f'<nav class="nav-{rng.randint(0, 99)}"><ul>'
+            + "".join(f'<li><a href="/kategorie/{word.lower()}">{word}</a></li>' for word in rng.sample(WORDS, 8))
+            + "</ul></nav>"
+            + f'<script>window.__STATE_{len(filler)}__={json.dumps({"filters": rng.sample(WORDS, 6), "ids": [rng.randint(0, 10**6) for _ in range(20)]})}</script>'
+        )
+        filler.append(block)
+        size += len(block)
+    middle = len(filler) // 2
+    return (
+        "<!DOCTYPE html><html lang=\"de\"><head><meta charset=\"utf-8\"><title>Jobs</title></head><body>"
+        + "".join(filler[:middle])
+        + '<main id="results">' + "".join(body) + "</main>"
+        + "".join(filler[middle:])
+        + "</body></html>"
+    )
+
+
+# Sperrseite, wie sie die Jobbörsen bei Bot-Verdacht ausliefern (groß genug, um als gültig zu gelten)
+BLOCK_PAGE = (
+    "<!DOCTYPE html><html><head><title>Access Denied</title></head><body>"
+    "<h1>Bitte bestätigen Sie, dass Sie kein Roboter sind</h1>"
+    "<form action=\"/captcha\" method=\"post\"><div class=\"captcha\"></div></form>"
+    + "<!-- " + "x" * 2000 + " -->"
+    + "</body></html>"
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        page = server.routes.get(unquote(self.path), server.default_page)
+        if page is None:
+            self._send(404, b"<html><body>Not found</body></html>")
+            return
+
+        with server.lock:
+            roll = server.rng.random()
+            delay = server.rng.uniform(*server.latency)
+        if roll < server.hang_rate:
+            server.count("hang")
+            time.sleep(server.hang_seconds)
+        elif roll < server.hang_rate + server.error_rate:
+            time.sleep(delay)
+            server.count("error")
+            self._send(500, b"<html><body>Internal Server Error</body></html>")
+            return
+        elif roll < server.hang_rate + server.error_rate + server.block_rate:
+            time.sleep(delay)
+            server.count("blocked")
+            self._send(200, BLOCK_PAGE.encode("utf-8"))
+            return
+        else:
+            time.sleep(delay)
+        server.count("ok")
+        self._send(200, page)
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # Client hat aufgegeben (z.B. Timeout des Scrapers)
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def count(self, outcome):
+        with self.lock:
+            self.stats[outcome] = self.stats.get(outcome, 0) + 1
+
+
+class StandInServer:
+    """
+    HTTP-Server auf 127.0.0.1 (zufälliger Port, falls port=0), der feste Seiten ausliefert
+
+    routes: {"/pfad?query": html (str oder bytes)}; set_routes() tauscht sie aus.
+    Pfade werden URL-dekodiert verglichen. default_page beantwortet alle
+    übrigen Pfade (sonst 404).
+
+    Verhalten unter Last, je Anfrage ausgewürfelt:
+    latency: (min, max) Sekunden bis zur Antwort
+    error_rate: Anteil mit HTTP 500
+    block_rate: Anteil mit Bot-Sperrseite (HTTP 200 ohne Job-Karten)
+    hang_rate: Anteil, der erst nach hang_seconds antwortet
+    """
+
+    def __init__(self, routes=None, default_page=None, latency=(0.0, 0.0), error_rate=0.0, block_rate=0.0,
+                 hang_rate=0.0, hang_seconds=60.0, port=0, seed=None):
+        self.httpd = _Server(("127.0.0.1", port), _Handler)
+        self.httpd.lock = threading.Lock()
+        self.httpd.rng = random.Random(seed)
+        self.httpd.stats = {}
+        self.httpd.latency = tuple(latency)
+        self.httpd.error_rate = error_rate
+        self.httpd.block_rate = block_rate
+        self.httpd.hang_rate = hang_rate
+        self.httpd.hang_seconds = hang_seconds
+        self.httpd.default_page = default_page.encode("utf-8") if isinstance(default_page, str) else default_page
+        self.set_routes(routes or {})
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="standin-server", daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self):
+        """Anzahl der Antworten je Ergebnis (ok, error, blocked, hang)"""
+        with self.httpd.lock:
+            return dict(self.httpd.stats)
+
+    def set_routes(self, routes):
+        self.httpd.routes = {
+            unquote(path): page.encode("utf-8") if isinstance(page, str) else page
+            for path, page in routes.items()
+        }
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+_http = None
+
+
+def fetch_page(url, wait_for_selector=None, timeout=15):
+    """
+    Ersatz für load_page_with_selenium: Seite per HTTP statt mit Chrome laden
+
+    Für Benchmarks gegen Stand-in-Server, wenn nur Parsen und Extraktion
+    gemessen werden sollen. Gibt wie das Original None zurück, wenn die Seite
+    nicht geladen werden kann.
+    """
+    global _http
+    import urllib3
+
+    if _http is None:
+        _http = urllib3.PoolManager(maxsize=32)
+    try:
+        response = _http.request("GET", url, timeout=timeout, retries=False)
+    except urllib3.exceptions.HTTPError:
+        return None
+    if response.status != 200:
+        return None
+    return response.data.decode("utf-8", errors="replace")
@@ -0,0 +1,71 @@
+"""Misst die Kaltstartzeit der App in frischen Python-Prozessen.
+
+Jeder Lauf startet einen neuen Interpreter, importiert ``src.app`` (inklusive
+create_app) und gibt die Startphasen aus src.startup zurück. Ausgewertet
+werden Median und Minimum über alle Läufe.
+
+    cd backend && python -m benchmarks.startup --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import src.app
+from src import startup
+phases = dict(startup.STARTUP_PHASES)
+phases.pop("schema_bootstrap", None)
+phases["total"] = round(time.perf_counter() - start, 4)
+print("STARTUP_RESULT " + json.dumps(phases))
+"""
+
+
+def run_once(env):
+    """Startet einen frischen Prozess und liefert Phasen und Wanduhrzeit"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - start
+    for line in result.stdout.splitlines():
+        if line.startswith("STARTUP_RESULT "):
+            phases = json.loads(line[len("STARTUP_RESULT "):])
+            phases["process"] = round(wall, 4)
+            return phases
+    raise RuntimeError(f"Kein Ergebnis vom Kindprozess:\n{result.stderr[-2000:]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kaltstartzeit der App messen")
+    parser.add_argument("--runs", type=int, default=5, help="Anzahl frischer Prozesse")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    # Ohne erreichbare Datenbank messen wir den reinen Start; der Schema-Bootstrap läuft im Hintergrund
+    env.setdefault("DATABASE_URL", "postgresql://localhost:1/startup_benchmark")
+
+    runs = [run_once(env) for _ in range(args.runs)]
+
+    print(f"{'Phase':<12} {'Median (s)':>12} {'Min (s)':>10}")
+    for phase in runs[0]:
+        values = [run[phase] for run in runs if phase in run]
+        print(f"{phase:<12} {statistics.median(values):>12.4f} {min(values):>10.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,48 @@
+"""Zugriffsschutz für Admin-Endpunkte.
+
+Admin-Routen sind nur aktiv, wenn ``ADMIN_TOKEN`` gesetzt ist. Das Token wird
+als ``Authorization: Bearer <token>`` oder ``X-Admin-Token`` mitgeschickt.
+"""
+
+import functools
+import hmac
+import logging
+import os
+
+from flask import jsonify, request
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+
+def admin_token():
+    """Konfiguriertes Admin-Token oder None (Admin-Routen deaktiviert)"""
+    return os.environ.get("ADMIN_TOKEN") or None
+
+
+def request_token():
+    """Token aus dem Authorization- oder X-Admin-Token-Header der aktuellen Anfrage"""
+    header = request.headers.get("Authorization", "")
+    if header.lower().startswith("bearer "):
+        return header[7:].strip()
+    return request.headers.get("X-Admin-Token", "").strip()
+
+
+def is_admin_request():
+    """True, wenn die aktuelle Anfrage ein gültiges Admin-Token mitbringt"""
+    expected = admin_token()
+    provided = request_token()
+    return bool(expected and provided and hmac.compare_digest(provided.encode(), expected.encode()))
+
+
+def require_admin(func):
+    """Decorator: 403 ohne konfiguriertes Token, 401 bei fehlendem oder falschem Token"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not admin_token():
+            return jsonify({"error": "Admin-Endpunkte sind deaktiviert (ADMIN_TOKEN nicht gesetzt)"}), 403
+        if not is_admin_request():
+            logger.warning(f"Abgelehnter Admin-Zugriff auf {request.path} von {request.remote_addr}")
+            return jsonify({"error": "Ungültiges oder fehlendes Admin-Token"}), 401
+        return func(*args, **kwargs)
+    return wrapper
@@ -1,5 +1,6 @@
+from . import startup
 from .models import Job, db, connect_db, refresh_db, serialize_job
-from flask import Flask, cli, request, jsonify, send_from_directory
+from flask import Flask, Response, cli, g, request, jsonify, send_from_directory
 from flask_cors import CORS
 import os
 import logging
@@ -8,7 +9,25 @@ import time
 import functools
 import socket
 import sys
-from .scraping import find_monster_jobs, find_stepstone_jobs
+import threading
+from .scraping import SCRAPERS, is_fallback_result
+from . import result_cache
+from .metrics import HTTP_REQUEST_SECONDS, render_metrics
+from . import tracing
+from . import browser_resources
+from .browser_supervisor import start_supervisor, supervisor_info
+from .logging_config import configure_logging
+from .streaming import STREAM_FORMATS, format_chunks
+from .dedupe import dedupe_jobs
+from .database import DEFAULT_PAGE_SIZE
+from .stats import STATS_DEFAULT_LIMIT
+from .storage import get_storage
+from .ingest import enqueue_jobs, ingest_info
+from .admin import is_admin_request, require_admin
+from .profiler import PROFILE_INTERVAL_MS, SamplingProfiler, process_profile, start_process_profile
+from .bulk_import import import_jobs
+from .export import EXPORT_FORMATS, export_chunks, export_filename
+from .crawl_tasks import crawl_queue_info, enqueue_tasks
 from datetime import datetime
 
 # Prozess-Startzeit für Uptime-Berechnungen
@@ -19,7 +38,8 @@ log_level = logging.INFO
 if os.environ.get("DEBUG") == "1":
     log_level = logging.DEBUG
 
-logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+# Ausgabe als JSON über eine Queue und einen Hintergrund-Thread (siehe logging_config.py)
+configure_logging(log_level)
 logger = logging.getLogger(__name__)
 
 # Weniger häufig verwendete Module nur bei Bedarf importieren
@@ -30,48 +50,11 @@ def lazy_import(module_name):
         logger.warning(f"Modul {module_name} konnte nicht importiert werden: {e}")
         return None
 
-# Bedingte Importe für Datenbankfunktionalität - darf nicht fehlschlagen für Healthcheck
-try:
-    # Erstmal versuchen, die benötigten Module zu installieren, falls sie fehlen
-    try:
-        import subprocess
-        logger.info("Versuche, fehlende Datenbankmodule zu installieren...")
-        
-        # Liste der zu installierenden Module
-        db_modules = ["psycopg2-binary", "psycopg", "psycopg2", "python-dotenv"]
-        for module in db_modules:
-            try:
-                subprocess.check_call(["pip", "install", module, "--no-cache-dir"])
-                logger.info(f"Modul {module} erfolgreich installiert")
-            except Exception as e:
-                logger.warning(f"Konnte Modul {module} nicht installieren: {e}")
-    except Exception as e:
-        logger.warning(f"Konnte zusätzliche Module nicht installieren: {e}")
-        
-    # Jetzt versuchen, die Module zu importieren
-    import psycopg
-    from .database import get_database, save_new_jobs, get_jobs_by_criteria, verify_database_connection, create_tables_if_not_exist
-    db_imports_successful = True
-    logger.info("Datenbankmodule erfolgreich importiert")
-except ImportError as e:
-    db_imports_successful = False
-    logger.warning(f"Datenbankmodule konnten nicht importiert werden: {e}")
-    
-    # Dummy-Funktionen für den Fall, dass die Importe fehlschlagen
-    def verify_database_connection():
-        return False
-        
-    def save_new_jobs(jobs):
-        logger.warning("Keine Datenbankunterstützung verfügbar, Jobs werden nicht gespeichert")
-        return
-        
-    def get_jobs_by_criteria(*args, **kwargs):
-        logger.warning("Keine Datenbankunterstützung verfügbar, keine Jobs abgerufen")
-        return []
-        
-    def create_tables_if_not_exist():
-        logger.warning("Keine Datenbankunterstützung verfügbar, Tabellen können nicht erstellt werden")
-        return False
+# Speicher-Backend: Postgres oder eingebettetes SQLite (siehe storage.py).
+# Verbindungen werden erst bei der ersten Abfrage aufgebaut.
+storage = get_storage()
+
+startup.mark_phase("imports")
 
 # Den absoluten Pfad zum aktuellen Modul finden
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -115,6 +98,8 @@ def get_system_info():
             "vms_mb": round(memory_info.vms / (1024 * 1024), 2),
             "percent": process.memory_percent()
         }
+        # Chrome und chromedriver laufen als Kindprozesse und brauchen meist deutlich mehr
+        info["memory"]["children"] = browser_resources.child_processes_info()
     except ImportError:
         # Wenn psutil nicht verfügbar ist, versuche einige grundlegende Informationen
         import resource
@@ -137,7 +122,72 @@ def create_app():
     app = Flask(__name__, static_folder=static_dir, static_url_path='')
     
     # activate CORS for flask app
-    CORS(app, resources={r"/*": {"origins": "*"}})
+    CORS(app, resources={r"/*": {"origins": "*"}}, expose_headers=["X-Trace-Id", "X-Browser-Usage"])
+    
+    # Bearbeitungsdauer jeder Anfrage für /metrics messen (Label: Routen-Muster statt Pfad)
+    # und einen Trace öffnen, dessen Stufen im Server-Timing-Header landen
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        g.trace = tracing.start_trace(
+            f"{request.method} {endpoint}", traceparent=request.headers.get("traceparent"),
+            path=request.path
+        )
+        g.browser_usage = browser_resources.begin_request()
+    
+    @app.after_request
+    def record_request_time(response):
+        start = g.pop("request_start", None)
+        if start is not None:
+            endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=request.method,
+                                         endpoint=endpoint, status=response.status_code)
+        token = g.pop("browser_usage", None)
+        usage = browser_resources.end_request(token) if token is not None else None
+        if usage is not None:
+            # Ressourcen der Browser-Sitzungen dieser Anfrage (siehe browser_resources.py)
+            response.headers["X-Browser-Usage"] = browser_resources.usage_header(usage)
+        handle = g.pop("trace", None)
+        if handle is not None:
+            handle[0].set(status=response.status_code)
+            if usage is not None:
+                handle[0].set(**{f"browser_{key}": value for key, value in usage.items()})
+            root = tracing.finish_trace(handle)
+            response.headers["Server-Timing"] = tracing.server_timing(root)
+            response.headers["Timing-Allow-Origin"] = "*"
+            response.headers["X-Trace-Id"] = root.trace.trace_id
+        return response
+    
+    # Einzelne Anfrage profilieren: ?profile=1 oder X-Profile: 1 (nur für Admins, siehe profiler.py)
+    @app.before_request
+    def start_request_profiler():
+        if request.args.get("profile") != "1" and request.headers.get("X-Profile") != "1":
+            return
+        if not is_admin_request():
+            logger.warning(f"Profiling ohne gültiges Admin-Token angefragt, ignoriert: {request.path}")
+            return
+        g.profiler = SamplingProfiler([threading.get_ident()]).start()
+    
+    @app.after_request
+    def return_request_profile(response):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return response
+        profiler.stop()
+        # Die eigentliche Antwort wird durch die gesammelten Stacks ersetzt
+        logger.info(f"Profil für {request.path}: {profiler.samples} Samples in {profiler.duration:.2f}s")
+        return profile_response(profiler, status=response.status_code)
+    
+    def profile_response(profiler, status=None):
+        """Collapsed Stacks als Download (flamegraph.pl, speedscope)"""
+        response = Response(profiler.collapsed(), mimetype="text/plain")
+        response.headers["Content-Disposition"] = f'attachment; filename="profile-{int(time.time())}.folded"'
+        response.headers["X-Profile-Samples"] = str(profiler.samples)
+        response.headers["X-Profile-Seconds"] = f"{profiler.duration:.3f}"
+        if status is not None:
+            response.headers["X-Profiled-Status"] = str(status)
+        return response
     
     # Log wichtige Startup-Informationen
     logger.info(f"Flask-App wird mit Python {sys.version} auf {sys.platform} gestartet")
@@ -150,52 +200,27 @@ def create_app():
     except Exception as e:
         logger.info(f"Keine .env Datei gefunden oder Fehler beim Laden: {e}")
 
-    # get DB_URI from environ variable (useful for production/testing) or,
-    # if not set there, use development local db.
-    database_url = os.environ.get("DATABASE_URL", "postgres:///jobbig")
-    if database_url.startswith("postgres://"):
-        database_url = database_url.replace("postgres://", "postgresql://", 1)
-
-    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    # Die Datenbank-URL setzt connect_db (nur beim Postgres-Backend)
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SQLALCHEMY_ECHO"] = False
     app.config["DEBUG_TB_INTERCEPT_REDIRECTS"] = False
     app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "secret123")
 
-    # Flag, das angibt, ob die Datenbank verfügbar ist
-    db_available = False
-
+    # Datenbank nur konfigurieren - keine Verbindungsversuche beim Start.
+    # Das Schema wird einmalig im Hintergrund sichergestellt, damit der
+    # Healthcheck sofort antwortet, auch wenn die Datenbank noch nicht bereit ist.
     try:
-        # Versuche mehrmals, die Datenbankverbindung herzustellen
-        for attempt in range(3):
-            try:
-                logger.info(f"Versuche Datenbankverbindung herzustellen (Versuch {attempt+1}/3)...")
-                connect_db(app)
-                # Prüfe, ob die Datenbank tatsächlich verbunden ist
-                if db_imports_successful and verify_database_connection():
-                    db.create_all()
-                    logger.info("Datenbank erfolgreich verbunden und Tabellen erstellt")
-                    db_available = True
-                    break
-                else:
-                    logger.warning("Verbindung zur Datenbank konnte nicht verifiziert werden")
-                    if attempt < 2:
-                        logger.info("Warte 3 Sekunden vor dem nächsten Versuch...")
-                        time.sleep(3)
-            except Exception as e:
-                logger.error(f"Fehler bei Datenbankverbindungsversuch {attempt+1}: {type(e).__name__}: {e}")
-                if attempt < 2:
-                    logger.info("Warte 3 Sekunden vor dem nächsten Versuch...")
-                    time.sleep(3)
-        
-        if not db_available:
-            logger.error("Datenbankverbindung konnte nach mehreren Versuchen nicht hergestellt werden")
-            logger.warning("Anwendung läuft im eingeschränkten Modus ohne Datenbankfunktionalität")
+        if storage.name == "postgres":
+            connect_db(app)
+        startup.start_schema_bootstrap()
     except Exception as e:
         logger.error(f"Unerwarteter Fehler bei der Datenbankinitialisierung: {type(e).__name__}: {e}")
         logger.warning("Anwendung läuft im eingeschränkten Modus ohne Datenbankfunktionalität")
         # Nicht abbrechen, damit der Healthcheck trotzdem funktioniert
 
+    # Browser-Supervisor: verwaiste Chrome-Prozesse abräumen, Budgets je Sitzung durchsetzen
+    start_supervisor()
+
     # Überprüfung des statischen Ordners
     try:
         logger.info(f"Static folder path: {app.static_folder}")
@@ -228,6 +253,18 @@ def create_app():
             "timestamp": datetime.now().isoformat()
         })
         
+    @app.route("/metrics")
+    def metrics():
+        """Kennzahlen im Prometheus-Textformat"""
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+        
+    @app.route("/ready")
+    def readiness_check():
+        """Bereit erst nach dem Schema-Bootstrap (inkl. Snapshot-Warmstart), sonst 503"""
+        schema = startup.get_startup_info()["schema"]
+        status = 200 if schema["status"] == "ok" else 503
+        return jsonify({"status": schema["status"], "timestamp": datetime.now().isoformat()}), status
+        
     @app.route("/")
     def index():
         """Hauptroute, die zum statischen Frontend weiterleitet"""
@@ -239,13 +276,13 @@ def create_app():
         # Versuche Verbindung zur Datenbank herzustellen
         db_connection_info = {
             "connected": False,
-            "modules_available": db_imports_successful
+            "backend": storage.name
         }
         
         # Teste Datenbankverbindung direkt
         try:
             start_time = time.time()
-            db_connected = verify_database_connection()
+            db_connected = storage.verify()
             connection_duration = time.time() - start_time
             
             db_connection_info.update({
@@ -259,8 +296,9 @@ def create_app():
                 }
             })
             
-            # Wenn verbunden, hole weitere Informationen
-            if db_connected:
+            # Wenn verbunden, hole weitere Informationen (nur Postgres)
+            if db_connected and storage.name == "postgres":
+                from .database import get_database
                 conn = get_database()
                 if conn:
                     with conn.cursor() as cur:
@@ -286,6 +324,11 @@ def create_app():
                             "active_connections": active_connections
                         })
                     conn.close()
+            
+            db_connection_info.update(storage.info())
+            db_connection_info["ingest"] = ingest_info()
+            if storage.name == "postgres":
+                db_connection_info["crawl_tasks"] = crawl_queue_info()
         except Exception as e:
             logger.error(f"Fehler bei der Diagnose-Datenbankverbindung: {type(e).__name__}: {e}")
             db_connection_info["error"] = f"{type(e).__name__}: {str(e)}"
@@ -303,6 +346,9 @@ def create_app():
         
         return jsonify({
             "system_info": system_info,
+            "startup": startup.get_startup_info(),
+            "browser_sessions": browser_resources.usage_info(),
+            "browser_supervisor": supervisor_info(),
             "database": db_connection_info,
             "static_files": {
                 "path": app.static_folder,
@@ -317,14 +363,12 @@ def create_app():
     @app.route('/<path:path>')
     def serve_static(path):
         """Serve static files or the SPA"""
-        logger.info(f"Request for path: {path}")
-        
         if path and os.path.exists(os.path.join(app.static_folder, path)):
-            logger.info(f"Serving file directly: {path}")
+            logger.debug("Serving file directly: %s", path, extra={"category": "static"})
             return send_from_directory(app.static_folder, path)
         else:
             try:
-                logger.info(f"Serving index.html for path: {path}")
+                logger.debug("Serving index.html for path: %s", path, extra={"category": "static"})
                 return send_from_directory(app.static_folder, 'index.html')
             except Exception as e:
                 logger.error(f"Error serving index.html: {e}")
@@ -340,7 +384,7 @@ def create_app():
             @functools.wraps(func)
             def wrapper(*args, **kwargs):
                 start_time = time.time()
-                logger.info(f"Starte {func.__name__} mit Timeout von {timeout_seconds} Sekunden")
+                logger.debug("Starte %s mit Timeout von %s Sekunden", func.__name__, timeout_seconds)
                 
                 try:
                     # Führe die Funktion aus
@@ -363,7 +407,7 @@ def create_app():
                                     }
                                 ],
                                 "timeoutOccurred": True,
-                                "databaseAvailable": verify_database_connection(),
+                                "databaseAvailable": storage.verify(),
                                 "executionTime": elapsed_time,
                                 "error": "Timeout während der Verarbeitung.",
                                 "errorType": "TimeoutError"
@@ -380,7 +424,7 @@ def create_app():
                                     }
                                 ],
                                 "timeoutOccurred": True,
-                                "databaseAvailable": verify_database_connection(),
+                                "databaseAvailable": storage.verify(),
                                 "executionTime": elapsed_time,
                                 "error": "Timeout während der Verarbeitung.",
                                 "errorType": "TimeoutError"
@@ -395,7 +439,7 @@ def create_app():
                         "error": str(e),
                         "errorType": type(e).__name__,
                         "timeoutOccurred": False,
-                        "databaseAvailable": verify_database_connection(),
+                        "databaseAvailable": storage.verify(),
                         "executionTime": time.time() - start_time
                     })
             
@@ -413,12 +457,12 @@ def create_app():
         
         # Versuche Datenbankverbindung zu überprüfen
         try:
-            db_status = verify_database_connection()
+            db_status = storage.verify()
             logger.info(f"Datenbank-Status: {'verbunden' if db_status else 'nicht verbunden'}")
             
-            # Versuche Tabellen zu erstellen, falls nötig und DB verfügbar ist
-            if db_status and db_imports_successful:
-                db_schema_ok = create_tables_if_not_exist()
+            # Schema sicherstellen (einmal pro Prozess), falls DB verfügbar ist
+            if db_status:
+                db_schema_ok = startup.ensure_schema()
                 if db_schema_ok:
                     logger.info("Datenbank-Schema erfolgreich überprüft/erstellt")
                 else:
@@ -443,7 +487,7 @@ def create_app():
             "database": {
                 "status": "connected" if db_status else "disconnected",
                 "schema": "ok" if db_schema_ok else "not_available",
-                "imports": "available" if db_imports_successful else "unavailable",
+                "backend": storage.name,
                 "error": connection_error
             },
             "environment": {
@@ -458,25 +502,30 @@ def create_app():
             "timestamp": datetime.now().isoformat()
         })
     
-    @app.route("/api/stepstone", methods=["GET"])
-    @timeout_handler(timeout_seconds=15)  # Timeout erhöht
-    def get_stepstone():
-        start_time = time.time()
-        logger.info("Stepstone API-Anfrage empfangen")
-        
-        title = request.args.get('title', '')
-        city = request.args.get('city', '')
-        
-        # Protokolliere die Anfrageparameter
-        logger.info(f"Stepstone-Suche: Titel={title}, Stadt={city}")
+    def search_live(source, title, city):
+        """
+        Live-Suche einer Quelle: Ergebnis-Cache oder Scraper, neue Treffer per Write-behind speichern
+
+        Gibt (jobs, error, error_type, cache_age, scrape_duration, db_available) zurück.
+        """
+        label = source.capitalize()
         
         # Starten des Scraping-Prozesses
         scrape_start = time.time()
         error = None
         error_type = None
+        cache_age = None
         
         try:
-            jobs = find_stepstone_jobs(title, city)
+            # Beliebte Suchen kommen aus dem Ergebnis-Cache (siehe precrawl.py)
+            cached = result_cache.lookup(source, title, city)
+            if cached:
+                jobs = cached["jobs"]
+                cache_age = cached["age"]
+            else:
+                jobs = SCRAPERS[source](title, city)
+                if not is_fallback_result(jobs):
+                    result_cache.store(source, title, city, jobs)
             
             # Prüfen, ob Fehlerinformationen in den Jobs enthalten sind
             if jobs and "error_info" in jobs[0]:
@@ -493,34 +542,53 @@ def create_app():
                         del job["error_info"]
                 
         except Exception as e:
-            logger.error(f"Fehler beim Stepstone-Scraping: {type(e).__name__}: {e}")
+            logger.error(f"Fehler beim {label}-Scraping: {type(e).__name__}: {e}")
             jobs = []
             error = f"{type(e).__name__}: {str(e)}"
             error_type = type(e).__name__
         
         scrape_duration = time.time() - scrape_start
-        logger.info(f"Stepstone-Scraping abgeschlossen in {scrape_duration:.2f}s, {len(jobs)} Jobs gefunden")
+        logger.info("%s-Scraping abgeschlossen in %.2fs, %d Jobs gefunden", label, scrape_duration, len(jobs))
         
         # Versuche, die Jobs in der Datenbank zu speichern
-        db_available = verify_database_connection()
-        if db_available and jobs:
+        db_available = storage.verify()
+        if db_available and jobs and cache_age is None:
             try:
-                save_new_jobs(jobs)
-                logger.info(f"Jobs in Datenbank gespeichert")
+                # Write-behind: gespeichert wird im Hintergrund, die Antwort wartet nicht darauf
+                queued = enqueue_jobs(jobs)
+                logger.info("%d Jobs zum Speichern übergeben", queued)
             except Exception as e:
                 logger.error(f"Fehler beim Speichern in Datenbank: {e}")
                 if not error:
                     error = f"Datenbankfehler: {type(e).__name__}: {str(e)}"
                     error_type = type(e).__name__
         
+        return jobs, error, error_type, cache_age, scrape_duration, db_available
+    
+    @app.route("/api/stepstone", methods=["GET"])
+    @timeout_handler(timeout_seconds=15)  # Timeout erhöht
+    def get_stepstone():
+        start_time = time.time()
+        
+        title = request.args.get('title', '')
+        city = request.args.get('city', '')
+        
+        # Protokolliere die Anfrageparameter
+        logger.info("Stepstone-Suche: Titel=%s, Stadt=%s", title, city)
+        
+        jobs, error, error_type, cache_age, scrape_duration, db_available = search_live("stepstone", title, city)
+        
         execution_time = time.time() - start_time
         response = {
             "jobs": jobs,
             "databaseAvailable": db_available,
             "timeoutOccurred": False,  # Wird durch den Decorator überschrieben, wenn nötig
             "executionTime": execution_time,
-            "scrapingTime": scrape_duration
+            "scrapingTime": scrape_duration,
+            "cached": cache_age is not None
         }
+        if cache_age is not None:
+            response["cacheAge"] = cache_age
         
         # Fehler in API-Antwort hinzufügen, wenn vorhanden
         if error:
@@ -528,63 +596,21 @@ def create_app():
         if error_type:
             response["errorType"] = error_type
         
-        logger.info(f"Stepstone-Route abgeschlossen in {execution_time:.2f}s")
+        logger.info("Stepstone-Route abgeschlossen in %.2fs", execution_time)
         return jsonify(response)
     
     @app.route("/api/monster", methods=["GET"])
     @timeout_handler(timeout_seconds=15)  # Timeout erhöht
     def get_monster():
         start_time = time.time()
-        logger.info("Monster API-Anfrage empfangen")
         
         title = request.args.get('title', '')
         city = request.args.get('city', '')
         
         # Protokolliere die Anfrageparameter
-        logger.info(f"Monster-Suche: Titel={title}, Stadt={city}")
+        logger.info("Monster-Suche: Titel=%s, Stadt=%s", title, city)
         
-        # Starten des Scraping-Prozesses
-        scrape_start = time.time()
-        error = None
-        error_type = None
-        
-        try:
-            jobs = find_monster_jobs(title, city)
-            
-            # Prüfen, ob Fehlerinformationen in den Jobs enthalten sind
-            if jobs and "error_info" in jobs[0]:
-                error = jobs[0]["error_info"]
-                # Extrahiere den Fehlertyp aus der Fehlermeldung
-                import re
-                error_type_match = re.search(r'Fehler beim Scraping: (\w+):', error)
-                if error_type_match:
-                    error_type = error_type_match.group(1)
-                
-                # Entferne die error_info aus den Jobs
-                for job in jobs:
-                    if "error_info" in job:
-                        del job["error_info"]
-                
-        except Exception as e:
-            logger.error(f"Fehler beim Monster-Scraping: {type(e).__name__}: {e}")
-            jobs = []
-            error = f"{type(e).__name__}: {str(e)}"
-            error_type = type(e).__name__
-        
-        scrape_duration = time.time() - scrape_start
-        logger.info(f"Monster-Scraping abgeschlossen in {scrape_duration:.2f}s, {len(jobs)} Jobs gefunden")
-        
-        # Versuche, die Jobs in der Datenbank zu speichern
-        db_available = verify_database_connection()
-        if db_available and jobs:
-            try:
-                save_new_jobs(jobs)
-                logger.info(f"Jobs in Datenbank gespeichert")
-            except Exception as e:
-                logger.error(f"Fehler beim Speichern in Datenbank: {e}")
-                if not error:
-                    error = f"Datenbankfehler: {type(e).__name__}: {str(e)}"
-                    error_type = type(e).__name__
+        jobs, error, error_type, cache_age, scrape_duration, db_available = search_live("monster", title, city)
         
         execution_time = time.time() - start_time
         response = {
@@ -592,8 +618,11 @@ def create_app():
             "databaseAvailable": db_available,
             "timeoutOccurred": False,  # Wird durch den Decorator überschrieben, wenn nötig
             "executionTime": execution_time,
-            "scrapingTime": scrape_duration
+            "scrapingTime": scrape_duration,
+            "cached": cache_age is not None
         }
+        if cache_age is not None:
+            response["cacheAge"] = cache_age
         
         # Fehler in API-Antwort hinzufügen, wenn vorhanden
         if error:
@@ -601,7 +630,66 @@ def create_app():
         if error_type:
             response["errorType"] = error_type
         
-        logger.info(f"Monster-Route abgeschlossen in {execution_time:.2f}s")
+        logger.info("Monster-Route abgeschlossen in %.2fs", execution_time)
+        return jsonify(response)
+    
+    @app.route("/api/search", methods=["GET"])
+    @timeout_handler(timeout_seconds=30)
+    def search_sources():
+        """
+        Live-Suche über mehrere Quellen mit zusammengeführter Antwort
+
+        Dieselbe Stelle bei Stepstone und Monster erscheint nur einmal; die
+        anderen Fundstellen stehen unter "duplicates" (dedupe=0 schaltet das ab).
+        """
+        start_time = time.time()
+        
+        title = request.args.get('title', '')
+        city = request.args.get('city', '')
+        sources = [name.strip() for name in request.args.get('sources', ','.join(SCRAPERS)).split(',') if name.strip()]
+        dedupe = request.args.get('dedupe', '1') != '0'
+        
+        unknown = [name for name in sources if name not in SCRAPERS]
+        if not sources or unknown:
+            return jsonify({
+                "error": f"Unbekannte Quelle '{', '.join(unknown)}', erlaubt: {', '.join(SCRAPERS)}",
+                "errorType": "ValueError"
+            }), 400
+        
+        logger.info("Suche über %s: Titel=%s, Stadt=%s", ", ".join(sources), title, city)
+        
+        jobs = []
+        errors = {}
+        cached = {}
+        db_available = True
+        for source in sources:
+            source_jobs, error, error_type, cache_age, _, available = search_live(source, title, city)
+            # Kopien: die Originale liegen bereits in der Write-behind-Queue
+            jobs.extend(dict(job) for job in source_jobs)
+            db_available = db_available and available
+            cached[source] = cache_age is not None
+            if error:
+                errors[source] = {"error": error, "errorType": error_type}
+        
+        found = len(jobs)
+        if dedupe:
+            jobs = dedupe_jobs(jobs)
+        
+        execution_time = time.time() - start_time
+        response = {
+            "jobs": jobs,
+            "databaseAvailable": db_available,
+            "timeoutOccurred": False,  # Wird durch den Decorator überschrieben, wenn nötig
+            "executionTime": execution_time,
+            "sources": sources,
+            "cached": cached,
+            "duplicatesMerged": found - len(jobs)
+        }
+        if errors:
+            response["errors"] = errors
+        
+        logger.info("Suche abgeschlossen in %.2fs: %d Jobs, %d Duplikate zusammengefasst",
+                    execution_time, len(jobs), found - len(jobs))
         return jsonify(response)
     
     @app.route('/api/db', methods=['GET'])
@@ -612,11 +700,20 @@ def create_app():
         title = request.args.get('title', '')
         city = request.args.get('city', '')
         source = request.args.get('source', '')
-        
-        logger.info(f"Datenbank-Abfrage: Titel={title}, Stadt={city}, Quelle={source}")
+        # Volltext-Modus: q=<Suchbegriffe> liefert nach Relevanz sortierte Treffer
+        query = request.args.get('q', '')
+        # Keyset-Pagination: limit = Seitengröße, cursor = nextCursor der Vorseite
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        cursor = request.args.get('cursor') or None
+        # Zeitfenster in Tagen (Standard: JOBS_QUERY_WINDOW_DAYS, 0 = alle Partitionen)
+        days = request.args.get('days', type=int)
+        # dedupe=1 fasst quellenübergreifende Duplikate über die gespeicherte cluster_id zusammen
+        dedupe = request.args.get('dedupe') == '1'
+        
+        logger.info("Datenbank-Abfrage: Titel=%s, Stadt=%s, Quelle=%s, Suche=%s", title, city, source, query)
         
         # Versuche, die Jobs aus der Datenbank zu laden
-        db_available = verify_database_connection()
+        db_available = storage.verify()
         if not db_available:
             return jsonify({
                 "jobs": [],
@@ -626,15 +723,30 @@ def create_app():
             })
         
         try:
-            jobs = get_jobs_by_criteria(title, city, source)
+            page = storage.query_jobs(title, city, source, query, page_size=limit, cursor=cursor, days=days)
+            if dedupe:
+                page["jobs"] = dedupe_jobs(page["jobs"])
             execution_time = time.time() - start_time
-            logger.info(f"{len(jobs)} Jobs aus Datenbank abgerufen in {execution_time:.2f}s")
+            logger.info("%d Jobs aus Datenbank abgerufen in %.2fs", len(page['jobs']), execution_time)
             
             return jsonify({
-                "jobs": jobs,
+                "jobs": page["jobs"],
+                "mode": "fulltext" if query else "filter",
+                "nextCursor": page["nextCursor"],
+                "estimatedTotal": page["estimatedTotal"],
+                "pageSize": page["pageSize"],
                 "databaseAvailable": True,
                 "executionTime": execution_time
             })
+        except ValueError as e:
+            logger.warning(f"Ungültige Paginierungsparameter: {e}")
+            return jsonify({
+                "jobs": [],
+                "databaseAvailable": True,
+                "error": str(e),
+                "errorType": "ValueError",
+                "executionTime": time.time() - start_time
+            }), 400
         except Exception as e:
             logger.error(f"Fehler beim Abrufen aus Datenbank: {e}")
             return jsonify({
@@ -643,6 +755,182 @@ def create_app():
                 "error": str(e),
                 "executionTime": time.time() - start_time
             })
+    
+    @app.route('/api/stats', methods=['GET'])
+    def get_stats():
+        """Vorberechnete Job-Anzahl nach Quelle, Stadt oder normalisiertem Titel"""
+        start_time = time.time()
+        
+        by = request.args.get('by', 'source')
+        source = request.args.get('source', '')
+        days = request.args.get('days', type=int)
+        limit = request.args.get('limit', STATS_DEFAULT_LIMIT, type=int)
+        
+        try:
+            counts = storage.job_stats(by, source, days, limit)
+        except ValueError as e:
+            return jsonify({
+                "counts": [],
+                "error": str(e),
+                "errorType": "ValueError",
+                "executionTime": time.time() - start_time
+            }), 400
+        
+        return jsonify({
+            "by": by,
+            "counts": counts,
+            "executionTime": time.time() - start_time
+        })
+    
+    @app.route('/api/admin/import', methods=['POST'])
+    @require_admin
+    def admin_import():
+        """Bulk-Import eines CSV/NDJSON-Feeds (optional gzip) aus dem Request-Body"""
+        start_time = time.time()
+        
+        if storage.name != "postgres":
+            return jsonify({
+                "error": f"Bulk-Import benötigt das Postgres-Backend (aktiv: {storage.name})",
+                "executionTime": time.time() - start_time
+            }), 501
+        
+        fmt = request.args.get('format') or None
+        source = request.args.get('source', 'import')
+        dry_run = request.args.get('dryRun') == '1'
+        
+        try:
+            # request.stream liest den Body stückweise, die Datei liegt nie ganz im Speicher
+            summary = import_jobs(request.stream, fmt=fmt, name=request.args.get('filename'),
+                                  default_source=source, dry_run=dry_run)
+        except ValueError as e:
+            return jsonify({
+                "error": str(e),
+                "errorType": "ValueError",
+                "executionTime": time.time() - start_time
+            }), 400
+        except Exception as e:
+            logger.error(f"Fehler beim Bulk-Import: {type(e).__name__}: {e}")
+            return jsonify({
+                "error": f"{type(e).__name__}: {str(e)}",
+                "errorType": type(e).__name__,
+                "executionTime": time.time() - start_time
+            }), 500
+        
+        summary["executionTime"] = time.time() - start_time
+        return jsonify(summary)
+    
+    @app.route('/api/admin/crawl-tasks', methods=['POST'])
+    @require_admin
+    def admin_crawl_tasks():
+        """Legt Crawl-Aufträge für die Worker an: {"queries": [{"source", "title", "city"}, ...]}"""
+        start_time = time.time()
+        
+        if storage.name != "postgres":
+            return jsonify({
+                "error": f"Crawl-Aufträge benötigen das Postgres-Backend (aktiv: {storage.name})",
+                "executionTime": time.time() - start_time
+            }), 501
+        
+        payload = request.get_json(silent=True) or {}
+        try:
+            queries = [(q.get("source"), q.get("title"), q.get("city")) for q in payload.get("queries", [])]
+            created = enqueue_tasks(queries, max_jobs=int(payload.get("maxJobs", 3)),
+                                    priority=int(payload.get("priority", 0)))
+        except (ValueError, TypeError, AttributeError) as e:
+            return jsonify({
+                "error": str(e),
+                "errorType": "ValueError",
+                "executionTime": time.time() - start_time
+            }), 400
+        
+        return jsonify({
+            "created": created,
+            "skipped": len(queries) - created,
+            "executionTime": time.time() - start_time
+        })
+    
+    @app.route('/api/admin/profile', methods=['POST'])
+    @require_admin
+    def start_profile():
+        """Startet ein Profil aller Threads für ?seconds=N (Standard 10)"""
+        start_time = time.time()
+        seconds = request.args.get('seconds', 10, type=int)
+        interval = request.args.get('interval', PROFILE_INTERVAL_MS, type=float)
+        try:
+            start_process_profile(seconds, interval)
+        except ValueError as e:
+            return jsonify({
+                "error": str(e),
+                "errorType": "ValueError",
+                "executionTime": time.time() - start_time
+            }), 400
+        except RuntimeError as e:
+            return jsonify({
+                "error": str(e),
+                "errorType": "RuntimeError",
+                "executionTime": time.time() - start_time
+            }), 409
+        
+        logger.info(f"Prozess-Profil für {seconds}s gestartet")
+        return jsonify({"status": "running", "seconds": seconds, "intervalMs": interval}), 202
+    
+    @app.route('/api/admin/profile', methods=['GET'])
+    @require_admin
+    def get_profile():
+        """Ergebnis des zuletzt gestarteten Prozess-Profils"""
+        state = process_profile()
+        if state is None:
+            return jsonify({"error": "Es wurde noch kein Profil gestartet"}), 404
+        if state["running"]:
+            return jsonify({"status": "running", "seconds": state["seconds"]}), 202
+        return profile_response(state["profiler"])
+    
+    @app.route('/api/db/stream', methods=['GET'])
+    def stream_db_jobs():
+        """Streamt alle passenden Jobs als NDJSON oder CSV mit konstantem Speicher"""
+        title = request.args.get('title', '')
+        city = request.args.get('city', '')
+        source = request.args.get('source', '')
+        fmt = request.args.get('format', 'ndjson').lower()
+        days = request.args.get('days', type=int)
+        
+        if fmt not in STREAM_FORMATS:
+            return jsonify({
+                "error": f"Unbekanntes Format '{fmt}', erlaubt: {', '.join(STREAM_FORMATS)}",
+                "errorType": "ValueError"
+            }), 400
+        
+        logger.info(f"Datenbank-Stream ({fmt}): Titel={title}, Stadt={city}, Quelle={source}")
+        
+        rows = storage.stream_jobs(title, city, source, days=days)
+        response = Response(format_chunks(rows, fmt), mimetype=STREAM_FORMATS[fmt])
+        if fmt == "csv":
+            response.headers["Content-Disposition"] = "attachment; filename=jobs.csv"
+        return response
+    
+    @app.route('/api/export', methods=['GET'])
+    def export_db_jobs():
+        """Exportiert alle passenden Jobs als NDJSON, CSV (optional gzip) oder Parquet"""
+        title = request.args.get('title', '')
+        city = request.args.get('city', '')
+        source = request.args.get('source', '')
+        fmt = request.args.get('format', 'ndjson').lower()
+        compress = request.args.get('gzip', '0').lower() in ('1', 'true', 'yes')
+        days = request.args.get('days', type=int)
+        
+        try:
+            chunks = export_chunks(storage, fmt, compress, title, city, source, days)
+        except ValueError as e:
+            return jsonify({"error": str(e), "errorType": "ValueError"}), 400
+        except RuntimeError as e:
+            return jsonify({"error": str(e), "errorType": "RuntimeError"}), 501
+        
+        logger.info(f"Export ({fmt}, gzip={compress}): Titel={title}, Stadt={city}, Quelle={source}")
+        
+        mimetype = "application/gzip" if compress and fmt != "parquet" else EXPORT_FORMATS[fmt]
+        response = Response(chunks, mimetype=mimetype)
+        response.headers["Content-Disposition"] = f"attachment; filename={export_filename(fmt, compress)}"
+        return response
             
     return app
 
@@ -658,20 +946,7 @@ def create_fallback_index(app):
 
 # Erstelle die App bei Import
 app = create_app()
-
-# Versuche Tabellen zu erstellen, falls DB verfügbar ist
-if db_imports_successful:
-    try:
-        logger.info("Prüfe Datenbankverbindung und Schema beim Start")
-        db_ok = verify_database_connection()
-        if db_ok:
-            schema_ok = create_tables_if_not_exist()
-            logger.info(f"Datenbank-Schema-Status: {'OK' if schema_ok else 'Fehler'}")
-        else:
-            logger.warning("Keine Datenbankverbindung beim Start")
-    except Exception as e:
-        logger.error(f"Fehler bei der Datenbankinitialisierung: {e}")
-        logger.warning("Anwendung läuft im eingeschränkten Modus ohne Datenbankfunktionalität")
+startup.mark_phase("create_app")
 
 # Wenn diese Datei direkt ausgeführt wird
 if __name__ == "__main__":
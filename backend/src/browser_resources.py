@@ -0,0 +1,231 @@
+"""Ressourcenverbrauch der Browser-Sitzungen (chromedriver + Chrome-Prozesse).
+
+get_system_info() sieht nur den Python-Prozess; jede Selenium-Sitzung startet
+aber chromedriver, Chrome und mehrere Renderer-Prozesse. Während
+load_page_with_selenium misst ein Hintergrund-Thread alle
+``BROWSER_SAMPLE_INTERVAL_MS`` den Prozessbaum unterhalb von chromedriver:
+
+- RSS (Summe über den Baum; geteilte Seiten zählen mehrfach, also eine obere
+  Schranke - für die Größe von Containern die vorsichtige Zahl)
+- CPU-Zeit (bei frisch gestarteten Browsern inkl. Start, bei Browsern aus dem
+  DriverPool nur der Zuwachs während des Ladens)
+- offene Dateideskriptoren und Anzahl der Prozesse
+
+Spitzenwerte je Ladevorgang gehen in die Histogramme ``jobbig_browser_*`` auf
+/metrics, als Attribute an den ``page_load``-Span, in die Summe der laufenden
+Anfrage (Header ``X-Browser-Usage``) und in die letzten Sitzungen unter
+/diagnostics. Ohne psutil wird nichts gemessen.
+"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from .metrics import BROWSER_CPU_SECONDS, BROWSER_OPEN_FDS, BROWSER_PEAK_RSS_BYTES, BROWSER_PROCESSES
+from .tracing import annotate, current_trace_id
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+# Abstand der Messungen während eines Ladevorgangs
+BROWSER_SAMPLE_INTERVAL_MS = int(os.environ.get("BROWSER_SAMPLE_INTERVAL_MS", "250"))
+
+# Anzahl der Sitzungen, die /diagnostics einzeln auflistet
+BROWSER_RECENT_SESSIONS = int(os.environ.get("BROWSER_RECENT_SESSIONS", "20"))
+
+# Summen der laufenden Anfrage (siehe begin_request)
+_request_usage = contextvars.ContextVar("jobbig_browser_usage", default=None)
+
+_recent = deque(maxlen=BROWSER_RECENT_SESSIONS)
+_totals = {"sessions": 0, "cpu_seconds": 0.0, "max_peak_rss_bytes": 0, "max_open_fds": 0, "max_processes": 0}
+_lock = threading.Lock()
+
+
+def process_tree(pid):
+    """Prozess pid und alle Nachfahren als psutil.Process-Liste (leer, wenn pid nicht mehr läuft)"""
+    import psutil
+
+    try:
+        root = psutil.Process(pid)
+        return [root] + root.children(recursive=True)
+    except psutil.Error:
+        return []
+
+
+def driver_pid(driver):
+    """PID des chromedriver-Prozesses einer Selenium-Sitzung oder None"""
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
+
+
+class SessionUsage:
+    """Misst den Prozessbaum einer Browser-Sitzung, bis finish() aufgerufen wird"""
+
+    def __init__(self, pid, host, include_startup=False, interval_ms=BROWSER_SAMPLE_INTERVAL_MS):
+        self.pid = pid
+        self.host = host
+        self.interval = interval_ms / 1000
+        self.peak_rss = 0
+        self.peak_fds = 0
+        self.peak_processes = 0
+        self.samples = 0
+        # PID -> CPU-Sekunden (user + system), zuletzt bzw. zu Beginn gemessen
+        self.cpu = {}
+        self.baseline = {}
+        self.include_startup = include_startup
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="browser-usage", daemon=True)
+
+    def _sample(self):
+        import psutil
+
+        processes = process_tree(self.pid)
+        rss = fds = 0
+        for process in processes:
+            try:
+                with process.oneshot():
+                    rss += process.memory_info().rss
+                    fds += process.num_fds()
+                    times = process.cpu_times()
+                    # Kinder, die zwischen zwei Messungen enden, fehlen in der CPU-Zeit
+                    self.cpu[process.pid] = times.user + times.system
+            except psutil.Error:
+                continue
+        self.peak_rss = max(self.peak_rss, rss)
+        self.peak_fds = max(self.peak_fds, fds)
+        self.peak_processes = max(self.peak_processes, len(processes))
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._sample()
+        if not self.include_startup:
+            self.baseline = dict(self.cpu)
+        self._thread.start()
+        return self
+
+    @property
+    def cpu_seconds(self):
+        return sum(max(0.0, value - self.baseline.get(pid, 0.0)) for pid, value in self.cpu.items())
+
+    def finish(self):
+        """Beendet die Messung und verbucht das Ergebnis; gibt es als Dict zurück"""
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        usage = {
+            "host": self.host,
+            "trace_id": current_trace_id(),
+            "duration_seconds": round(time.perf_counter() - self.started, 3),
+            "peak_rss_mb": round(self.peak_rss / (1024 * 1024), 1),
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            "peak_open_fds": self.peak_fds,
+            "peak_processes": self.peak_processes,
+            "samples": self.samples,
+            "finished_at": time.time(),
+        }
+        record_usage(self, usage)
+        return usage
+
+
+def track_session(driver, host, include_startup=False):
+    """
+    Startet die Messung für den Browser driver; gibt SessionUsage oder None zurück
+
+    include_startup: CPU-Zeit seit dem Start des Browsers mitzählen (frisch gestartete Sitzung).
+    """
+    pid = driver_pid(driver)
+    if pid is None:
+        return None
+    try:
+        return SessionUsage(pid, host, include_startup=include_startup).start()
+    except ImportError:
+        return None
+
+
+def record_usage(session, usage):
+    BROWSER_PEAK_RSS_BYTES.observe(session.peak_rss, host=session.host)
+    BROWSER_CPU_SECONDS.observe(session.cpu_seconds, host=session.host)
+    BROWSER_OPEN_FDS.observe(session.peak_fds, host=session.host)
+    BROWSER_PROCESSES.observe(session.peak_processes, host=session.host)
+    annotate(browser_peak_rss_mb=usage["peak_rss_mb"], browser_cpu_seconds=usage["cpu_seconds"],
+             browser_open_fds=usage["peak_open_fds"], browser_processes=usage["peak_processes"])
+
+    with _lock:
+        _recent.append(usage)
+        _totals["sessions"] += 1
+        _totals["cpu_seconds"] += session.cpu_seconds
+        _totals["max_peak_rss_bytes"] = max(_totals["max_peak_rss_bytes"], session.peak_rss)
+        _totals["max_open_fds"] = max(_totals["max_open_fds"], session.peak_fds)
+        _totals["max_processes"] = max(_totals["max_processes"], session.peak_processes)
+
+    request_usage = _request_usage.get()
+    if request_usage is not None:
+        request_usage["sessions"] += 1
+        request_usage["cpu_seconds"] += session.cpu_seconds
+        request_usage["peak_rss_mb"] = max(request_usage["peak_rss_mb"], usage["peak_rss_mb"])
+        request_usage["peak_open_fds"] = max(request_usage["peak_open_fds"], session.peak_fds)
+
+    logger.info("Browser-Sitzung %s: RSS max %.1f MB, CPU %.2fs, FDs max %d, Prozesse max %d",
+                session.host, usage["peak_rss_mb"], session.cpu_seconds, session.peak_fds,
+                session.peak_processes)
+
+
+def begin_request():
+    """Beginnt die Summe für die aktuelle Anfrage; Token für end_request"""
+    return _request_usage.set({"sessions": 0, "cpu_seconds": 0.0, "peak_rss_mb": 0.0, "peak_open_fds": 0})
+
+
+def end_request(token):
+    """Schließt die Summe aus begin_request; None, wenn die Anfrage keinen Browser benutzt hat"""
+    usage = _request_usage.get()
+    try:
+        _request_usage.reset(token)
+    except ValueError:
+        _request_usage.set(None)
+    if not usage or not usage["sessions"]:
+        return None
+    usage["cpu_seconds"] = round(usage["cpu_seconds"], 3)
+    return usage
+
+
+def usage_header(usage):
+    """Wert für X-Browser-Usage, z.B. sessions=2, peak_rss_mb=812.4, cpu_seconds=6.120, peak_open_fds=311"""
+    return ", ".join(f"{key}={value}" for key, value in usage.items())
+
+
+def usage_info():
+    """Summen und die letzten Sitzungen für /diagnostics"""
+    with _lock:
+        recent = list(_recent)
+        totals = dict(_totals)
+    totals["max_peak_rss_mb"] = round(totals.pop("max_peak_rss_bytes") / (1024 * 1024), 1)
+    totals["cpu_seconds"] = round(totals["cpu_seconds"], 3)
+    if recent:
+        totals["recent_avg_peak_rss_mb"] = round(sum(item["peak_rss_mb"] for item in recent) / len(recent), 1)
+        totals["recent_avg_cpu_seconds"] = round(sum(item["cpu_seconds"] for item in recent) / len(recent), 3)
+    totals["recent"] = recent[::-1]
+    return totals
+
+
+def child_processes_info():
+    """Speicher aller Kindprozesse dieses Prozesses (v.a. Browser) für get_system_info"""
+    import psutil
+
+    processes = process_tree(os.getpid())[1:]
+    rss = 0
+    for process in processes:
+        try:
+            rss += process.memory_info().rss
+        except psutil.Error:
+            continue
+    return {"count": len(processes), "rss_mb": round(rss / (1024 * 1024), 2)}
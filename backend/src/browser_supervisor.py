@@ -0,0 +1,330 @@
+"""Überwachung der gestarteten Browser: Budgets je Sitzung und verwaiste Prozesse.
+
+Bricht der gunicorn-Timeout eine Suche ab oder stürzt sie vor
+``driver.quit()`` ab, bleiben chromedriver und Chrome als Waisen zurück und
+belegen dauerhaft Speicher im Container. Der Supervisor
+
+- merkt sich jeden Browser, den get_selenium_browser startet (PID von
+  chromedriver, darunter Chrome mit allen Renderern)
+- beendet alle ``BROWSER_SUPERVISOR_INTERVAL`` Sekunden Sitzungen, deren
+  Prozessbaum mehr als ``BROWSER_MEMORY_BUDGET_MB`` belegt oder die länger
+  als ``BROWSER_SESSION_MAX_SECONDS`` an einer Seite hängen
+- räumt beim Start und danach alle ``BROWSER_REAP_INTERVAL`` Sekunden
+  verwaiste Browser ab: chromedriver bzw. per WebDriver gestartetes Chrome
+  desselben Benutzers, das von init oder dem gunicorn-Master adoptiert wurde
+  (der startende Worker lebt nicht mehr)
+- beendet nach ``driver.quit()`` übrig gebliebene Prozesse (release_browser)
+
+Beendete Bäume und der dabei freigegebene Speicher (RSS vor dem Beenden)
+stehen je Grund auf /metrics und unter /diagnostics. Ohne psutil ist der
+Supervisor ausgeschaltet; ``driver.quit()`` wird trotzdem aufgerufen.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from .browser_resources import driver_pid, process_tree
+from .metrics import BROWSER_RECLAIMED_BYTES, BROWSER_TREES_KILLED
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+# Speicherbudget je Browser-Sitzung (Summe RSS des Prozessbaums); 0 = ohne Grenze
+BROWSER_MEMORY_BUDGET_MB = int(os.environ.get("BROWSER_MEMORY_BUDGET_MB", "1536"))
+
+# Zeitbudget für einen einzelnen Seitenaufruf in Sekunden; 0 = ohne Grenze
+BROWSER_SESSION_MAX_SECONDS = int(os.environ.get("BROWSER_SESSION_MAX_SECONDS", "120"))
+
+# Prüfintervall für die Budgets in Sekunden
+BROWSER_SUPERVISOR_INTERVAL = float(os.environ.get("BROWSER_SUPERVISOR_INTERVAL", "5"))
+
+# Intervall der Suche nach verwaisten Browsern in Sekunden (durchsucht alle Prozesse)
+BROWSER_REAP_INTERVAL = float(os.environ.get("BROWSER_REAP_INTERVAL", "60"))
+
+# Jüngere Prozesse gelten nie als verwaist (Start läuft evtl. noch)
+BROWSER_ORPHAN_MIN_AGE = float(os.environ.get("BROWSER_ORPHAN_MIN_AGE", "30"))
+
+# Wartezeit zwischen SIGTERM und SIGKILL
+KILL_GRACE_SECONDS = 3
+
+# Anzahl der Eingriffe, die /diagnostics einzeln auflistet
+RECENT_KILLS = 20
+
+
+def _is_browser(process):
+    """chromedriver oder ein per WebDriver gestartetes Chrome (Hauptprozess, kein Renderer)"""
+    name = (process.info.get("name") or "").lower()
+    if "chromedriver" in name:
+        return True
+    if "chrome" not in name and "chromium" not in name:
+        return False
+    cmdline = process.info.get("cmdline") or []
+    return any(arg.startswith("--remote-debugging-port") for arg in cmdline) \
+        and not any(arg.startswith("--type=") for arg in cmdline)
+
+
+def _tree_rss(processes):
+    import psutil
+
+    rss = 0
+    for process in processes:
+        try:
+            rss += process.memory_info().rss
+        except psutil.Error:
+            continue
+    return rss
+
+
+def kill_tree(processes, reason, label=""):
+    """
+    Beendet die Prozesse (SIGTERM, nach KILL_GRACE_SECONDS SIGKILL) und verbucht sie
+
+    Gibt den freigegebenen Speicher in Bytes zurück (RSS vor dem Beenden).
+    """
+    import psutil
+
+    if not processes:
+        return 0
+    rss = _tree_rss(processes)
+    for process in processes:
+        try:
+            process.terminate()
+        except psutil.Error:
+            continue
+    _, alive = psutil.wait_procs(processes, timeout=KILL_GRACE_SECONDS)
+    for process in alive:
+        try:
+            process.kill()
+        except psutil.Error:
+            continue
+    if alive:
+        psutil.wait_procs(alive, timeout=KILL_GRACE_SECONDS)
+
+    BROWSER_TREES_KILLED.inc(reason=reason)
+    BROWSER_RECLAIMED_BYTES.inc(rss, reason=reason)
+    supervisor = _supervisor
+    if supervisor is not None:
+        supervisor.record_kill(reason, label, len(processes), rss)
+    logger.warning("Browser-Prozesse beendet (%s%s): %d Prozesse, %.1f MB freigegeben",
+                   reason, f", {label}" if label else "", len(processes), rss / (1024 * 1024))
+    return rss
+
+
+class BrowserSupervisor:
+    """Registry der gestarteten Browser mit Hintergrund-Thread für Budgets und Waisen"""
+
+    def __init__(self, memory_budget_mb=BROWSER_MEMORY_BUDGET_MB, max_seconds=BROWSER_SESSION_MAX_SECONDS,
+                 interval=BROWSER_SUPERVISOR_INTERVAL, reap_interval=BROWSER_REAP_INTERVAL,
+                 orphan_min_age=BROWSER_ORPHAN_MIN_AGE):
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.max_seconds = max_seconds
+        self.interval = interval
+        self.reap_interval = reap_interval
+        self.orphan_min_age = orphan_min_age
+        # chromedriver-PID -> {"started": ..., "busy_since": ...}
+        self.sessions = {}
+        self.kills = deque(maxlen=RECENT_KILLS)
+        self.totals = {}
+        self.last_reap = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, driver):
+        pid = driver_pid(driver)
+        if pid is not None:
+            with self._lock:
+                self.sessions[pid] = {"started": time.monotonic(), "busy_since": None}
+        return pid
+
+    def begin_use(self, driver):
+        """Markiert den Beginn eines Seitenaufrufs (Zeitbudget)"""
+        pid = driver_pid(driver)
+        with self._lock:
+            if pid in self.sessions:
+                self.sessions[pid]["busy_since"] = time.monotonic()
+
+    def end_use(self, driver):
+        pid = driver_pid(driver)
+        with self._lock:
+            if pid in self.sessions:
+                self.sessions[pid]["busy_since"] = None
+
+    def unregister(self, pid):
+        with self._lock:
+            self.sessions.pop(pid, None)
+
+    def record_kill(self, reason, label, processes, rss):
+        with self._lock:
+            total = self.totals.setdefault(reason, {"trees": 0, "processes": 0, "reclaimed_mb": 0.0})
+            total["trees"] += 1
+            total["processes"] += processes
+            total["reclaimed_mb"] = round(total["reclaimed_mb"] + rss / (1024 * 1024), 1)
+            self.kills.append({
+                "reason": reason, "label": label, "processes": processes,
+                "reclaimed_mb": round(rss / (1024 * 1024), 1), "at": time.time(),
+            })
+
+    def check_budgets(self):
+        """Beendet Sitzungen über dem Speicher- oder Zeitbudget; gibt die Anzahl zurück"""
+        now = time.monotonic()
+        with self._lock:
+            sessions = list(self.sessions.items())
+        killed = 0
+        for pid, state in sessions:
+            processes = process_tree(pid)
+            if not processes:
+                self.unregister(pid)
+                continue
+            busy_since = state["busy_since"]
+            reason = None
+            if self.max_seconds and busy_since is not None and now - busy_since > self.max_seconds:
+                reason = "time_budget"
+                label = f"pid {pid}, {now - busy_since:.0f}s an einer Seite"
+            elif self.memory_budget:
+                rss = _tree_rss(processes)
+                if rss > self.memory_budget:
+                    reason = "memory_budget"
+                    label = f"pid {pid}, {rss / (1024 * 1024):.0f} MB"
+            if reason:
+                # Der Seitenaufruf bricht mit einem WebDriver-Fehler ab und liefert None
+                kill_tree(processes, reason, label)
+                self.unregister(pid)
+                killed += 1
+        return killed
+
+    def find_orphans(self, min_age=None):
+        """Verwaiste Browser-Bäume desselben Benutzers, die keiner registrierten Sitzung gehören"""
+        import psutil
+
+        min_age = self.orphan_min_age if min_age is None else min_age
+        # Waisen werden von init bzw. (als PID 1 im Container) vom gunicorn-Master adoptiert
+        adopters = {1, os.getppid()}
+        uid = os.getuid()
+        with self._lock:
+            own = set(self.sessions)
+        own_tree = {process.pid for pid in own for process in process_tree(pid)}
+        now = time.time()
+        orphans = []
+        for process in psutil.process_iter(["pid", "ppid", "name", "cmdline", "uids", "create_time"]):
+            info = process.info
+            if info["pid"] in own_tree or info["ppid"] not in adopters:
+                continue
+            if info["uids"] is None or info["uids"].real != uid:
+                continue
+            if now - (info["create_time"] or now) < min_age or not _is_browser(process):
+                continue
+            orphans.append(process)
+        return orphans
+
+    def reap_orphans(self, min_age=None):
+        """Beendet verwaiste Browser samt Kindern; gibt die freigegebenen Bytes zurück"""
+        reclaimed = 0
+        for orphan in self.find_orphans(min_age):
+            reclaimed += kill_tree(process_tree(orphan.pid), "orphan", f"{orphan.info['name']} pid {orphan.pid}")
+        self.last_reap = time.time()
+        return reclaimed
+
+    def _run(self):
+        # Beim Start sofort aufräumen, auch ganz junge Waisen (z.B. vom gerade ersetzten Worker)
+        next_reap = time.monotonic()
+        first = True
+        while True:
+            try:
+                if time.monotonic() >= next_reap:
+                    self.reap_orphans(min_age=0 if first else None)
+                    next_reap = time.monotonic() + self.reap_interval
+                    first = False
+                self.check_budgets()
+            except Exception as e:
+                logger.warning(f"Browser-Supervisor: {type(e).__name__}: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="browser-supervisor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def info(self):
+        with self._lock:
+            return {
+                "active_sessions": len(self.sessions),
+                "memory_budget_mb": self.memory_budget // (1024 * 1024),
+                "max_seconds": self.max_seconds,
+                "killed": {reason: dict(total) for reason, total in self.totals.items()},
+                "recent": list(self.kills)[::-1],
+                "last_orphan_scan": self.last_reap,
+            }
+
+
+_supervisor = None
+_supervisor_lock = threading.Lock()
+
+
+def start_supervisor():
+    """Startet den Supervisor dieses Prozesses (einmalig); None ohne psutil"""
+    global _supervisor
+    with _supervisor_lock:
+        if _supervisor is None:
+            try:
+                import psutil  # noqa: F401
+            except ImportError:
+                logger.warning("psutil nicht verfügbar - Browser-Supervisor deaktiviert")
+                return None
+            _supervisor = BrowserSupervisor().start()
+        return _supervisor
+
+
+def register_browser(driver):
+    if _supervisor is not None:
+        _supervisor.register(driver)
+
+
+def begin_use(driver):
+    if _supervisor is not None:
+        _supervisor.begin_use(driver)
+
+
+def end_use(driver):
+    if _supervisor is not None:
+        _supervisor.end_use(driver)
+
+
+def release_browser(driver):
+    """
+    driver.quit() und danach übrig gebliebene Prozesse des Baums beenden
+
+    Chrome hängt sich nach quit() gelegentlich ab und läuft ohne chromedriver weiter.
+    """
+    pid = driver_pid(driver)
+    # Baum vor quit() merken: danach hängt übrig gebliebenes Chrome nicht mehr unter chromedriver
+    processes = process_tree(pid) if pid is not None and _supervisor is not None else []
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.warning(f"Browser konnte nicht beendet werden: {type(e).__name__}: {e}")
+    if pid is None or _supervisor is None:
+        return
+    _supervisor.unregister(pid)
+
+    import psutil
+
+    _, alive = psutil.wait_procs(processes, timeout=KILL_GRACE_SECONDS)
+    if alive:
+        kill_tree(alive, "quit_leftover", f"pid {pid}")
+
+
+def supervisor_info():
+    """Zustand und Eingriffe des Supervisors für /diagnostics"""
+    if _supervisor is None:
+        return {"enabled": False}
+    return dict(_supervisor.info(), enabled=True)
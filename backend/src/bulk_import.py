@@ -0,0 +1,451 @@
+"""Bulk-Import externer Job-Feeds (CSV/NDJSON, optional gzip) per COPY.
+
+Die Datei wird zeilenweise gelesen, validiert und normalisiert und direkt in
+``COPY ... FROM STDIN`` einer temporären Staging-Tabelle gestreamt - der
+Speicherbedarf ist unabhängig von der Dateigröße. Danach werden die Zeilen in
+einem Schritt per URL abgeglichen:
+
+- URL bereits vorhanden: Titel, Firma und Ort der neuesten Zeile werden
+  aktualisiert, die Historie bleibt unverändert
+- URL neu: der Job wird eingefügt (Partition nach scraped_at) und gezählt
+
+MinHash-Signatur und LSH-Bänder werden schon beim Einlesen berechnet und mit
+in die Staging-Tabelle kopiert; zugeordnet wird wie beim Speichern zum
+ähnlichsten bekannten Cluster im Standard-Zeitfenster.
+
+Kommt eine URL mehrfach in der Datei vor, gewinnt die letzte Zeile.
+
+    python -m src.bulk_import feed.csv.gz --source partnerfeed
+    zcat feed.ndjson.gz | python -m src.bulk_import - --format ndjson
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import logging
+import math
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from .database import LATEST_ROW_CONDITION, get_database
+from .dedupe import NUM_PERM, SIMILARITY_THRESHOLD, cluster_id_for, fingerprint_job
+from .partitions import RETENTION_MONTHS, add_months, ensure_partition, month_start, query_window_start
+from .stats import STATS_MONTH_SQL, record_stats_counts, stats_key
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ["csv", "ndjson"]
+
+# Alternative Feldnamen in externen Feeds
+FIELD_ALIASES = {
+    "title": ["title", "job_title", "jobtitle", "titel"],
+    "company": ["company", "employer", "company_name", "firma"],
+    "location": ["location", "city", "ort", "stadt"],
+    "url": ["url", "link", "job_url"],
+    "source": ["source", "quelle"],
+    "scraped_at": ["scraped_at", "posted_at", "date", "datum"],
+}
+
+# Spaltenbreite der Jobs-Tabelle (VARCHAR(200))
+MAX_FIELD_LENGTH = 200
+
+# Alle wie viele gelesenen Zeilen ein Fortschritt gemeldet wird
+PROGRESS_EVERY = 50000
+
+# Zeichen, die pro read() an COPY übergeben werden
+COPY_CHUNK_SIZE = 1 << 16
+
+# Anzahl der gemeldeten Einzelfehler in der Zusammenfassung
+MAX_REPORTED_ERRORS = 20
+
+# Schlüssel für pg_advisory_xact_lock, damit Importe nacheinander laufen
+IMPORT_LOCK_ID = 73110
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def open_input(source):
+    """
+    Öffnet Pfad, "-" (stdin) oder einen Binär-Stream und entpackt gzip automatisch
+
+    gzip wird an den ersten beiden Bytes erkannt, nicht an der Dateiendung.
+    """
+    if source == "-":
+        stream = sys.stdin.buffer
+    elif isinstance(source, str):
+        stream = open(source, "rb")
+    else:
+        stream = source
+
+    if not hasattr(stream, "peek"):
+        stream = io.BufferedReader(stream)
+    if stream.peek(2)[:2] == GZIP_MAGIC:
+        stream = io.BufferedReader(gzip.GzipFile(fileobj=stream))
+    return stream
+
+
+def detect_format(name, stream):
+    """Format aus Dateiname (.csv/.ndjson/.jsonl, auch mit .gz) oder erstem Zeichen"""
+    name = (name or "").lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    head = stream.peek(64).lstrip(b"\xef\xbb\xbf \t\r\n")
+    return "ndjson" if head[:1] in (b"{", b"[") else "csv"
+
+
+def iter_records(stream, fmt):
+    """Liefert (Zeilennummer, Datensatz oder None, Fehler) für jede Zeile der Datei"""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="" if fmt == "csv" else None)
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for line, record in enumerate(reader, start=2):
+            yield line, record, None
+        return
+
+    for line, raw in enumerate(text, start=1):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            record = json.loads(raw)
+        except ValueError as e:
+            yield line, None, f"Ungültiges JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line, None, "Zeile ist kein JSON-Objekt"
+            continue
+        yield line, record, None
+
+
+def _field(record, name):
+    for alias in FIELD_ALIASES[name]:
+        value = record.get(alias)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _clean(value):
+    """Entfernt überflüssige Leerzeichen und Zeilenumbrüche"""
+    return " ".join(str(value).split()) if value is not None else ""
+
+
+def parse_timestamp(value, now):
+    """ISO-Zeitstempel (auch mit Z) als UTC; fehlend oder in der Zukunft -> jetzt"""
+    if value in (None, ""):
+        return now
+    dt = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    dt = dt.astimezone(timezone.utc)
+    return min(dt, now)
+
+
+def normalize_record(record, default_source, now, cutoff):
+    """
+    Prüft und normalisiert einen Datensatz, wirft ValueError mit Grund
+
+    Gibt (title, company, location, url, source, scraped_at) zurück.
+    """
+    title = _clean(_field(record, "title"))
+    url = _clean(_field(record, "url"))
+    if not title:
+        raise ValueError("Titel fehlt")
+    if not url:
+        raise ValueError("URL fehlt")
+    if not url.startswith(("http://", "https://")):
+        raise ValueError(f"Ungültige URL: {url[:80]}")
+    if len(url) > MAX_FIELD_LENGTH:
+        raise ValueError(f"URL länger als {MAX_FIELD_LENGTH} Zeichen")
+
+    try:
+        scraped_at = parse_timestamp(_field(record, "scraped_at"), now)
+    except ValueError:
+        raise ValueError(f"Ungültiges Datum: {_field(record, 'scraped_at')}")
+    if scraped_at < cutoff:
+        raise ValueError("Datum außerhalb der Aufbewahrungsfrist")
+
+    return (
+        title[:MAX_FIELD_LENGTH],
+        (_clean(_field(record, "company")) or "Unbekanntes Unternehmen")[:MAX_FIELD_LENGTH],
+        (_clean(_field(record, "location")) or "Unbekannter Ort")[:MAX_FIELD_LENGTH],
+        url,
+        (_clean(_field(record, "source")) or default_source).lower()[:MAX_FIELD_LENGTH],
+        scraped_at,
+    )
+
+
+def _pg_array(values):
+    """Array-Literal für COPY im CSV-Format, z.B. {1,2,3}"""
+    return "{" + ",".join(str(value) for value in values) + "}"
+
+
+class ImportStats:
+    """Zähler und Fortschrittsmeldungen eines Imports"""
+
+    def __init__(self, progress=None):
+        self.progress = progress
+        self.start = time.perf_counter()
+        self.read = 0
+        self.valid = 0
+        self.invalid = 0
+        self.errors = []
+        self.months = set()
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def add_error(self, line, reason):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": reason})
+
+    def tick(self):
+        self.read += 1
+        if self.progress and self.read % PROGRESS_EVERY == 0:
+            self.progress(self)
+
+    def rate(self):
+        elapsed = self.elapsed()
+        return round(self.read / elapsed) if elapsed > 0 else 0
+
+
+def staged_rows(records, stats, default_source):
+    """Validiert die Datensätze und liefert sie als CSV-Zeilen für COPY"""
+    now = datetime.now(timezone.utc)
+    cutoff = add_months(month_start(now), -(RETENTION_MONTHS - 1))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    for line, record, error in records:
+        stats.tick()
+        if error is None:
+            try:
+                row = normalize_record(record, default_source, now, cutoff)
+            except ValueError as e:
+                error = str(e)
+        if error is not None:
+            stats.add_error(line, error)
+            continue
+
+        stats.valid += 1
+        stats.months.add(month_start(row[5]))
+        signature, band_keys = fingerprint_job({"title": row[0], "company": row[1], "location": row[2]})
+        writer.writerow((line,) + row[:5] + (row[5].isoformat(), cluster_id_for(signature),
+                                               _pg_array(signature), _pg_array(band_keys)))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+class CopyStream:
+    """Datei-ähnliches Objekt über einem Zeilen-Generator, das COPY stückweise liest"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.pending = ""
+
+    def read(self, size=COPY_CHUNK_SIZE):
+        if size is None or size < 0:
+            size = COPY_CHUNK_SIZE
+        parts = [self.pending]
+        length = len(self.pending)
+        for row in self.rows:
+            parts.append(row)
+            length += len(row)
+            if length >= size:
+                break
+        data = "".join(parts)
+        self.pending = data[size:]
+        return data[:size]
+
+    readline = read
+
+
+def log_progress(stats):
+    logger.info(f"Import: {stats.read} Zeilen gelesen, {stats.invalid} ungültig ({stats.rate()} Zeilen/s)")
+
+
+def import_jobs(source, fmt=None, name=None, default_source="import", progress=log_progress, dry_run=False):
+    """
+    Importiert eine Datei bzw. einen Stream in die Jobs-Tabelle
+
+    Gibt eine Zusammenfassung zurück; wirft ValueError bei unbekanntem Format
+    und RuntimeError, wenn keine Datenbankverbindung besteht.
+    """
+    if fmt is not None and fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unbekanntes Format '{fmt}', erlaubt: {', '.join(IMPORT_FORMATS)}")
+
+    stream = open_input(source)
+    fmt = fmt or detect_format(name or (source if isinstance(source, str) else ""), stream)
+    stats = ImportStats(progress)
+
+    conn = get_database()
+    if not conn:
+        raise RuntimeError("Keine Datenbankverbindung vorhanden, Import nicht möglich")
+
+    try:
+        with conn.cursor() as cur:
+            # Parallele Importe würden sich beim Abgleich nach URL gegenseitig übersehen
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (IMPORT_LOCK_ID,))
+            cur.execute("""
+                CREATE TEMP TABLE import_staging (
+                    line BIGINT,
+                    title VARCHAR(200),
+                    company VARCHAR(200),
+                    location VARCHAR(200),
+                    url VARCHAR(200),
+                    source VARCHAR(200),
+                    scraped_at TIMESTAMPTZ,
+                    cluster_id VARCHAR(16),
+                    minhash BIGINT[],
+                    lsh_bands BIGINT[]
+                ) ON COMMIT DROP
+            """)
+            rows = staged_rows(iter_records(stream, fmt), stats, default_source)
+            cur.copy_expert(
+                "COPY import_staging (line, title, company, location, url, source, scraped_at, "
+                "cluster_id, minhash, lsh_bands) "
+                "FROM STDIN WITH (FORMAT csv)",
+                CopyStream(rows),
+                size=COPY_CHUNK_SIZE
+            )
+            copy_seconds = stats.elapsed()
+
+            # Letzte Zeile je URL; neu ist, was es in jobs noch nicht gibt
+            cur.execute("""
+                CREATE TEMP TABLE import_latest ON COMMIT DROP AS
+                SELECT DISTINCT ON (s.url) s.*,
+                       NOT EXISTS (SELECT 1 FROM jobs j WHERE j.url = s.url) AS is_new
+                FROM import_staging s
+                ORDER BY s.url, s.line DESC
+            """)
+            distinct = cur.rowcount
+            cur.execute("ANALYZE import_latest")
+
+            # Zu schreibende Zeilen dem ähnlichsten bekannten Cluster zuordnen (wie LSHIndex.find)
+            since = query_window_start()
+            cur.execute(f"""
+                UPDATE import_latest l
+                SET cluster_id = COALESCE((
+                    SELECT jobs.cluster_id FROM jobs
+                    CROSS JOIN LATERAL (
+                        SELECT count(*) AS matches FROM unnest(jobs.minhash, l.minhash) AS p(a, b) WHERE a = b
+                    ) similarity
+                    WHERE jobs.cluster_id IS NOT NULL AND jobs.lsh_bands && l.lsh_bands
+                      AND (%(since)s::timestamptz IS NULL OR jobs.scraped_at >= %(since)s)
+                      AND similarity.matches >= %(min_matches)s
+                    ORDER BY similarity.matches DESC
+                    LIMIT 1
+                ), l.cluster_id)
+                WHERE l.is_new OR NOT EXISTS (
+                    SELECT 1 FROM jobs
+                    WHERE jobs.url = l.url AND {LATEST_ROW_CONDITION}
+                      AND (jobs.title, jobs.company, jobs.location) = (l.title, l.company, l.location)
+                )
+            """, {"since": since, "min_matches": math.ceil(SIMILARITY_THRESHOLD * NUM_PERM)})
+
+            # Nur die neueste Zeile einer URL ändern, ältere Zeilen sind Historie
+            cur.execute(f"""
+                UPDATE jobs
+                SET title = l.title, company = l.company, location = l.location,
+                    cluster_id = l.cluster_id, minhash = l.minhash, lsh_bands = l.lsh_bands
+                FROM import_latest l
+                WHERE NOT l.is_new AND jobs.url = l.url AND {LATEST_ROW_CONDITION}
+                  AND (jobs.title, jobs.company, jobs.location) IS DISTINCT FROM (l.title, l.company, l.location)
+            """)
+            updated = cur.rowcount
+
+            for month in sorted(stats.months):
+                ensure_partition(cur, month)
+            cur.execute("""
+                INSERT INTO jobs (title, company, location, url, source, scraped_at, cluster_id, minhash, lsh_bands)
+                SELECT title, company, location, url, source, scraped_at, cluster_id, minhash, lsh_bands
+                FROM import_latest
+                WHERE is_new
+            """)
+            inserted = cur.rowcount
+
+            # Neue URLs sind in ihrem Monat noch nicht gezählt (siehe record_job_stats)
+            cur.execute(f"""
+                INSERT INTO job_stats_urls (month, url)
+                SELECT {STATS_MONTH_SQL}, url FROM import_latest WHERE is_new ORDER BY 1, 2
+                ON CONFLICT (month, url) DO NOTHING
+            """)
+
+        # Zähler der neuen Jobs über einen serverseitigen Cursor in derselben Transaktion
+        counts = Counter()
+        with conn.cursor(name="import_stats") as stats_cur:
+            stats_cur.itersize = 10000
+            stats_cur.execute("SELECT title, location, source, scraped_at FROM import_latest WHERE is_new")
+            for title, location, job_source, scraped_at in stats_cur:
+                job = {"title": title, "location": location, "source": job_source}
+                counts[stats_key(job, month_start(scraped_at).date())] += 1
+
+        with conn.cursor() as cur:
+            record_stats_counts(cur, counts)
+
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    elapsed = stats.elapsed()
+    summary = {
+        "format": fmt,
+        "read": stats.read,
+        "valid": stats.valid,
+        "invalid": stats.invalid,
+        "duplicateUrls": stats.valid - distinct,
+        "inserted": inserted,
+        "updated": updated,
+        "dryRun": dry_run,
+        "copySeconds": round(copy_seconds, 2),
+        "seconds": round(elapsed, 2),
+        "rowsPerSecond": round(stats.read / elapsed) if elapsed > 0 else 0,
+        "errors": stats.errors,
+    }
+    logger.info(
+        f"Import abgeschlossen: {inserted} neu, {updated} aktualisiert, {stats.invalid} ungültig "
+        f"in {elapsed:.1f}s ({summary['rowsPerSecond']} Zeilen/s)"
+    )
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Job-Feeds (CSV/NDJSON, optional gzip) in die Jobs-Tabelle importieren")
+    parser.add_argument("file", help="Pfad zur Datei oder - für stdin")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Standard: anhand von Endung bzw. Inhalt")
+    parser.add_argument("--source", default="import", help="Quelle für Zeilen ohne eigenes source-Feld")
+    parser.add_argument("--dry-run", action="store_true", help="Alles prüfen, aber nichts speichern")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    summary = import_jobs(args.file, fmt=args.format, default_source=args.source, dry_run=args.dry_run)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
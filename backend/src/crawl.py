@@ -0,0 +1,268 @@
+"""Batch-Crawler für geplante Massen-Crawls (ohne Web-Server).
+
+Liest Suchanfragen aus einer Datei (CSV: ``title,city[,source]``, eine pro
+Zeile, ``#`` für Kommentare), führt sie parallel über einen Pool
+wiederverwendeter Browser aus und speichert die Treffer gebündelt über die
+Write-behind-Warteschlange. Pro Host wird ein Mindestabstand zwischen zwei
+Suchanfragen eingehalten. Am Ende wird eine Zusammenfassung mit Durchsatz
+und Latenzen ausgegeben.
+
+    python -m src.crawl queries.csv --parallel 3 --interval 5
+    python -m src.crawl queries.csv --enqueue    # nur Aufträge für die Worker anlegen
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+# Standard-Parallelität (Browser gleichzeitig)
+DEFAULT_PARALLEL = int(os.environ.get("CRAWL_PARALLEL", "2"))
+
+# Mindestabstand in Sekunden zwischen zwei Suchanfragen an denselben Host
+HOST_INTERVAL = float(os.environ.get("CRAWL_HOST_INTERVAL", "5"))
+
+# Jobs pro Schreibvorgang
+SAVE_BATCH_SIZE = 500
+
+
+class HostRateLimiter:
+    """Hält pro Host einen Mindestabstand zwischen zwei Anfragen ein"""
+
+    def __init__(self, interval, overrides=None):
+        self.interval = interval
+        self.overrides = overrides or {}
+        self.next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        """Reserviert den nächsten freien Zeitpunkt für host und wartet bis dahin"""
+        interval = self.overrides.get(host, self.interval)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        return max(0.0, delay)
+
+
+def read_queries(path, sources):
+    """
+    Liest (source, title, city) aus einer CSV-Datei
+
+    Zeilen ohne Quelle werden für jede Quelle aus sources angelegt; doppelte
+    Anfragen werden nur einmal ausgeführt.
+    """
+    queries = []
+    seen = set()
+    with open(path, newline="", encoding="utf-8") as handle:
+        for number, row in enumerate(csv.reader(handle), start=1):
+            row = [cell.strip() for cell in row]
+            if not row or not row[0] or row[0].startswith("#"):
+                continue
+            if number == 1 and [cell.lower() for cell in row[:2]] == ["title", "city"]:
+                continue
+            if len(row) < 2 or not row[1]:
+                raise ValueError(f"Zeile {number}: erwartet title,city[,source]")
+            for source in ([row[2]] if len(row) > 2 and row[2] else sources):
+                key = (source, row[0].lower(), row[1].lower())
+                if key not in seen:
+                    seen.add(key)
+                    queries.append((source, row[0], row[1]))
+    return queries
+
+
+def percentile(values, fraction):
+    """Perzentil (nächster Rang) einer nicht leeren Liste"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+class BatchCrawl:
+    """Führt eine Liste von Suchanfragen parallel aus und sammelt die Kennzahlen"""
+
+    def __init__(self, parallel=DEFAULT_PARALLEL, interval=HOST_INTERVAL, host_intervals=None,
+                 max_jobs=3, retries=1, dry_run=False):
+        from .scraping import DriverPool
+
+        self.parallel = max(1, parallel)
+        self.limiter = HostRateLimiter(interval, host_intervals)
+        self.pool = DriverPool(self.parallel)
+        self.max_jobs = max_jobs
+        self.retries = retries
+        self.dry_run = dry_run
+        self.ingest = None
+        self.results = []
+        self._lock = threading.Lock()
+
+    def run_query(self, source, title, city):
+        from .scraping import SCRAPERS, SCRAPER_HOSTS, is_fallback_result
+
+        result = {"source": source, "title": title, "city": city, "jobs": 0, "attempts": 0, "waited": 0.0}
+        start = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            result["attempts"] = attempt + 1
+            result["waited"] += self.limiter.wait(SCRAPER_HOSTS.get(source, source))
+            with self.pool.driver():
+                jobs = SCRAPERS[source](title, city, max_jobs=self.max_jobs)
+            if not is_fallback_result(jobs):
+                result["jobs"] = len(jobs)
+                if not self.dry_run:
+                    self.ingest.submit(jobs)
+                break
+        else:
+            result["error"] = "Keine echten Treffer (nur Beispieldaten)"
+
+        # Latenz ohne die Wartezeit des Rate-Limits
+        result["seconds"] = round(time.perf_counter() - start - result["waited"], 3)
+        with self._lock:
+            self.results.append(result)
+            done = len(self.results)
+        level = logging.WARNING if "error" in result else logging.INFO
+        logger.log(level, f"[{done}] {source}: {title} / {city} -> {result['jobs']} Jobs in {result['seconds']:.1f}s")
+        return result
+
+    def run(self, queries):
+        from .ingest import IngestQueue
+        from .scraping import SCRAPERS
+
+        unknown = sorted({source for source, _, _ in queries if source not in SCRAPERS})
+        if unknown:
+            raise ValueError(f"Unbekannte Quelle(n) {', '.join(unknown)}, erlaubt: {', '.join(SCRAPERS)}")
+
+        if not self.dry_run:
+            self.ingest = IngestQueue(batch_size=SAVE_BATCH_SIZE)
+
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.parallel, thread_name_prefix="crawl") as executor:
+                for future in [executor.submit(self.run_query, *query) for query in queries]:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error(f"Fehler bei einer Suchanfrage: {type(e).__name__}: {e}")
+        finally:
+            self.pool.close()
+            if self.ingest is not None:
+                self.ingest.stop()
+        return self.summary(time.perf_counter() - start)
+
+    def summary(self, elapsed):
+        """Durchsatz, Latenzen und Ergebnis je Quelle"""
+        latencies = [r["seconds"] for r in self.results]
+        failed = [r for r in self.results if "error" in r]
+        jobs = sum(r["jobs"] for r in self.results)
+        per_source = {}
+        for r in self.results:
+            entry = per_source.setdefault(r["source"], {"queries": 0, "failed": 0, "jobs": 0})
+            entry["queries"] += 1
+            entry["failed"] += "error" in r
+            entry["jobs"] += r["jobs"]
+
+        summary = {
+            "queries": len(self.results),
+            "failed": len(failed),
+            "jobs": jobs,
+            "saved": self.ingest.stats["saved"] if self.ingest else 0,
+            "parallel": self.parallel,
+            "browsersStarted": self.pool.started,
+            "seconds": round(elapsed, 1),
+            "queriesPerMinute": round(len(self.results) / elapsed * 60, 1) if elapsed > 0 else 0,
+            "jobsPerMinute": round(jobs / elapsed * 60, 1) if elapsed > 0 else 0,
+            "perSource": per_source,
+            "failedQueries": [f"{r['source']}: {r['title']} / {r['city']}" for r in failed],
+        }
+        if latencies:
+            summary["latencySeconds"] = {
+                "p50": round(statistics.median(latencies), 2),
+                "p95": round(percentile(latencies, 0.95), 2),
+                "max": round(max(latencies), 2),
+            }
+        return summary
+
+
+def parse_host_intervals(values):
+    """--host-interval www.stepstone.de=10 -> {"www.stepstone.de": 10.0}"""
+    intervals = {}
+    for value in values or []:
+        host, _, seconds = value.partition("=")
+        try:
+            intervals[host.strip()] = float(seconds)
+        except ValueError:
+            raise ValueError(f"Ungültiges Host-Intervall '{value}', erwartet host=sekunden")
+    return intervals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suchanfragen aus einer Datei im Batch crawlen")
+    parser.add_argument("queries", help="CSV-Datei mit title,city[,source]")
+    parser.add_argument("--sources", default="stepstone,monster",
+                        help="Quellen für Zeilen ohne eigene Quelle (kommagetrennt)")
+    parser.add_argument("--parallel", type=int, default=DEFAULT_PARALLEL, help="Gleichzeitige Browser")
+    parser.add_argument("--interval", type=float, default=HOST_INTERVAL,
+                        help="Mindestabstand in Sekunden zwischen Anfragen an denselben Host")
+    parser.add_argument("--host-interval", action="append", metavar="HOST=SEKUNDEN",
+                        help="Abweichender Mindestabstand für einen Host (mehrfach möglich)")
+    parser.add_argument("--max-jobs", type=int, default=3, help="Jobs pro Suchanfrage")
+    parser.add_argument("--retries", type=int, default=1, help="Wiederholungen bei Fehlschlag")
+    parser.add_argument("--dry-run", action="store_true", help="Nichts speichern")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="Nicht selbst crawlen, sondern Aufträge für die Crawl-Worker anlegen")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    try:
+        sources = [source.strip() for source in args.sources.split(",") if source.strip()]
+        queries = read_queries(args.queries, sources)
+        host_intervals = parse_host_intervals(args.host_interval)
+    except (OSError, ValueError) as e:
+        logger.error(str(e))
+        return 2
+    logger.info(f"{len(queries)} Suchanfragen aus {args.queries} gelesen")
+
+    if args.enqueue:
+        from .crawl_tasks import enqueue_tasks
+        from .database import create_tables_if_not_exist
+
+        if not create_tables_if_not_exist():
+            logger.error("Schema konnte nicht erstellt werden")
+            return 1
+        created = enqueue_tasks(queries, max_jobs=args.max_jobs)
+        print(json.dumps({"queries": len(queries), "created": created}, indent=2))
+        return 0
+
+    if not args.dry_run:
+        from .storage import get_storage
+
+        if not get_storage().bootstrap():
+            logger.error("Schema konnte nicht erstellt werden")
+            return 1
+
+    from .browser_supervisor import start_supervisor
+
+    # Budgets und verwaiste Browser wie im Web-Prozess und in den Workern überwachen
+    start_supervisor()
+    crawl = BatchCrawl(args.parallel, args.interval, host_intervals, args.max_jobs, args.retries, args.dry_run)
+    try:
+        summary = crawl.run(queries)
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    return 1 if summary["queries"] and summary["failed"] == summary["queries"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,275 @@
+"""Crawl-Aufträge in Postgres (Tabelle ``crawl_tasks``).
+
+Worker-Prozesse (siehe worker.py) holen sich Aufträge mit
+``FOR UPDATE SKIP LOCKED``, sodass beliebig viele Worker auf beliebig vielen
+Knoten dieselbe Tabelle abarbeiten, ohne sich gegenseitig zu blockieren.
+
+Ein geholter Auftrag ist ``running`` und gehört dem Worker, solange dieser
+``heartbeat_at`` regelmäßig erneuert. Bleibt der Heartbeat länger als
+``CRAWL_TASK_STALE_AFTER`` Sekunden aus (Worker abgestürzt), wird der
+Auftrag wieder freigegeben. Fehlgeschlagene Aufträge werden mit
+exponentiellem Backoff erneut eingeplant, bis ``max_attempts`` erreicht ist.
+"""
+
+import logging
+import os
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+TASK_STATUSES = ["pending", "running", "done", "failed"]
+
+# Standardanzahl der Versuche pro Auftrag
+DEFAULT_MAX_ATTEMPTS = int(os.environ.get("CRAWL_TASK_MAX_ATTEMPTS", "3"))
+
+# Ohne Heartbeat seit so vielen Sekunden gilt ein laufender Auftrag als verwaist
+STALE_AFTER = int(os.environ.get("CRAWL_TASK_STALE_AFTER", "120"))
+
+# Wartezeit vor dem n-ten Wiederholungsversuch: BACKOFF_BASE * 2^(n-1), höchstens BACKOFF_MAX
+BACKOFF_BASE = int(os.environ.get("CRAWL_TASK_BACKOFF", "30"))
+BACKOFF_MAX = 3600
+
+
+def ensure_crawl_tasks_table(cur):
+    """Legt die Auftragstabelle samt Indizes an"""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS crawl_tasks (
+            id BIGSERIAL PRIMARY KEY,
+            source VARCHAR(20) NOT NULL,
+            title VARCHAR(200) NOT NULL,
+            city VARCHAR(200) NOT NULL,
+            max_jobs INTEGER NOT NULL DEFAULT 3,
+            status VARCHAR(10) NOT NULL DEFAULT 'pending',
+            priority INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            run_after TIMESTAMPTZ NOT NULL DEFAULT now(),
+            worker_id VARCHAR(100),
+            heartbeat_at TIMESTAMPTZ,
+            last_error TEXT,
+            jobs_found INTEGER,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            finished_at TIMESTAMPTZ
+        )
+    """)
+    # Nur offene Aufträge sind für das Abholen interessant
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS ix_crawl_tasks_pending
+        ON crawl_tasks (priority DESC, run_after, id) WHERE status = 'pending'
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS ix_crawl_tasks_running
+        ON crawl_tasks (heartbeat_at) WHERE status = 'running'
+    """)
+    # Dieselbe Suche höchstens einmal offen oder in Arbeit
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_crawl_tasks_open
+        ON crawl_tasks (source, lower(title), lower(city)) WHERE status IN ('pending', 'running')
+    """)
+    logger.info("Crawl-Auftragstabelle überprüft")
+
+
+def _run(sql, params=(), fetch=None):
+    """
+    Führt eine Anweisung in einer eigenen kurzen Transaktion aus
+
+    fetch: None, "one" oder "all". Gibt bei fetch=None die Anzahl der
+    betroffenen Zeilen zurück, bei Fehlern None.
+    """
+    from .database import get_database
+
+    conn = get_database()
+    if not conn:
+        logger.error("Keine Datenbankverbindung vorhanden, Crawl-Auftrag nicht verarbeitet")
+        return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            if fetch == "one":
+                result = cur.fetchone()
+            elif fetch == "all":
+                result = cur.fetchall()
+            else:
+                result = cur.rowcount
+        conn.commit()
+        return result
+    except Exception as e:
+        logger.error(f"Fehler bei Crawl-Auftrag: {type(e).__name__}: {e}")
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        return None
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def enqueue_tasks(queries, max_jobs=3, priority=0, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Plant Crawl-Aufträge ein
+
+    queries: Folge von (source, title, city) oder (source, title, city, delay)
+    mit delay = frühester Start in Sekunden ab jetzt. Bereits offene gleiche
+    Aufträge werden übersprungen. Gibt die Anzahl der neu angelegten Aufträge zurück.
+    """
+    from .database import get_database
+    from .scraping import SCRAPERS
+
+    rows = []
+    for query in queries:
+        source, title, city = query[:3]
+        delay = query[3] if len(query) > 3 else 0
+        if source not in SCRAPERS:
+            raise ValueError(f"Unbekannte Quelle '{source}', erlaubt: {', '.join(SCRAPERS)}")
+        if not title or not city:
+            raise ValueError("Titel und Stadt sind erforderlich")
+        rows.append((source, title[:200], city[:200], max_jobs, priority, max_attempts, delay))
+    if not rows:
+        return 0
+
+    conn = get_database()
+    if not conn:
+        raise RuntimeError("Keine Datenbankverbindung vorhanden, Aufträge können nicht angelegt werden")
+    created = 0
+    try:
+        with conn.cursor() as cur:
+            for row in rows:
+                cur.execute(
+                    """
+                    INSERT INTO crawl_tasks (source, title, city, max_jobs, priority, max_attempts, run_after)
+                    VALUES (%s, %s, %s, %s, %s, %s, now() + make_interval(secs => %s))
+                    ON CONFLICT (source, lower(title), lower(city)) WHERE status IN ('pending', 'running')
+                    DO NOTHING
+                    """,
+                    row
+                )
+                created += cur.rowcount
+        conn.commit()
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    logger.info(f"{created} Crawl-Aufträge angelegt ({len(rows) - created} bereits offen)")
+    return created
+
+
+def claim_task(worker_id):
+    """
+    Holt den nächsten fälligen Auftrag und markiert ihn als laufend
+
+    SKIP LOCKED überspringt Zeilen, die ein anderer Worker gerade abholt.
+    Gibt ein Dict oder None zurück.
+    """
+    row = _run(
+        """
+        UPDATE crawl_tasks
+        SET status = 'running', attempts = attempts + 1, worker_id = %s, heartbeat_at = now()
+        WHERE id = (
+            SELECT id FROM crawl_tasks
+            WHERE status = 'pending' AND run_after <= now()
+            ORDER BY priority DESC, run_after, id
+            FOR UPDATE SKIP LOCKED
+            LIMIT 1
+        )
+        RETURNING id, source, title, city, max_jobs, attempts, max_attempts
+        """,
+        (worker_id,),
+        fetch="one"
+    )
+    if not row:
+        return None
+    keys = ("id", "source", "title", "city", "max_jobs", "attempts", "max_attempts")
+    return dict(zip(keys, row))
+
+
+def heartbeat(task_ids, worker_id):
+    """Erneuert den Heartbeat der laufenden Aufträge dieses Workers"""
+    if not task_ids:
+        return 0
+    return _run(
+        "UPDATE crawl_tasks SET heartbeat_at = now() "
+        "WHERE id = ANY(%s) AND status = 'running' AND worker_id = %s",
+        (list(task_ids), worker_id)
+    )
+
+
+def complete_task(task_id, worker_id, jobs_found):
+    """Markiert einen Auftrag als erledigt"""
+    return _run(
+        "UPDATE crawl_tasks SET status = 'done', jobs_found = %s, last_error = NULL, finished_at = now() "
+        "WHERE id = %s AND worker_id = %s",
+        (jobs_found, task_id, worker_id)
+    )
+
+
+def backoff_seconds(attempts):
+    """Wartezeit vor dem nächsten Versuch nach attempts Fehlversuchen"""
+    return min(BACKOFF_BASE * 2 ** max(0, attempts - 1), BACKOFF_MAX)
+
+
+def fail_task(task, worker_id, error):
+    """
+    Plant einen fehlgeschlagenen Auftrag mit Backoff neu ein oder gibt ihn auf
+
+    Gibt den neuen Status zurück.
+    """
+    retry = task["attempts"] < task["max_attempts"]
+    status = "pending" if retry else "failed"
+    _run(
+        """
+        UPDATE crawl_tasks
+        SET status = %s, last_error = %s, worker_id = NULL, heartbeat_at = NULL,
+            run_after = now() + make_interval(secs => %s),
+            finished_at = CASE WHEN %s = 'failed' THEN now() END
+        WHERE id = %s AND worker_id = %s
+        """,
+        (status, str(error)[:2000], backoff_seconds(task["attempts"]) if retry else 0,
+         status, task["id"], worker_id)
+    )
+    return status
+
+
+def requeue_stale_tasks(stale_after=STALE_AFTER):
+    """
+    Gibt Aufträge abgestürzter Worker frei
+
+    Aufträge ohne Heartbeat seit stale_after Sekunden werden wieder offen
+    bzw. endgültig fehlgeschlagen, wenn keine Versuche mehr übrig sind.
+    """
+    rows = _run(
+        """
+        UPDATE crawl_tasks
+        SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+            last_error = 'Worker ' || coalesce(worker_id, '?') || ' ohne Heartbeat',
+            worker_id = NULL, heartbeat_at = NULL, run_after = now(),
+            finished_at = CASE WHEN attempts >= max_attempts THEN now() END
+        WHERE status = 'running' AND heartbeat_at < now() - make_interval(secs => %s)
+        RETURNING id
+        """,
+        (stale_after,),
+        fetch="all"
+    )
+    if rows:
+        logger.warning(f"{len(rows)} verwaiste Crawl-Aufträge wieder freigegeben")
+    return len(rows or [])
+
+
+def crawl_queue_info():
+    """Anzahl der Aufträge je Status für /diagnostics"""
+    rows = _run("SELECT status, COUNT(*) FROM crawl_tasks GROUP BY status", fetch="all")
+    if rows is None:
+        return {"available": False}
+    counts = {status: 0 for status in TASK_STATUSES}
+    counts.update({status: int(count) for status, count in rows})
+    return counts
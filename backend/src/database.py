@@ -1,218 +1,293 @@
+import base64
+import json
 import logging
-import os
-from datetime import datetime
-import time
+
+from .dedupe import LSHIndex, fingerprint_job
+from .engine import (
+    execute_prepared, get_engine, mark_replica_unhealthy, mask_url, replica_usable,
+    resolve_database_url, timed_query,
+)
+from .metrics import DB_CONNECT_SECONDS
+from .partitions import ensure_current_partition, ensure_partitions, query_window_start
+from .crawl_tasks import ensure_crawl_tasks_table
+from .result_cache import ensure_scrape_cache_table
+from .stats import ensure_stats_table, rebuild_job_stats, record_job_stats
+from .tracing import traced
 
 # Logging konfigurieren
 logger = logging.getLogger(__name__)
 
-def get_database():
+# Volltextsuche: deutsche Textsuchkonfiguration, Titel wiegt mehr als Firma und Ort
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('german', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('german', coalesce(company, '')), 'B') || "
+    "setweight(to_tsvector('german', coalesce(location, '')), 'C')"
+)
+SEARCH_INDEX_NAME = "ix_jobs_search_vector"
+
+# Macht aus jedem Lexem der websearch-Query ein Präfix-Lexem ('elektr' -> 'elektr':*)
+SEARCH_QUERY_EXPRESSION = (
+    r"regexp_replace(websearch_to_tsquery('german', %s)::text, "
+    r"'(''[^'']+'')', '\1:*', 'g')::tsquery"
+)
+
+# Jede Suche hängt ihre Treffer neu an (Historie); gelesen wird nur die jeweils
+# neueste Zeile einer URL. Der Anti-Join nutzt den Index auf (url, scraped_at, id).
+LATEST_ROW_CONDITION = (
+    "NOT EXISTS (SELECT 1 FROM jobs newer WHERE newer.url = jobs.url"
+    " AND newer.scraped_at >= jobs.scraped_at"
+    " AND (newer.scraped_at, newer.id) > (jobs.scraped_at, jobs.id))"
+)
+
+# Spalten, die bei Abfragen geladen und von job_from_row ausgewertet werden
+JOB_SELECT_COLUMNS = "id, title, company, location, url, source, scraped_at, cluster_id"
+
+# Standard- und Maximalanzahl der Treffer für die Volltextsuche
+SEARCH_DEFAULT_LIMIT = 50
+SEARCH_MAX_LIMIT = 200
+
+# Seitengröße für die Keyset-Pagination von /api/db
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Zeilen pro Roundtrip beim Streamen über serverseitige Cursor
+STREAM_BATCH_SIZE = 2000
+
+def get_database(readonly=False):
     """
-    Stellt eine Verbindung zur PostgreSQL-Datenbank her
+    Gibt eine Verbindung aus dem gemeinsamen Connection-Pool zurück
+
+    conn.close() gibt die Verbindung an den Pool zurück, statt sie zu schließen.
+    readonly=True verwendet das Lese-Replikat (DATABASE_READ_URL), sofern es
+    erreichbar ist und nicht zu weit zurückliegt - sonst den Primary.
     """
-    # Prüfe alle möglichen Umgebungsvariablen für die Datenbankverbindung
-    database_url = None
-    env_vars_tried = []
-    
-    for var_name in ["DATABASE_URL", "DATABASE_PUBLIC_URL", "POSTGRES_URL", "PGDATABASE"]:
-        if os.environ.get(var_name):
-            env_vars_tried.append(var_name)
-            if database_url is None:  # Verwende die erste gefundene Variable
-                database_url = os.environ.get(var_name)
-                logger.info(f"Verwende {var_name} für Datenbankverbindung")
+    if readonly and replica_usable():
+        try:
+            with DB_CONNECT_SECONDS.time(role="replica"):
+                return get_engine(readonly=True).raw_connection()
+        except Exception as e:
+            logger.warning(f"Replikat nicht erreichbar, verwende Primary: {type(e).__name__}: {e}")
+            mark_replica_unhealthy(f"{type(e).__name__}: {e}")
     
-    # Fallback auf lokale Datenbank, wenn keine Umgebungsvariable gefunden wurde
-    if database_url is None:
-        database_url = "postgres:///jobbig"
-        logger.warning(f"Keine Datenbank-Umgebungsvariable gefunden. Geprüfte Variablen: {', '.join(env_vars_tried) or 'keine'}. Verwende Fallback: {database_url}")
-    else:
-        # Obfuskiere das Passwort für das Logging
-        url_parts = database_url.split('@')
-        if len(url_parts) > 1:
-            # Es gibt ein @ in der URL, also vermutlich ein Passwort
-            masked_url = f"{url_parts[0].split(':')[0]}:***@{url_parts[1]}"
-            logger.info(f"Verwende Datenbankverbindung (maskiert): {masked_url}")
-        else:
-            logger.info(f"Verwende Datenbankverbindung (ohne Credentials)")
+    try:
+        with DB_CONNECT_SECONDS.time(role="primary"):
+            return get_engine().raw_connection()
+    except Exception as e:
+        logger.error(f"Fehler beim Herstellen der Datenbankverbindung: {type(e).__name__}: {e}")
+        logger.error(f"Connection string verwendet (maskiert): {mask_url(resolve_database_url())}")
+        return None
+
+@traced("db_verify")
+def verify_database_connection():
+    """
+    Überprüft, ob eine Verbindung zur Datenbank hergestellt werden kann
     
-    # Railway verwendet 'postgres://' anstatt 'postgresql://'
-    if database_url.startswith("postgres://"):
-        database_url = database_url.replace("postgres://", "postgresql://", 1)
-        logger.info("Datenbankstring von postgres:// auf postgresql:// korrigiert")
+    Der Pool prüft Verbindungen vor der Ausgabe (pre-ping) und baut tote neu
+    auf - eine Wiederholung mit Wartezeit ist deshalb nicht nötig.
+    """
+    conn = get_database()
+    if not conn:
+        logger.warning("get_database() hat keine Verbindung zurückgegeben")
+        return False
     
-    # Logge einige Umgebungsinformationen für Debugging
-    logger.info(f"Aktuelle Umgebungsvariablen (nur Namen): {', '.join(sorted(os.environ.keys()))}")    
-        
-    # Erhöhter Timeout für Railway-Verbindungen (30 statt 10 Sekunden)
-    connect_timeout = 30
-    logger.info(f"Verwende Verbindungs-Timeout von {connect_timeout} Sekunden")
-        
-    # Versuche zuerst mit psycopg
     try:
-        import psycopg
-        # Erhöhe das Connection-Timeout für langsame Netzwerke
-        logger.info(f"Versuche Verbindungsaufbau mit psycopg...")
-        conn = psycopg.connect(
-            database_url, 
-            connect_timeout=connect_timeout,
-            application_name="jobbig-app"  # Hilft bei der Identifikation in DB-Logs
-        )
-        logger.info("Datenbankverbindung erfolgreich mit psycopg hergestellt")
-        return conn
-    except ImportError as e:
-        logger.warning(f"psycopg nicht verfügbar: {e}")
+        with conn.cursor() as cur:
+            with timed_query("verify_connection"):
+                cur.execute("SELECT 1")
+                cur.fetchone()
+        return True
     except Exception as e:
-        logger.error(f"Fehler beim Herstellen der Datenbankverbindung mit psycopg: {type(e).__name__}: {e}")
-        logger.error(f"Connection string verwendet (maskiert): {database_url.split('@')[0].split(':')[0]}:***@{database_url.split('@')[1] if '@' in database_url else 'keine-auth'}")
+        logger.error(f"Fehler bei der Datenbankabfrage: {type(e).__name__}: {e}")
+        return False
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+# Länge der Textspalten der Jobs-Tabelle (VARCHAR(200))
+MAX_COLUMN_LENGTH = 200
+
+def prepare_job_row(job):
+    """
+    Prüft einen Job vor dem Einfügen und kürzt die Texte auf die Spaltenlänge
     
-    # Versuche mit psycopg2, wenn psycopg nicht funktioniert
+    Gibt das (angepasste) Job-Dict zurück oder None, wenn der Job nicht
+    gespeichert werden kann - eine gekürzte URL wäre ein kaputter Link.
+    """
+    if not isinstance(job, dict):
+        logger.warning(f"Ungültiger Job, überspringe: {job}")
+        return None
+    
+    url = str(job.get("url") or "https://example.com").strip()
+    if len(url) > MAX_COLUMN_LENGTH:
+        logger.warning("URL länger als %d Zeichen, überspringe Job: %s...", MAX_COLUMN_LENGTH, url[:80])
+        return None
+    job["url"] = url
+    for key, default in (("title", "Unbekannter Titel"), ("company", "Unbekanntes Unternehmen"),
+                         ("location", "Unbekannter Ort"), ("source", "unbekannt")):
+        job[key] = str(job.get(key) or default).strip()[:MAX_COLUMN_LENGTH]
+    return job
+
+def is_connection_error(error):
+    """True für Verbindungs- und Betriebsfehler, bei denen eine Wiederholung sinnvoll ist"""
     try:
         import psycopg2
-        # Erhöhe das Connection-Timeout für langsame Netzwerke
-        logger.info(f"Versuche Verbindungsaufbau mit psycopg2...")
-        conn = psycopg2.connect(
-            database_url, 
-            connect_timeout=connect_timeout,
-            application_name="jobbig-app"  # Hilft bei der Identifikation in DB-Logs
-        )
-        logger.info("Datenbankverbindung erfolgreich mit psycopg2 hergestellt")
-        return conn
-    except ImportError as e:
-        logger.warning(f"psycopg2 nicht verfügbar: {e}")
-    except Exception as e:
-        logger.error(f"Fehler beim Herstellen der Datenbankverbindung mit psycopg2: {type(e).__name__}: {e}")
-        logger.error(f"Connection string verwendet (maskiert): {database_url.split('@')[0].split(':')[0]}:***@{database_url.split('@')[1] if '@' in database_url else 'keine-auth'}")
-    
-    # Wenn keine Methode funktioniert hat
-    logger.error("Keine Datenbankverbindung konnte hergestellt werden")
-    return None
+    except ImportError:
+        return False
+    return isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError))
 
-def verify_database_connection():
+def insert_jobs(conn, cur, jobs, savepoints=False):
     """
-    Überprüft, ob eine Verbindung zur Datenbank hergestellt werden kann
+    Fügt die Jobs samt Duplikat-Cluster ein und gibt die gespeicherten zurück
+    
+    Ohne savepoints bricht der erste Fehler die Transaktion ab (Fehler wird
+    weitergereicht). Mit savepoints läuft jede Zeile in einem eigenen
+    SAVEPOINT: fehlerhafte Zeilen werden verworfen, der Rest bleibt erhalten.
     """
-    # Erweitere das Timeout für die Verbindungsüberprüfung
-    max_retries = 3
-    retry_delay = 2  # Sekunden
+    # Duplikat-Cluster zuordnen: Kandidaten aus der DB über gemeinsame LSH-Bänder
+    fingerprints = [fingerprint_job(job) for job in jobs]
+    index = load_lsh_candidates(cur, {key for _, bands in fingerprints for key in bands})
     
-    for attempt in range(1, max_retries + 1):
-        logger.info(f"Überprüfe Datenbankverbindung (Versuch {attempt}/{max_retries})...")
-        
+    saved_jobs = []
+    for job, (signature, band_keys) in zip(jobs, fingerprints):
+        cluster_id = index.assign(signature, band_keys)
+        if savepoints:
+            cur.execute("SAVEPOINT insert_job")
         try:
-            conn = get_database()
-            if conn:
-                try:
-                    with conn.cursor() as cur:
-                        start_time = datetime.now()
-                        cur.execute("SELECT version(), current_timestamp, pg_backend_pid()")
-                        result = cur.fetchone()
-                        end_time = datetime.now()
-                        duration = (end_time - start_time).total_seconds()
-                        
-                        if result:
-                            logger.info(f"Datenbankverbindung erfolgreich verifiziert in {duration:.2f}s: PostgreSQL {result[0].split(' ')[1] if result[0] else 'unbekannt'}")
-                            logger.info(f"Datenbank-Zeit: {result[1]}, Backend-PID: {result[2]}")
-                    conn.close()
-                    return True
-                except Exception as e:
-                    logger.error(f"Fehler bei der Datenbankabfrage: {type(e).__name__}: {e}")
-                    try:
-                        conn.close()
-                    except:
-                        pass
-            else:
-                logger.warning("get_database() hat keine Verbindung zurückgegeben")
-            
-            # Bei Fehlschlag: Warte und versuche es erneut, außer beim letzten Versuch
-            if attempt < max_retries:
-                logger.info(f"Warte {retry_delay} Sekunden vor dem nächsten Verbindungsversuch...")
-                time.sleep(retry_delay)
+            execute_prepared(
+                conn, cur,
+                "INSERT INTO jobs (title, company, location, url, source, cluster_id, minhash, lsh_bands) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                (job["title"], job["company"], job["location"], job["url"], job["source"],
+                 cluster_id, signature, band_keys),
+                "insert_job"
+            )
         except Exception as e:
-            logger.error(f"Unerwarteter Fehler bei der Überprüfung der Datenbankverbindung: {type(e).__name__}: {e}")
-            if attempt < max_retries:
-                logger.info(f"Warte {retry_delay} Sekunden vor dem nächsten Verbindungsversuch...")
-                time.sleep(retry_delay)
-    
-    logger.error(f"Datenbankverbindung konnte nach {max_retries} Versuchen nicht hergestellt werden")
-    return False
+            if not savepoints or is_connection_error(e):
+                raise
+            cur.execute("ROLLBACK TO SAVEPOINT insert_job")
+            logger.warning(f"Job konnte nicht eingefügt werden, überspringe ({job['url']}): {type(e).__name__}: {e}")
+            continue
+        if savepoints:
+            cur.execute("RELEASE SAVEPOINT insert_job")
+        job["cluster_id"] = cluster_id
+        saved_jobs.append(job)
+    return saved_jobs
 
+@traced("db_save")
 def save_new_jobs(jobs):
     """
     Speichert neue Jobs in der Datenbank
+    
+    Die Jobs werden mit scraped_at = jetzt in die Partition des laufenden Monats
+    geschrieben, bestehende Einträge bleiben als Historie erhalten.
+    Schlägt eine Zeile fehl, wird der Batch zeilenweise (mit Savepoints)
+    wiederholt, damit ein fehlerhafter Job nicht alle anderen mitreißt.
+    Gibt die Anzahl der gespeicherten Jobs zurück.
     """
     if not jobs:
         logger.info("Keine Jobs zum Speichern vorhanden")
-        return
+        return 0
+    
+    valid_jobs = [job for job in (prepare_job_row(job) for job in jobs) if job is not None]
+    if not valid_jobs:
+        logger.warning("Keiner der %d Jobs kann gespeichert werden", len(jobs))
+        return 0
     
     conn = get_database()
     if not conn:
         logger.error("Keine Datenbankverbindung vorhanden, Jobs können nicht gespeichert werden")
-        return
+        return 0
     
     try:
-        with conn.cursor() as cur:
-            # Prüfe ob die Tabelle existiert
+        # Partitionen vorab committen, damit ein fehlgeschlagener Batch sie nicht zurückrollt
+        ensure_current_partition(conn)
+        for savepoints in (False, True):
             try:
-                cur.execute("SELECT COUNT(*) FROM jobs")
-                count = cur.fetchone()[0]
-                logger.info(f"Jobs-Tabelle existiert mit {count} Einträgen")
+                with conn.cursor() as cur:
+                    # Neue Jobs werden angehängt (Historie); alte Monate entfernt die Aufbewahrung
+                    saved_jobs = insert_jobs(conn, cur, valid_jobs, savepoints=savepoints)
+                    # Vorberechnete Statistik in derselben Transaktion fortschreiben
+                    record_job_stats(cur, saved_jobs)
+                conn.commit()
+                logger.info("%d von %d Jobs in der Datenbank gespeichert", len(saved_jobs), len(jobs))
+                return len(saved_jobs)
             except Exception as e:
-                logger.warning(f"Jobs-Tabelle existiert möglicherweise nicht: {e}")
-                logger.info("Versuche Tabelle zu erstellen...")
-                create_tables_if_not_exist()
-                conn = get_database()  # Neue Verbindung nach Tabellenerstellung
-                if not conn:
-                    return
-            
-            # Zuerst alle bestehenden Jobs löschen
-            try:
-                cur.execute("DELETE FROM jobs")
-                logger.info("Bestehende Jobs in der Datenbank gelöscht")
-            except Exception as e:
-                logger.error(f"Fehler beim Löschen bestehender Jobs: {e}")
-                return
-            
-            # Jetzt neue Jobs einfügen
-            inserted = 0
-            for job in jobs:
-                if not isinstance(job, dict):
-                    logger.warning(f"Ungültiger Job, überspringe: {job}")
-                    continue
-                
-                try:
-                    cur.execute(
-                        "INSERT INTO jobs (title, company, location, url, source) VALUES (%s, %s, %s, %s, %s)",
-                        (
-                            job.get("title", "Unbekannter Titel"),
-                            job.get("company", "Unbekanntes Unternehmen"),
-                            job.get("location", "Unbekannter Ort"),
-                            job.get("url", "https://example.com"),
-                            job.get("source", "unbekannt"),
-                        )
-                    )
-                    inserted += 1
-                except Exception as e:
-                    logger.error(f"Fehler beim Einfügen eines Jobs: {e}")
-            
-            conn.commit()
-            logger.info(f"{inserted} von {len(jobs)} Jobs in der Datenbank gespeichert")
+                conn.rollback()
+                if savepoints or is_connection_error(e):
+                    raise
+                logger.warning(f"Fehler im Batch ({type(e).__name__}: {e}), speichere zeilenweise")
     except Exception as e:
-        logger.error(f"Fehler beim Speichern der Jobs in der Datenbank: {e}")
+        logger.error(f"Fehler beim Speichern der Jobs in der Datenbank: {type(e).__name__}: {e}")
         try:
             conn.rollback()
         except Exception:
             pass
+        return 0
     finally:
         try:
             conn.close()
         except Exception:
             pass
 
-def get_jobs_by_criteria(title="", city="", source=""):
+def job_from_row(row):
+    """
+    Wandelt eine Zeile mit den Spalten aus JOB_SELECT_COLUMNS in ein Job-Dict
+    """
+    return {
+        "id": row[0],
+        "title": row[1],
+        "company": row[2],
+        "location": row[3],
+        "url": row[4],
+        "source": row[5],
+        "scraped_at": row[6].isoformat() if row[6] else None,
+        "cluster_id": row[7]
+    }
+
+def build_job_filters(title="", city="", source="", days=None, latest=True):
+    """
+    Baut die WHERE-Bedingungen für die Filterkriterien von get_jobs_by_criteria
+    
+    days begrenzt auf die letzten Tage (Standard: JOBS_QUERY_WINDOW_DAYS), damit
+    nur die betroffenen Monatspartitionen gelesen werden. latest=False liefert
+    auch ältere Zeilen derselben URL (Historie).
+    """
+    where = " WHERE 1=1"
+    params = []
+    
+    if latest:
+        where += " AND " + LATEST_ROW_CONDITION
+    
+    since = query_window_start(days)
+    if since is not None:
+        where += " AND scraped_at >= %s"
+        params.append(since)
+    
+    if title:
+        where += " AND title ILIKE %s"
+        params.append(f"%{title}%")
+    
+    if city:
+        where += " AND location ILIKE %s"
+        params.append(f"%{city}%")
+    
+    if source:
+        where += " AND source = %s"
+        params.append(source)
+    
+    return where, params
+
+def get_jobs_by_criteria(title="", city="", source="", limit=None, after_id=None, days=None):
     """
     Ruft Jobs aus der Datenbank ab, die den angegebenen Kriterien entsprechen
+    
+    Die Jobs werden absteigend nach ID geliefert. Mit after_id wird die Seite nach
+    dieser ID geladen (Keyset-Pagination), limit begrenzt die Anzahl der Zeilen.
+    Gelesen wird vom Replikat, falls eines konfiguriert ist.
     """
-    conn = get_database()
+    conn = get_database(readonly=True)
     if not conn:
         logger.error("Keine Datenbankverbindung vorhanden, Jobs können nicht abgerufen werden")
         return []
@@ -220,43 +295,25 @@ def get_jobs_by_criteria(title="", city="", source=""):
     jobs = []
     try:
         with conn.cursor() as cur:
-            # Prüfe ob die Tabelle existiert
-            try:
-                cur.execute("SELECT COUNT(*) FROM jobs")
-                count = cur.fetchone()[0]
-                logger.info(f"Jobs-Tabelle existiert mit {count} Einträgen")
-            except Exception as e:
-                logger.warning(f"Jobs-Tabelle existiert möglicherweise nicht: {e}")
-                return []
-                
-            query = "SELECT id, title, company, location, url, source FROM jobs WHERE 1=1"
-            params = []
+            where, params = build_job_filters(title, city, source, days)
+            query = f"SELECT {JOB_SELECT_COLUMNS} FROM jobs" + where
             
-            if title:
-                query += " AND title ILIKE %s"
-                params.append(f"%{title}%")
+            if after_id is not None:
+                query += " AND id < %s"
+                params.append(int(after_id))
             
-            if city:
-                query += " AND location ILIKE %s"
-                params.append(f"%{city}%")
+            query += " ORDER BY id DESC"
             
-            if source:
-                query += " AND source = %s"
-                params.append(source)
+            if limit is not None:
+                query += " LIMIT %s"
+                params.append(int(limit))
             
-            cur.execute(query, params)
+            execute_prepared(conn, cur, query, params, "jobs_by_criteria")
             
             for row in cur:
-                jobs.append({
-                    "id": row[0],
-                    "title": row[1],
-                    "company": row[2],
-                    "location": row[3],
-                    "url": row[4],
-                    "source": row[5]
-                })
+                jobs.append(job_from_row(row))
             
-            logger.info(f"{len(jobs)} Jobs aus der Datenbank abgerufen")
+            logger.info("%d Jobs aus der Datenbank abgerufen", len(jobs))
     except Exception as e:
         logger.error(f"Fehler beim Abrufen der Jobs aus der Datenbank: {e}")
     finally:
@@ -267,9 +324,305 @@ def get_jobs_by_criteria(title="", city="", source=""):
     
     return jobs
 
+def stream_jobs_by_criteria(title="", city="", source="", batch_size=STREAM_BATCH_SIZE, days=None, readonly=True,
+                            latest=True):
+    """
+    Liefert die Jobs zu den Filterkriterien als Generator über einen serverseitigen Cursor
+    
+    Die Zeilen werden in Blöcken von batch_size vom Server geholt, sodass auch
+    sehr große Ergebnismengen mit konstantem Speicher gelesen werden.
+    readonly=False liest vom Primary (z.B. für Neuaufbauten, die aktuell sein müssen),
+    latest=False auch ältere Zeilen derselben URL.
+    Fehler werden nach dem Loggen weitergeworfen (wie bei copy_csv_chunks), damit
+    eine gestreamte Antwort abbricht, statt abgeschnitten vollständig auszusehen.
+    """
+    conn = get_database(readonly=readonly)
+    if not conn:
+        raise RuntimeError("Keine Datenbankverbindung vorhanden, Jobs können nicht gestreamt werden")
+    
+    streamed = 0
+    try:
+        where, params = build_job_filters(title, city, source, days, latest=latest)
+        query = f"SELECT {JOB_SELECT_COLUMNS} FROM jobs" + where + " ORDER BY id"
+        
+        # Benannter Cursor = serverseitiger Cursor (psycopg und psycopg2)
+        with conn.cursor(name="jobs_stream") as cur:
+            cur.itersize = batch_size
+            cur.execute(query, params)
+            
+            for row in cur:
+                streamed += 1
+                yield job_from_row(row)
+        
+        logger.info(f"{streamed} Jobs aus der Datenbank gestreamt")
+    except Exception as e:
+        logger.error(f"Fehler beim Streamen der Jobs nach {streamed} Zeilen: {e}")
+        raise
+    finally:
+        try:
+            conn.rollback()
+            conn.close()
+        except Exception:
+            pass
+
+def ensure_search_index(cur):
+    """
+    Legt die generierte tsvector-Spalte und den GIN-Index für die Volltextsuche an
+    """
+    cur.execute(f"""
+        ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED
+    """)
+    cur.execute(f"CREATE INDEX IF NOT EXISTS {SEARCH_INDEX_NAME} ON jobs USING GIN (search_vector)")
+    logger.info("Volltext-Index für Jobs-Tabelle überprüft")
+
+def ensure_url_index(cur):
+    """
+    Legt den Index für den Abgleich nach URL an (neueste Zeile je URL, Upsert beim Bulk-Import)
+    """
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_jobs_url_scraped_at ON jobs (url, scraped_at, id)")
+    # Der frühere Index nur auf url ist darin enthalten
+    cur.execute("DROP INDEX IF EXISTS ix_jobs_url")
+
+def ensure_dedupe_columns(cur):
+    """
+    Legt die Spalten für MinHash-Signatur, LSH-Bänder und Cluster-ID samt Indizes an
+    """
+    cur.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS cluster_id VARCHAR(16)")
+    cur.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS minhash BIGINT[]")
+    cur.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS lsh_bands BIGINT[]")
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_jobs_lsh_bands ON jobs USING GIN (lsh_bands)")
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_jobs_cluster_id ON jobs (cluster_id)")
+    logger.info("Duplikat-Spalten für Jobs-Tabelle überprüft")
+
+def load_lsh_candidates(cur, band_keys, days=None):
+    """
+    Lädt gespeicherte Jobs, die mindestens ein LSH-Band teilen, in einen LSH-Index
+    """
+    index = LSHIndex()
+    if not band_keys:
+        return index
+    
+    where, params = build_job_filters(days=days, latest=False)
+    with timed_query("lsh_candidates"):
+        cur.execute(
+            "SELECT DISTINCT ON (cluster_id) cluster_id, minhash, lsh_bands FROM jobs" + where +
+            " AND cluster_id IS NOT NULL AND lsh_bands && %s::bigint[]",
+            params + [list(band_keys)]
+        )
+    for cluster_id, signature, stored_bands in cur.fetchall():
+        index.add(list(signature), list(stored_bands), cluster_id)
+    return index
+
+def search_jobs_fulltext(query, source="", limit=SEARCH_DEFAULT_LIMIT, after=None, days=None):
+    """
+    Durchsucht die Jobs per Volltextsuche und liefert sie nach Relevanz sortiert
+
+    Die Suchbegriffe werden mit websearch_to_tsquery geparst und als Präfix
+    gesucht, damit z.B. "Elektriker" auch "Elektrikerin" findet. Mit after=(rank, id)
+    wird die Seite nach dem letzten Treffer der Vorseite geladen.
+    """
+    if not query or not query.strip():
+        return []
+
+    limit = max(1, min(int(limit), SEARCH_MAX_LIMIT))
+
+    conn = get_database(readonly=True)
+    if not conn:
+        logger.error("Keine Datenbankverbindung vorhanden, Volltextsuche nicht möglich")
+        return []
+
+    jobs = []
+    try:
+        with conn.cursor() as cur:
+            sql = f"""
+                SELECT {JOB_SELECT_COLUMNS}, rank
+                FROM (
+                    SELECT {JOB_SELECT_COLUMNS},
+                           ts_rank(search_vector, q.query) AS rank
+                    FROM jobs, (SELECT {SEARCH_QUERY_EXPRESSION} AS query) AS q
+                    WHERE search_vector @@ q.query AND {LATEST_ROW_CONDITION}
+            """
+            params = [query]
+
+            since = query_window_start(days)
+            if since is not None:
+                sql += " AND scraped_at >= %s"
+                params.append(since)
+
+            if source:
+                sql += " AND source = %s"
+                params.append(source)
+
+            sql += ") AS ranked WHERE 1=1"
+
+            if after is not None:
+                sql += " AND (rank, id) < (%s::real, %s)"
+                params.extend([float(after[0]), int(after[1])])
+
+            sql += " ORDER BY rank DESC, id DESC LIMIT %s"
+            params.append(limit)
+
+            with timed_query("search_fulltext"):
+                cur.execute(sql, params)
+
+            for row in cur:
+                job = job_from_row(row)
+                job["rank"] = float(row[8])
+                jobs.append(job)
+
+            logger.info(f"Volltextsuche '{query}' lieferte {len(jobs)} Jobs")
+    except Exception as e:
+        logger.error(f"Fehler bei der Volltextsuche: {e}")
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    return jobs
+
+def encode_cursor(mode, values):
+    """
+    Verpackt die Keyset-Werte der letzten Zeile in ein undurchsichtiges Token
+    """
+    payload = json.dumps({"m": mode, "v": list(values)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(token, mode):
+    """
+    Entpackt ein Cursor-Token, wirft ValueError bei ungültigem oder fremdem Token
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        values = payload["v"]
+    except Exception as e:
+        raise ValueError(f"Ungültiger Cursor: {e}")
+    
+    if payload.get("m") != mode:
+        raise ValueError(f"Cursor gehört nicht zum Abfragemodus '{mode}'")
+    
+    if mode == "id" and len(values) == 1:
+        return int(values[0])
+    if mode == "rank" and len(values) == 2:
+        return float(values[0]), int(values[1])
+    raise ValueError("Ungültiger Cursor: unerwartete Werte")
+
+def estimate_job_count(title="", city="", source="", query="", days=None):
+    """
+    Schätzt die Trefferzahl aus den Planer-Statistiken statt mit SELECT COUNT(*)
+    """
+    if query:
+        where, params = build_job_filters(source=source, days=days)
+        sql = "SELECT 1 FROM jobs" + where + f" AND search_vector @@ {SEARCH_QUERY_EXPRESSION}"
+        params.append(query)
+    else:
+        where, params = build_job_filters(title, city, source, days)
+        sql = "SELECT 1 FROM jobs" + where
+    
+    conn = get_database(readonly=True)
+    if not conn:
+        return None
+    
+    try:
+        with conn.cursor() as cur:
+            with timed_query("estimate_count"):
+                cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cur.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.warning(f"Trefferzahl konnte nicht geschätzt werden: {e}")
+        return None
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+def get_jobs_page(title="", city="", source="", query="", page_size=DEFAULT_PAGE_SIZE, cursor=None, days=None):
+    """
+    Liefert eine Seite von Jobs samt Cursor für die nächste Seite
+    
+    Ohne Suchbegriff wird nach ID paginiert, mit Suchbegriff nach (rank, id).
+    Wirft ValueError bei ungültigem Cursor.
+    """
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    
+    # Eine Zeile mehr laden, um zu erkennen, ob es eine weitere Seite gibt
+    if query:
+        after = decode_cursor(cursor, "rank") if cursor else None
+        jobs = search_jobs_fulltext(query, source, page_size + 1, after=after, days=days)
+    else:
+        after_id = decode_cursor(cursor, "id") if cursor else None
+        jobs = get_jobs_by_criteria(title, city, source, limit=page_size + 1, after_id=after_id, days=days)
+    
+    next_cursor = None
+    if len(jobs) > page_size:
+        jobs = jobs[:page_size]
+        last = jobs[-1]
+        if query:
+            next_cursor = encode_cursor("rank", [last["rank"], last["id"]])
+        else:
+            next_cursor = encode_cursor("id", [last["id"]])
+    
+    return {
+        "jobs": jobs,
+        "nextCursor": next_cursor,
+        "estimatedTotal": estimate_job_count(title, city, source, query, days),
+        "pageSize": page_size
+    }
+
+def create_jobs_table(cur):
+    """
+    Legt die nach scraped_at monatlich partitionierte Jobs-Tabelle an
+    
+    source gehört zum Primärschlüssel, damit Monatspartitionen optional nach
+    Quelle unterteilt werden können (JOBS_PARTITION_BY_SOURCE=1).
+    """
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id SERIAL NOT NULL,
+            title VARCHAR(200) NOT NULL,
+            company VARCHAR(200) NOT NULL,
+            location VARCHAR(200) NOT NULL,
+            url VARCHAR(200) NOT NULL,
+            source VARCHAR(200) NOT NULL,
+            scraped_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED,
+            PRIMARY KEY (id, scraped_at, source)
+        ) PARTITION BY RANGE (scraped_at);
+    """)
+
+def migrate_legacy_jobs_table(cur):
+    """
+    Überführt eine alte, nicht partitionierte Jobs-Tabelle in die partitionierte Form
+    
+    Alte Einträge haben keinen Zeitstempel und erhalten scraped_at = jetzt.
+    """
+    logger.info("Nicht partitionierte Jobs-Tabelle gefunden, migriere sie")
+    cur.execute("ALTER TABLE jobs RENAME TO jobs_legacy")
+    cur.execute("ALTER SEQUENCE IF EXISTS jobs_id_seq RENAME TO jobs_legacy_id_seq")
+    cur.execute(f"ALTER INDEX IF EXISTS {SEARCH_INDEX_NAME} RENAME TO {SEARCH_INDEX_NAME}_legacy")
+    create_jobs_table(cur)
+    ensure_partitions(cur)
+    cur.execute("""
+        INSERT INTO jobs (id, title, company, location, url, source)
+        SELECT id, title, company, location, url, source FROM jobs_legacy
+    """)
+    migrated = cur.rowcount
+    cur.execute("SELECT setval('jobs_id_seq', COALESCE((SELECT MAX(id) FROM jobs), 0) + 1, false)")
+    cur.execute("DROP TABLE jobs_legacy")
+    logger.info(f"{migrated} Jobs in die partitionierte Tabelle übernommen")
+
 def create_tables_if_not_exist():
     """
     Erstellt die benötigten Tabellen, falls sie noch nicht existieren
+    
+    Die Jobs-Tabelle ist nach scraped_at monatlich partitioniert; die Partitionen
+    für den laufenden und die kommenden Monate werden hier mit angelegt.
     """
     conn = get_database()
     if not conn:
@@ -278,55 +631,42 @@ def create_tables_if_not_exist():
     
     try:
         with conn.cursor() as cur:
-            # Prüfe, ob die jobs-Tabelle existiert
-            try:
-                cur.execute("""
-                    SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_name = 'jobs'
-                    );
-                """)
-                table_exists = cur.fetchone()[0]
-                
-                if not table_exists:
-                    logger.info("Jobs-Tabelle existiert nicht, erstelle sie")
-                    cur.execute("""
-                        CREATE TABLE jobs (
-                            id SERIAL PRIMARY KEY,
-                            title VARCHAR(200) NOT NULL,
-                            company VARCHAR(200) NOT NULL,
-                            location VARCHAR(200) NOT NULL,
-                            url VARCHAR(200) NOT NULL,
-                            source VARCHAR(200) NOT NULL
-                        );
-                    """)
-                    conn.commit()
-                    logger.info("Jobs-Tabelle erfolgreich erstellt")
-                else:
-                    logger.info("Jobs-Tabelle existiert bereits")
-                    
-                return True
-            except Exception as e:
-                logger.error(f"Fehler bei der Tabellenprüfung oder -erstellung: {e}")
-                # Versuche es einfach direkt mit der CREATE TABLE-Anweisung
-                try:
-                    logger.info("Versuche Tabelle direkt zu erstellen...")
-                    cur.execute("""
-                        CREATE TABLE IF NOT EXISTS jobs (
-                            id SERIAL PRIMARY KEY,
-                            title VARCHAR(200) NOT NULL,
-                            company VARCHAR(200) NOT NULL,
-                            location VARCHAR(200) NOT NULL,
-                            url VARCHAR(200) NOT NULL,
-                            source VARCHAR(200) NOT NULL
-                        );
-                    """)
-                    conn.commit()
-                    logger.info("Jobs-Tabelle mit IF NOT EXISTS erfolgreich erstellt")
-                    return True
-                except Exception as e2:
-                    logger.error(f"Fehler beim direkten Erstellen der Tabelle: {e2}")
-                    return False
+            # Prüfe, ob die jobs-Tabelle existiert und ob sie partitioniert ist
+            cur.execute("""
+                SELECT c.relkind
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE c.relname = 'jobs' AND n.nspname = current_schema()
+            """)
+            result = cur.fetchone()
+            relkind = result[0] if result else None
+            if isinstance(relkind, bytes):
+                relkind = relkind.decode()
+            
+            migrated = False
+            if relkind is None:
+                logger.info("Jobs-Tabelle existiert nicht, erstelle sie")
+                create_jobs_table(cur)
+            elif relkind == "r":
+                migrate_legacy_jobs_table(cur)
+                migrated = True
+            else:
+                logger.info("Jobs-Tabelle existiert bereits")
+            
+            ensure_partitions(cur)
+            ensure_search_index(cur)
+            ensure_dedupe_columns(cur)
+            ensure_url_index(cur)
+            stats_created = ensure_stats_table(cur)
+            ensure_crawl_tasks_table(cur)
+            ensure_scrape_cache_table(cur)
+            conn.commit()
+            logger.info("Jobs-Schema erfolgreich überprüft")
+        
+        # Übernommene Alt-Einträge bzw. bestehende Jobs einmalig in die Statistik aufnehmen
+        if migrated or stats_created:
+            rebuild_job_stats()
+        return True
     except Exception as e:
         logger.error(f"Fehler beim Erstellen der Tabellen: {e}")
         try:
@@ -338,4 +678,4 @@ def create_tables_if_not_exist():
         try:
             conn.close()
         except Exception:
-            pass 
\ No newline at end of file
+            pass
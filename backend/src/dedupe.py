@@ -0,0 +1,218 @@
+"""Erkennung von Beinahe-Duplikaten über Quellen hinweg (MinHash/LSH).
+
+Dieselbe Stelle erscheint oft bei Stepstone und Monster mit leicht
+abweichendem Titel ("Elektriker (m/w/d)" vs. "Elektriker m/w/d") oder
+Firmennamen ("Bayer AG" vs. "Bayer"). Titel, Firma und Ort werden
+normalisiert, in Zeichen-Shingles zerlegt und per MinHash signiert. Die
+Signatur wird in LSH-Bänder aufgeteilt; nur Jobs, die mindestens ein Band
+teilen, werden verglichen - das hält den Aufwand annähernd linear.
+"""
+
+import hashlib
+import logging
+import re
+import struct
+import unicodedata
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+# Anzahl der Hash-Funktionen = Bänder * Zeilen pro Band
+NUM_PERM = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+
+# Ab dieser geschätzten Jaccard-Ähnlichkeit gelten zwei Jobs als Duplikat
+SIMILARITY_THRESHOLD = 0.7
+
+# Länge der Zeichen-Shingles
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Feste Koeffizienten, damit Signaturen über Prozesse hinweg vergleichbar sind
+_PERMUTATIONS = [
+    (
+        int.from_bytes(hashlib.sha1(f"a{i}".encode()).digest()[:8], "big") % (_MERSENNE_PRIME - 1) + 1,
+        int.from_bytes(hashlib.sha1(f"b{i}".encode()).digest()[:8], "big") % _MERSENNE_PRIME,
+    )
+    for i in range(NUM_PERM)
+]
+
+GENDER_TAG_PATTERN = re.compile(
+    r"[\(\[]?\s*\b(?:m|w|d|f|x|i|a)\s*/\s*(?:m|w|d|f|x|i|a)(?:\s*/\s*(?:m|w|d|f|x|i|a))?\b\s*[\)\]]?",
+    re.IGNORECASE,
+)
+GENDER_SUFFIX_PATTERN = re.compile(r"\*in(nen)?\b|:in(nen)?\b|/-?in(nen)?\b", re.IGNORECASE)
+LEGAL_SUFFIX_PATTERN = re.compile(
+    r"\b(?:gmbh\s*&\s*co\.?\s*kg(?:aa)?|gmbh|ggmbh|mbh|ag|kgaa|kg|ohg|gbr|se|ug(?:\s*\(haftungsbeschränkt\))?|e\.?\s?v|e\.?\s?k|ltd|inc|llc|co)\b\.?",
+    re.IGNORECASE,
+)
+UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+NON_WORD_PATTERN = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(value):
+    """Kleinbuchstaben, Umlaute ausgeschrieben, Akzente und Satzzeichen entfernt"""
+    value = (value or "").lower().translate(UMLAUTS)
+    value = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+    return NON_WORD_PATTERN.sub(" ", value).strip()
+
+
+def normalize_title(title):
+    """Entfernt Gender-Kennzeichnungen wie "(m/w/d)" oder "*in" aus dem Titel"""
+    title = GENDER_TAG_PATTERN.sub(" ", title or "")
+    title = GENDER_SUFFIX_PATTERN.sub("", title)
+    return normalize_text(title)
+
+
+def normalize_company(company):
+    """Entfernt Rechtsformzusätze wie GmbH, AG oder e.V. aus dem Firmennamen"""
+    return normalize_text(LEGAL_SUFFIX_PATTERN.sub(" ", company or ""))
+
+
+def normalize_location(location):
+    """Reduziert den Ort auf die Stadt (ohne PLZ und Zusätze wie Bundesland)"""
+    location = re.split(r"[,(/]| - ", location or "")[0]
+    location = re.sub(r"\b\d{5}\b", " ", location)
+    return normalize_text(location)
+
+
+def job_fingerprint_text(job):
+    """Normalisierter Vergleichstext aus Titel, Firma und Ort"""
+    return " | ".join([
+        normalize_title(job.get("title")),
+        normalize_company(job.get("company")),
+        normalize_location(job.get("location")),
+    ])
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Zeichen-Shingles eines Textes als Menge"""
+    text = f" {text} "
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def _hash_shingle(shingle):
+    return struct.unpack("<I", hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest())[0]
+
+
+def minhash_signature(text):
+    """MinHash-Signatur (NUM_PERM Werte) für einen Text"""
+    hashes = [_hash_shingle(s) for s in shingles(text)]
+    signature = []
+    for a, b in _PERMUTATIONS:
+        signature.append(min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes))
+    return signature
+
+
+def lsh_band_keys(signature):
+    """
+    Ein Schlüssel pro LSH-Band (als signierte 64-Bit-Zahl, passend für BIGINT)
+    """
+    keys = []
+    for band in range(LSH_BANDS):
+        chunk = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        digest = hashlib.blake2b(struct.pack(f"<I{LSH_ROWS}I", band, *chunk), digest_size=8).digest()
+        keys.append(struct.unpack("<q", digest)[0])
+    return keys
+
+
+def estimate_similarity(signature_a, signature_b):
+    """Geschätzte Jaccard-Ähnlichkeit zweier Signaturen"""
+    if not signature_a or not signature_b:
+        return 0.0
+    matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return matches / len(signature_a)
+
+
+def cluster_id_for(signature):
+    """Stabile Cluster-ID aus der Signatur des ersten Jobs eines Clusters"""
+    return hashlib.blake2b(struct.pack(f"<{NUM_PERM}I", *signature), digest_size=8).hexdigest()
+
+
+def fingerprint_job(job):
+    """Berechnet Signatur und LSH-Bänder für einen Job"""
+    signature = minhash_signature(job_fingerprint_text(job))
+    return signature, lsh_band_keys(signature)
+
+
+class LSHIndex:
+    """
+    In-Memory-LSH-Index: ordnet jedem Job ein Cluster zu
+
+    Kandidaten sind Jobs, die mindestens ein Band teilen; bestätigt wird per
+    geschätzter Jaccard-Ähnlichkeit.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.buckets = {}
+        self.signatures = {}
+
+    def add(self, signature, band_keys, cluster_id):
+        """Nimmt eine Signatur mit bekanntem Cluster in den Index auf"""
+        self.signatures.setdefault(cluster_id, signature)
+        for key in band_keys:
+            self.buckets.setdefault(key, set()).add(cluster_id)
+
+    def find(self, signature, band_keys):
+        """Liefert das ähnlichste bekannte Cluster oder None"""
+        best_cluster, best_score = None, 0.0
+        candidates = set()
+        for key in band_keys:
+            candidates |= self.buckets.get(key, set())
+        for candidate in candidates:
+            score = estimate_similarity(signature, self.signatures[candidate])
+            if score >= self.threshold and score > best_score:
+                best_cluster, best_score = candidate, score
+        return best_cluster
+
+    def assign(self, signature, band_keys):
+        """Ordnet eine Signatur einem bestehenden oder neuen Cluster zu"""
+        cluster_id = self.find(signature, band_keys) or cluster_id_for(signature)
+        self.add(signature, band_keys, cluster_id)
+        return cluster_id
+
+
+def assign_clusters(jobs, index=None):
+    """
+    Setzt für jeden Job ohne gespeicherte cluster_id eine berechnete Cluster-ID
+
+    Mit index können bereits bekannte Cluster (z.B. aus der Datenbank) vorbelegt werden.
+    """
+    index = index or LSHIndex()
+    for job in jobs:
+        if isinstance(job, dict) and not job.get("cluster_id"):
+            job["cluster_id"] = index.assign(*fingerprint_job(job))
+    return jobs
+
+
+def dedupe_jobs(jobs):
+    """
+    Fasst Beinahe-Duplikate zusammen und behält den ersten Job je Cluster
+
+    Gespeicherte cluster_id-Werte werden übernommen statt neu berechnet.
+    Der behaltene Job bekommt unter "duplicates" Quelle und URL der anderen.
+    """
+    jobs = assign_clusters([job for job in jobs if isinstance(job, dict)])
+
+    merged = {}
+    result = []
+    for job in jobs:
+        cluster_id = job["cluster_id"]
+        if cluster_id in merged:
+            merged[cluster_id].setdefault("duplicates", []).append({
+                "source": job.get("source"),
+                "url": job.get("url")
+            })
+            continue
+        merged[cluster_id] = job
+        result.append(job)
+
+    if len(result) < len(jobs):
+        logger.info(f"{len(jobs) - len(result)} Duplikate in {len(jobs)} Jobs zusammengefasst")
+    return result
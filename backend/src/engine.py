@@ -0,0 +1,341 @@
+"""Gemeinsame Datenbank-Engine für SQLAlchemy-Modell und rohe SQL-Zugriffe.
+
+Es gibt genau eine SQLAlchemy-Engine pro Prozess. Flask-SQLAlchemy (models.py)
+verwendet sie für die Session, database.py holt sich daraus rohe
+DBAPI-Verbindungen (``get_engine().raw_connection()``). Beide Wege teilen
+sich damit einen Connection-Pool und zählen nur einmal gegen das
+Verbindungslimit von Postgres.
+
+Ist ``DATABASE_READ_URL`` gesetzt, bekommt das Replikat einen eigenen Pool
+(``get_engine(readonly=True)``). Lesende Abfragen gehen dorthin, solange die
+Replikationsverzögerung unter ``DB_REPLICA_MAX_LAG`` Sekunden liegt und das
+Replikat erreichbar ist - sonst an den Primary. Schreibzugriffe laufen immer
+über den Primary.
+
+Häufige Abfragen laufen als serverseitige Prepared Statements
+(``execute_prepared``); jede gemessene Abfrage landet in ``QUERY_STATS``.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from .metrics import DB_QUERY_SECONDS
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+# Pool-Größe pro Prozess (gunicorn-Worker); Überlauf wird nach Rückgabe geschlossen
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "5"))
+POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", "10"))
+POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+
+# Verbindungs-Timeout für langsame Netzwerke (Railway)
+CONNECT_TIMEOUT = 30
+
+DATABASE_URL_VARS = ["DATABASE_URL", "DATABASE_PUBLIC_URL", "POSTGRES_URL", "PGDATABASE"]
+FALLBACK_DATABASE_URL = "postgresql:///jobbig"
+
+# Optionales Lese-Replikat
+READ_URL_VAR = "DATABASE_READ_URL"
+
+# Maximal tolerierte Replikationsverzögerung in Sekunden
+REPLICA_MAX_LAG = float(os.environ.get("DB_REPLICA_MAX_LAG", "10"))
+
+# Kurzer Verbindungs-Timeout, damit ein ausgefallenes Replikat Lesezugriffe nicht blockiert
+REPLICA_CONNECT_TIMEOUT = int(os.environ.get("DB_REPLICA_CONNECT_TIMEOUT", "3"))
+
+# Wie oft (Sekunden) die Verzögerung des Replikats neu gemessen wird
+REPLICA_CHECK_INTERVAL = float(os.environ.get("DB_REPLICA_CHECK_INTERVAL", "5"))
+
+# Engines nach Rolle ("primary", "replica")
+_engines = {}
+_engine_lock = threading.Lock()
+
+# Zuletzt gemessener Zustand des Replikats
+_replica_state = {
+    "checked_at": None,
+    "lag_seconds": None,
+    "healthy": False,
+    "error": None,
+}
+_replica_lock = threading.Lock()
+
+# Replikationsverzögerung: 0, wenn der WAL-Receiver streamt und alles empfangene WAL
+# eingespielt ist (auch bei ruhigem Primary), sonst Alter der zuletzt eingespielten
+# Transaktion. Ohne laufenden Receiver sind beide LSNs veraltet und damit gleich, das
+# sagt nichts über die Verzögerung aus. NULL, wenn noch nie etwas eingespielt wurde.
+# status ist ohne pg_read_all_stats NULL, dann zählt nur, dass der Receiver läuft.
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+            AND EXISTS (
+                SELECT 1 FROM pg_stat_wal_receiver
+                WHERE COALESCE(status, 'streaming') = 'streaming'
+            ) THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+# Laufzeit je Abfrage-Label: Aufrufe, Gesamt- und Maximaldauer in Millisekunden
+QUERY_STATS = {}
+_stats_lock = threading.Lock()
+
+_PLACEHOLDER_PATTERN = re.compile(r"%s|%%")
+
+
+def resolve_database_url():
+    """
+    Ermittelt die Datenbank-URL aus den bekannten Umgebungsvariablen
+
+    Railway liefert 'postgres://', SQLAlchemy erwartet 'postgresql://'.
+    """
+    for var_name in DATABASE_URL_VARS:
+        database_url = os.environ.get(var_name)
+        if database_url:
+            logger.debug("Verwende %s für Datenbankverbindung", var_name)
+            break
+    else:
+        database_url = FALLBACK_DATABASE_URL
+        logger.warning(f"Keine Datenbank-Umgebungsvariable gefunden. Verwende Fallback: {database_url}")
+
+    if database_url.startswith("postgres://"):
+        database_url = database_url.replace("postgres://", "postgresql://", 1)
+    return database_url
+
+
+def mask_url(database_url):
+    """Entfernt Zugangsdaten aus einer URL für das Logging"""
+    if "@" not in database_url:
+        return database_url
+    scheme = database_url.split("://", 1)[0]
+    return f"{scheme}://***@{database_url.rsplit('@', 1)[1]}"
+
+
+def create_db_engine(database_url, connect_timeout=CONNECT_TIMEOUT):
+    """Erstellt eine Engine mit QueuePool für den psycopg2-Treiber"""
+    from sqlalchemy import create_engine
+
+    if database_url.startswith("postgresql://"):
+        database_url = database_url.replace("postgresql://", "postgresql+psycopg2://", 1)
+
+    engine = create_engine(
+        database_url,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+        # Tote Verbindungen (Neustart der DB, Idle-Timeout) vor der Ausgabe erkennen
+        pool_pre_ping=True,
+        connect_args={
+            "connect_timeout": connect_timeout,
+            "application_name": "jobbig-app",  # Hilft bei der Identifikation in DB-Logs
+        },
+    )
+    logger.info(f"Datenbank-Engine erstellt für {mask_url(database_url)} (Pool {POOL_SIZE}+{MAX_OVERFLOW})")
+    return engine
+
+
+def resolve_read_database_url():
+    """URL des Lese-Replikats oder None, wenn keines konfiguriert ist"""
+    database_url = os.environ.get(READ_URL_VAR)
+    if not database_url:
+        return None
+    if database_url.startswith("postgres://"):
+        database_url = database_url.replace("postgres://", "postgresql://", 1)
+    return database_url
+
+
+def get_engine(readonly=False):
+    """
+    Gibt die gemeinsame Engine des Prozesses zurück (wird beim ersten Aufruf erstellt)
+
+    readonly=True liefert die Engine des Replikats; ohne DATABASE_READ_URL ist
+    das dieselbe Engine wie für den Primary.
+    """
+    role = "replica" if readonly and resolve_read_database_url() else "primary"
+    engine = _engines.get(role)
+    if engine is None:
+        with _engine_lock:
+            engine = _engines.get(role)
+            if engine is None:
+                if role == "replica":
+                    engine = create_db_engine(resolve_read_database_url(), REPLICA_CONNECT_TIMEOUT)
+                else:
+                    engine = create_db_engine(resolve_database_url())
+                _engines[role] = engine
+    return engine
+
+
+def dispose_engine():
+    """Schließt alle Verbindungen der Pools (z.B. nach fork oder in Tests)"""
+    with _engine_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+    with _replica_lock:
+        _replica_state.update(checked_at=None, lag_seconds=None, healthy=False, error=None)
+
+
+def measure_replica_lag():
+    """Misst die Replikationsverzögerung in Sekunden (None bei Fehler)"""
+    conn = None
+    try:
+        conn = get_engine(readonly=True).raw_connection()
+        with conn.cursor() as cur:
+            with timed_query("replica_lag"):
+                cur.execute(REPLICA_LAG_SQL)
+                lag = cur.fetchone()[0]
+        conn.rollback()
+        if lag is None:
+            logger.warning("Replikat hat keinen WAL-Empfang und noch keine Transaktion eingespielt")
+            _replica_state.update(lag_seconds=None, error="Kein WAL-Empfang")
+            return None
+        lag = float(lag)
+        _replica_state.update(lag_seconds=lag, error=None)
+        return lag
+    except Exception as e:
+        logger.warning(f"Replikat nicht erreichbar: {type(e).__name__}: {e}")
+        _replica_state.update(lag_seconds=None, error=f"{type(e).__name__}: {e}")
+        return None
+    finally:
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+def _replica_checked_recently():
+    checked_at = _replica_state["checked_at"]
+    return checked_at is not None and time.monotonic() - checked_at < REPLICA_CHECK_INTERVAL
+
+
+def replica_usable():
+    """
+    Prüft, ob Lesezugriffe an das Replikat gehen dürfen
+
+    Das Ergebnis wird REPLICA_CHECK_INTERVAL Sekunden zwischengespeichert, damit
+    nicht jede Abfrage eine zusätzliche Messung auslöst.
+    """
+    if not resolve_read_database_url():
+        return False
+
+    if _replica_checked_recently():
+        return _replica_state["healthy"]
+
+    with _replica_lock:
+        if _replica_checked_recently():
+            return _replica_state["healthy"]
+        lag = measure_replica_lag()
+        healthy = lag is not None and lag <= REPLICA_MAX_LAG
+        if healthy != _replica_state["healthy"]:
+            if healthy:
+                logger.info(f"Lesezugriffe gehen an das Replikat (Verzögerung {lag:.1f}s)")
+            else:
+                logger.warning(f"Lesezugriffe gehen an den Primary (Replikat-Verzögerung: {lag}, Grenze {REPLICA_MAX_LAG}s)")
+        _replica_state["healthy"] = healthy
+        _replica_state["checked_at"] = time.monotonic()
+        return healthy
+
+
+def mark_replica_unhealthy(error):
+    """Schaltet Lesezugriffe bis zur nächsten Messung auf den Primary um"""
+    with _replica_lock:
+        _replica_state.update(healthy=False, error=error, checked_at=time.monotonic())
+
+
+def _pool_info(engine):
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "idle": pool.checkedin(),
+    }
+
+
+def pool_status():
+    """Kennzahlen der Connection-Pools und des Replikats für /diagnostics"""
+    status = {"initialized": bool(_engines)}
+    for role, engine in list(_engines.items()):
+        status[role] = _pool_info(engine)
+    if resolve_read_database_url():
+        status["replica_state"] = {
+            "healthy": _replica_state["healthy"],
+            "lag_seconds": _replica_state["lag_seconds"],
+            "max_lag_seconds": REPLICA_MAX_LAG,
+            "error": _replica_state["error"],
+        }
+    return status
+
+
+def record_query_time(label, duration):
+    """Addiert die Dauer einer Abfrage (Sekunden) zu QUERY_STATS"""
+    duration_ms = duration * 1000
+    with _stats_lock:
+        stats = QUERY_STATS.setdefault(label, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stats["calls"] += 1
+        stats["total_ms"] += duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+    DB_QUERY_SECONDS.observe(duration, query=label)
+
+
+@contextmanager
+def timed_query(label):
+    """Misst die Laufzeit des Blocks als Abfrage label"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_query_time(label, time.perf_counter() - start)
+
+
+def get_query_stats():
+    """Abfrage-Statistik mit Durchschnittswerten für /diagnostics"""
+    with _stats_lock:
+        return {
+            label: {
+                "calls": stats["calls"],
+                "total_ms": round(stats["total_ms"], 2),
+                "avg_ms": round(stats["total_ms"] / stats["calls"], 3) if stats["calls"] else 0.0,
+                "max_ms": round(stats["max_ms"], 2),
+            }
+            for label, stats in QUERY_STATS.items()
+        }
+
+
+def to_positional(sql):
+    """Ersetzt %s-Platzhalter durch $1, $2, ... für PREPARE"""
+    counter = iter(range(1, 10000))
+
+    def replace(match):
+        return "%" if match.group(0) == "%%" else f"${next(counter)}"
+
+    return _PLACEHOLDER_PATTERN.sub(replace, sql)
+
+
+def execute_prepared(conn, cur, sql, params, label):
+    """
+    Führt sql als Prepared Statement auf dieser Verbindung aus
+
+    Jede Form einer Abfrage wird pro Pool-Verbindung einmal vorbereitet; die
+    Namen stehen in conn.info und leben so lange wie die DBAPI-Verbindung.
+    """
+    name = "jobbig_" + hashlib.md5(sql.encode("utf-8")).hexdigest()[:16]
+    prepared = conn.info.setdefault("prepared_statements", set())
+
+    with timed_query(label):
+        if name not in prepared:
+            cur.execute(f"PREPARE {name} AS {to_positional(sql)}")
+            prepared.add(name)
+        if params:
+            cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+        else:
+            cur.execute(f"EXECUTE {name}")
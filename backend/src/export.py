@@ -0,0 +1,299 @@
+"""Streaming-Export der gespeicherten Jobs (NDJSON, CSV, Parquet).
+
+Alle Formate werden blockweise erzeugt, der Speicherbedarf hängt nicht von
+der Anzahl der Jobs ab:
+
+- CSV kommt bei Postgres direkt aus ``COPY (SELECT ...) TO STDOUT``, sonst
+  aus dem serverseitigen Cursor des Speicher-Backends
+- NDJSON liest über den serverseitigen Cursor (``storage.stream_jobs``)
+- Parquet schreibt je ``EXPORT_PARQUET_ROW_GROUP`` Jobs eine Row Group
+  (benötigt das optionale Paket pyarrow)
+
+CSV und NDJSON lassen sich zusätzlich gzip-komprimieren. Es gelten dieselben
+Filter wie für get_jobs_by_criteria (Titel, Stadt, Quelle, Zeitfenster).
+
+    python -m src.export --format parquet --output jobs.parquet --days 0
+"""
+
+import argparse
+import importlib.util
+import io
+import logging
+import os
+import queue
+import sys
+import threading
+import zlib
+from datetime import datetime
+
+from .streaming import JOB_COLUMNS, csv_chunks, ndjson_chunks
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+FILE_EXTENSIONS = {"ndjson": "ndjson", "csv": "csv", "parquet": "parquet"}
+
+# Jobs pro Parquet-Row-Group
+PARQUET_ROW_GROUP_SIZE = int(os.environ.get("EXPORT_PARQUET_ROW_GROUP", "50000"))
+
+# Blockgröße für COPY TO und Anzahl gepufferter Blöcke zwischen COPY-Thread und Antwort
+COPY_CHUNK_SIZE = 1 << 16
+COPY_QUEUE_CHUNKS = 16
+
+_COPY_DONE = object()
+
+
+def parquet_available():
+    """True, wenn pyarrow installiert ist"""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def gzip_chunks(chunks, level=6):
+    """Komprimiert Text- oder Byte-Blöcke fortlaufend als gzip-Stream"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _QueueWriter:
+    """Datei-Ersatz für copy_expert: sammelt Blöcke und reicht sie an eine begrenzte Queue weiter"""
+
+    def __init__(self, chunks, cancelled):
+        self.chunks = chunks
+        self.cancelled = cancelled
+        self.buffer = []
+        self.size = 0
+
+    def write(self, data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        self.buffer.append(data)
+        self.size += len(data)
+        if self.size >= COPY_CHUNK_SIZE:
+            self.flush()
+        return len(data)
+
+    def flush(self):
+        if not self.buffer:
+            return
+        chunk = type(self.buffer[0])().join(self.buffer)
+        self.buffer, self.size = [], 0
+        # Warten, bis die Antwort den Block abgeholt hat (Gegendruck statt Pufferung)
+        while True:
+            if self.cancelled.is_set():
+                raise IOError("Export abgebrochen")
+            try:
+                self.chunks.put(chunk, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+
+def copy_csv_chunks(title="", city="", source="", days=None):
+    """
+    CSV mit Kopfzeile direkt aus COPY TO STDOUT (Postgres)
+
+    COPY läuft in einem eigenen Thread und schreibt in eine begrenzte Queue;
+    wird der Generator vorzeitig geschlossen, bricht der Export ab.
+    """
+    from .database import build_job_filters, get_database
+
+    chunks = queue.Queue(maxsize=COPY_QUEUE_CHUNKS)
+    cancelled = threading.Event()
+    errors = []
+
+    def run_copy():
+        conn = get_database(readonly=True)
+        if not conn:
+            errors.append(RuntimeError("Keine Datenbankverbindung vorhanden, Export nicht möglich"))
+            chunks.put(_COPY_DONE)
+            return
+        try:
+            with conn.cursor() as cur:
+                where, params = build_job_filters(title, city, source, days)
+                select = cur.mogrify(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs" + where + " ORDER BY id", params)
+                if isinstance(select, bytes):
+                    select = select.decode("utf-8")
+                writer = _QueueWriter(chunks, cancelled)
+                cur.copy_expert(f"COPY ({select}) TO STDOUT WITH (FORMAT csv, HEADER)", writer, size=COPY_CHUNK_SIZE)
+                writer.flush()
+        except Exception as e:
+            if not cancelled.is_set():
+                logger.error(f"Fehler beim CSV-Export per COPY: {type(e).__name__}: {e}")
+                errors.append(e)
+        finally:
+            try:
+                conn.rollback()
+                conn.close()
+            except Exception:
+                pass
+            while not cancelled.is_set():
+                try:
+                    chunks.put(_COPY_DONE, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    thread = threading.Thread(target=run_copy, name="export-copy", daemon=True)
+    thread.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is _COPY_DONE:
+                break
+            yield chunk
+        if errors:
+            raise errors[0]
+    finally:
+        cancelled.set()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Beschreibbares Datei-Objekt, dessen Inhalt blockweise abgeholt wird"""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def parquet_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.int64()),
+        ("title", pa.string()),
+        ("company", pa.string()),
+        ("location", pa.string()),
+        ("url", pa.string()),
+        ("source", pa.string()),
+        ("scraped_at", pa.timestamp("us", tz="UTC")),
+        ("cluster_id", pa.string()),
+    ])
+
+
+def parquet_chunks(rows, row_group_size=PARQUET_ROW_GROUP_SIZE):
+    """Schreibt Jobs als Parquet (zstd) und liefert die Datei nach jeder Row Group stückweise"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+
+    def write_group(group):
+        columns = {name: [] for name in schema.names}
+        for job in group:
+            for name in schema.names:
+                value = job.get(name)
+                if name == "scraped_at" and isinstance(value, str):
+                    value = datetime.fromisoformat(value)
+                columns[name].append(value)
+        writer.write_table(pa.table(columns, schema=schema), row_group_size=row_group_size)
+
+    try:
+        group = []
+        for job in rows:
+            group.append(job)
+            if len(group) >= row_group_size:
+                write_group(group)
+                group = []
+                yield sink.drain()
+        if group:
+            write_group(group)
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_chunks(storage, fmt, compress=False, title="", city="", source="", days=None):
+    """
+    Wählt den Export-Generator für Format und Backend
+
+    Wirft ValueError bei unbekanntem Format und RuntimeError, wenn Parquet
+    ohne pyarrow angefordert wird.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unbekanntes Format '{fmt}', erlaubt: {', '.join(EXPORT_FORMATS)}")
+
+    if fmt == "parquet":
+        if not parquet_available():
+            raise RuntimeError("Parquet-Export benötigt das Paket pyarrow (pip install pyarrow)")
+        # Parquet ist bereits spaltenweise komprimiert
+        return parquet_chunks(storage.stream_jobs(title, city, source, days=days))
+
+    if fmt == "csv" and storage.name == "postgres":
+        chunks = copy_csv_chunks(title, city, source, days)
+    elif fmt == "csv":
+        chunks = csv_chunks(storage.stream_jobs(title, city, source, days=days))
+    else:
+        chunks = ndjson_chunks(storage.stream_jobs(title, city, source, days=days))
+
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def export_filename(fmt, compress=False):
+    """Dateiname für Content-Disposition bzw. die CLI"""
+    name = f"jobs.{FILE_EXTENSIONS[fmt]}"
+    return name + ".gz" if compress and fmt != "parquet" else name
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gespeicherte Jobs exportieren")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="ndjson")
+    parser.add_argument("--gzip", action="store_true", help="CSV/NDJSON gzip-komprimieren")
+    parser.add_argument("--output", default=None, help="Zieldatei, - für stdout (Standard: jobs.<format>)")
+    parser.add_argument("--title", default="")
+    parser.add_argument("--city", default="")
+    parser.add_argument("--source", default="")
+    parser.add_argument("--days", type=int, default=0, help="Zeitfenster in Tagen (0 = alle)")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from .storage import get_storage
+
+    output = args.output or export_filename(args.format, args.gzip)
+    chunks = export_chunks(get_storage(), args.format, args.gzip, args.title, args.city, args.source, args.days)
+
+    target = sys.stdout.buffer if output == "-" else open(output, "wb")
+    written = 0
+    try:
+        for chunk in chunks:
+            data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+            target.write(data)
+            written += len(data)
+    finally:
+        if target is not sys.stdout.buffer:
+            target.close()
+
+    logger.info(f"Export nach {output} abgeschlossen ({written / (1024 * 1024):.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,267 @@
+"""Write-behind-Warteschlange für gescrapte Jobs.
+
+Die Routen legen Jobs nur noch in eine begrenzte Warteschlange und antworten
+sofort. Ein Hintergrund-Thread sammelt die Jobs aller Anfragen und schreibt
+sie gebündelt über das Speicher-Backend, sobald ``INGEST_BATCH_SIZE`` Jobs
+vorliegen oder ``INGEST_FLUSH_INTERVAL`` Sekunden vergangen sind.
+
+Ist die Datenbank langsam, läuft die Warteschlange voll: ``submit`` wartet
+dann bis zu ``INGEST_PUT_TIMEOUT`` Sekunden und schreibt den Rest selbst
+(synchron) - so bremst die Last die Aufrufer, statt Jobs zu verwerfen. Beim
+Beenden des Prozesses wird die Warteschlange geleert (atexit).
+
+Mit ``INGEST_WRITE_BEHIND=0`` wird synchron gespeichert wie bisher.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from .storage import get_storage
+from .tracing import trace
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND = os.environ.get("INGEST_WRITE_BEHIND", "1") != "0"
+
+# Maximale Anzahl wartender Jobs
+QUEUE_SIZE = int(os.environ.get("INGEST_QUEUE_SIZE", "10000"))
+
+# Jobs pro Schreibvorgang und maximale Wartezeit bis zum Schreiben
+BATCH_SIZE = int(os.environ.get("INGEST_BATCH_SIZE", "500"))
+FLUSH_INTERVAL = float(os.environ.get("INGEST_FLUSH_INTERVAL", "1.0"))
+
+# Wie lange submit bei voller Warteschlange wartet, bevor synchron geschrieben wird
+PUT_TIMEOUT = float(os.environ.get("INGEST_PUT_TIMEOUT", "2.0"))
+
+# Wiederholungen, wenn das Backend nicht erreichbar ist (mit exponentiellem Backoff).
+# Datenfehler werden nicht wiederholt: fehlerhafte Zeilen verwirft save_jobs einzeln.
+MAX_RETRIES = 3
+RETRY_DELAY = 0.5
+
+# Maximale Wartezeit beim Leeren der Warteschlange während des Herunterfahrens
+DRAIN_TIMEOUT = float(os.environ.get("INGEST_DRAIN_TIMEOUT", "15"))
+
+_STOP = object()
+
+_ingest_queue = None
+_ingest_lock = threading.Lock()
+
+
+class IngestQueue:
+    """Begrenzte Warteschlange mit Hintergrund-Thread, der Jobs gebündelt speichert"""
+
+    def __init__(self, storage=None, maxsize=QUEUE_SIZE, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.storage = storage or get_storage()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.thread = None
+        self.pid = None
+        self.stopping = False
+        self._lock = threading.Lock()
+        # Schreib-Thread und synchrone Fallbacks der Anfragen zählen gleichzeitig
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "submitted": 0,
+            "saved": 0,
+            "rejected": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "dropped": 0,
+            "sync_fallbacks": 0,
+            "last_batch_size": 0,
+            "last_flush_ms": None,
+        }
+
+    def start(self):
+        """Startet den Schreib-Thread (nach fork im Kindprozess neu)"""
+        with self._lock:
+            if self.thread is not None and self.thread.is_alive() and self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self.stopping = False
+            self.thread = threading.Thread(target=self._run, name="ingest-writer", daemon=True)
+            self.thread.start()
+
+    def submit(self, jobs):
+        """
+        Reiht Jobs zum Speichern ein und gibt die Anzahl der angenommenen Jobs zurück
+
+        Die Jobs werden kopiert, damit der Schreib-Thread (cluster_id) nicht
+        die Objekte verändert, die gerade als Antwort serialisiert werden.
+        """
+        jobs = [dict(job) for job in jobs or [] if isinstance(job, dict)]
+        if not jobs:
+            return 0
+
+        if self.stopping:
+            return self._save_sync(jobs)
+
+        self.start()
+        self._count(submitted=len(jobs))
+
+        deadline = time.monotonic() + PUT_TIMEOUT
+        for position, job in enumerate(jobs):
+            try:
+                self.queue.put(job, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                # Gegendruck: Warteschlange voll, Rest im aufrufenden Thread schreiben
+                rest = jobs[position:]
+                logger.warning(f"Ingest-Warteschlange voll, speichere {len(rest)} Jobs synchron")
+                self._count(sync_fallbacks=1)
+                return position + self._save_sync(rest)
+        return len(jobs)
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def _save_sync(self, jobs):
+        saved = self.storage.save_jobs(jobs) or 0
+        self._count(saved=saved, rejected=len(jobs) - saved)
+        return saved
+
+    def _next_batch(self):
+        """Wartet auf den ersten Job und sammelt bis Batch-Größe oder Intervall erreicht sind"""
+        batch = []
+        item = self.queue.get()
+        if item is _STOP:
+            return batch, True
+        batch.append(item)
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _flush(self, batch):
+        start = time.perf_counter()
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                saved = self.storage.save_jobs(batch) or 0
+            except Exception as e:
+                logger.error(f"Fehler beim Speichern eines Ingest-Batches: {type(e).__name__}: {e}")
+                saved = 0
+            if saved:
+                with self._stats_lock:
+                    self.stats["saved"] += saved
+                    self.stats["rejected"] += len(batch) - saved
+                    self.stats["batches"] += 1
+                    self.stats["last_batch_size"] = len(batch)
+                    self.stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 2)
+                return True
+            # Nichts gespeichert, Backend aber erreichbar: Datenfehler, eine Wiederholung hilft nicht
+            if self.storage.verify():
+                self._count(failed_batches=1, rejected=len(batch))
+                logger.error(f"Ingest-Batch mit {len(batch)} Jobs abgelehnt (keine Zeile gültig)")
+                return False
+            if attempt < MAX_RETRIES and not self.stopping:
+                time.sleep(RETRY_DELAY * 2 ** attempt)
+
+        self._count(failed_batches=1, dropped=len(batch))
+        logger.error(f"Ingest-Batch mit {len(batch)} Jobs konnte nicht gespeichert werden")
+        return False
+
+    def _run(self):
+        while True:
+            batch, stop = self._next_batch()
+            if batch:
+                # Eigener Trace, da der Batch Jobs aus mehreren Anfragen enthält
+                with trace("ingest_flush", jobs=len(batch)):
+                    self._flush(batch)
+            if stop:
+                break
+
+        # Nach dem Stopp noch eingereihte Jobs ebenfalls schreiben
+        rest = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                rest.append(item)
+        for start in range(0, len(rest), self.batch_size):
+            self._flush(rest[start:start + self.batch_size])
+
+    def stop(self, timeout=DRAIN_TIMEOUT):
+        """Leert die Warteschlange und beendet den Schreib-Thread"""
+        self.stopping = True
+        thread = self.thread
+        if thread is None or not thread.is_alive() or self.pid != os.getpid():
+            return True
+        pending = self.queue.qsize()
+        if pending:
+            logger.info(f"Leere Ingest-Warteschlange ({pending} Jobs)")
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.error("Ingest-Warteschlange blockiert, Stopp-Signal konnte nicht eingereiht werden")
+            return False
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.error(f"Ingest-Warteschlange nach {timeout}s nicht geleert, {self.queue.qsize()} Jobs verloren")
+            return False
+        return True
+
+    def info(self):
+        """Kennzahlen für /diagnostics"""
+        return {
+            "write_behind": True,
+            "pending": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "batch_size": self.batch_size,
+            "flush_interval_seconds": self.flush_interval,
+            **self._stats_snapshot(),
+        }
+
+    def _stats_snapshot(self):
+        with self._stats_lock:
+            return dict(self.stats)
+
+
+def get_ingest_queue():
+    """Gibt die Warteschlange des Prozesses zurück (wird beim ersten Aufruf erstellt)"""
+    global _ingest_queue
+    if _ingest_queue is None:
+        with _ingest_lock:
+            if _ingest_queue is None:
+                _ingest_queue = IngestQueue()
+                atexit.register(_ingest_queue.stop)
+    return _ingest_queue
+
+
+def enqueue_jobs(jobs):
+    """
+    Übergibt gescrapte Jobs zum Speichern
+
+    Im Write-behind-Modus kehrt der Aufruf sofort zurück; sonst wird synchron
+    gespeichert. Gibt die Anzahl der übergebenen Jobs zurück.
+    """
+    if not WRITE_BEHIND:
+        return get_storage().save_jobs(jobs) or 0
+    return get_ingest_queue().submit(jobs)
+
+
+def ingest_info():
+    """Zustand der Warteschlange für /diagnostics"""
+    if not WRITE_BEHIND:
+        return {"write_behind": False}
+    if _ingest_queue is None:
+        return {"write_behind": True, "pending": 0}
+    return _ingest_queue.info()
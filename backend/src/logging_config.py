@@ -0,0 +1,195 @@
+"""Nicht blockierendes, gesampeltes Logging mit JSON-Ausgabe.
+
+configure_logging() ersetzt die Handler des Root-Loggers durch einen
+QueueHandler: der aufrufende Thread legt den LogRecord nur in eine Queue,
+Formatieren und Schreiben erledigt ein Hintergrund-Thread (QueueListener).
+Nachrichten mit ``%s``-Argumenten werden erst dort zusammengesetzt.
+
+Vor der Queue entscheidet ein Filter je Kategorie - ``extra={"category": ...}``
+oder sonst der Logger-Name:
+
+- Sampling (``LOG_SAMPLING``, z.B. ``job_found=0.1,werkzeug=0.2``) für DEBUG/INFO
+- Rate-Limit in Meldungen pro Sekunde (``LOG_RATE_LIMIT``, z.B.
+  ``20,static=5``; die Zahl ohne Namen gilt für alle Kategorien) für alles
+  unter ERROR. Die nächste durchgelassene Meldung trägt im Feld
+  ``suppressed`` die Anzahl der verworfenen.
+
+Fehler kommen immer durch. Jede Zeile enthält ``trace_id``/``span_id`` des
+aktiven Traces (siehe tracing.py), Felder aus ``extra`` werden übernommen.
+``LOG_FORMAT=text`` schaltet auf die bisherige Textausgabe zurück.
+"""
+
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+from .metrics import LOG_RECORDS_DROPPED
+from .tracing import current_span_id, current_trace_id
+
+# Ausgabeformat: json oder text
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json").lower()
+
+# Wartende Meldungen; ist die Queue voll, werden Meldungen unter ERROR verworfen
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Standardattribute eines LogRecords; alles andere stammt aus extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+_CONTEXT_ATTRS = {"category", "trace_id", "span_id", "suppressed"}
+
+
+def parse_category_values(spec, default=None):
+    """
+    Liest 'name=wert,...' in ein Dict; ein Wert ohne Namen wird Standard (Schlüssel None)
+
+    Ungültige Einträge werden ignoriert.
+    """
+    values = {None: default} if default is not None else {}
+    for item in (spec or "").split(","):
+        name, _, value = item.strip().rpartition("=")
+        try:
+            values[name.strip() or None] = float(value)
+        except ValueError:
+            continue
+    return values
+
+
+class SamplingFilter(logging.Filter):
+    """Sampling und Rate-Limit je Kategorie; ergänzt außerdem die Trace-Felder"""
+
+    def __init__(self, sample_rates=None, rate_limits=None):
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+        self.rate_limits = rate_limits or {}
+        # Kategorie -> [Tokens, letzte Auffüllung, verworfen seit letzter Meldung]
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        category = getattr(record, "category", None) or record.name
+        if record.levelno >= logging.ERROR:
+            return self._annotate(record, category)
+
+        if record.levelno < logging.WARNING:
+            rate = self.sample_rates.get(category, self.sample_rates.get(None, 1.0))
+            if rate < 1.0 and random.random() >= rate:
+                LOG_RECORDS_DROPPED.inc(category=category, reason="sampled")
+                return False
+
+        limit = self.rate_limits.get(category, self.rate_limits.get(None))
+        if limit:
+            now = time.monotonic()
+            with self._lock:
+                bucket = self._buckets.get(category)
+                if bucket is None:
+                    bucket = self._buckets[category] = [limit, now, 0]
+                bucket[0] = min(limit, bucket[0] + (now - bucket[1]) * limit)
+                bucket[1] = now
+                if bucket[0] < 1:
+                    bucket[2] += 1
+                    LOG_RECORDS_DROPPED.inc(category=category, reason="rate_limited")
+                    return False
+                bucket[0] -= 1
+                if bucket[2]:
+                    record.suppressed = bucket[2]
+                    bucket[2] = 0
+        return self._annotate(record, category)
+
+    @staticmethod
+    def _annotate(record, category):
+        record.category = category
+        record.trace_id = current_trace_id()
+        record.span_id = current_span_id()
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler, der nicht formatiert und bei voller Queue verwirft statt zu blockieren"""
+
+    def prepare(self, record):
+        # Formatiert wird erst im Listener-Thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc(category=getattr(record, "category", record.name), reason="queue_full")
+
+
+class JsonFormatter(logging.Formatter):
+    """Eine JSON-Zeile je Meldung"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        category = getattr(record, "category", None)
+        if category and category != record.name:
+            entry["category"] = category
+        for key in ("trace_id", "span_id", "suppressed"):
+            value = getattr(record, key, None)
+            if value:
+                entry[key] = value
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key not in _CONTEXT_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+_listener = None
+
+
+def configure_logging(level=logging.INFO, fmt=LOG_FORMAT, stream=None):
+    """
+    Richtet den Root-Logger mit Queue, Hintergrund-Thread und Sampling ein
+
+    Mehrfache Aufrufe ersetzen die vorherige Konfiguration.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    handler.addFilter(SamplingFilter(
+        parse_category_values(os.environ.get("LOG_SAMPLING")),
+        parse_category_values(os.environ.get("LOG_RATE_LIMIT"), default=50),
+    ))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(handler.queue, output)
+    _listener.start()
+    return handler
+
+
+def _stop_listener():
+    # Beim Beenden die restlichen Meldungen noch schreiben
+    if _listener is not None:
+        _listener.stop()
+
+
+atexit.register(_stop_listener)
@@ -0,0 +1,190 @@
+"""Kennzahlen im Prometheus-Textformat (``/metrics``).
+
+Eine kleine Registry ohne zusätzliche Abhängigkeit: Zähler und Histogramme
+mit Labels, threadsicher, ausgegeben im Text-Exposition-Format 0.0.4.
+Gemessen werden die einzelnen Stufen einer Suche (Chrome-Start, Seitenladen,
+Parsen, gefundene Karten je Selektor), Datenbankzugriffe, Cache-Treffer,
+Beispieldaten-Fallbacks und die HTTP-Anfragen selbst.
+
+Die Werte gelten pro Prozess (Web-Prozess mit ``--workers 1``).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Standard-Buckets in Sekunden: von schnellen DB-Abfragen bis zu langsamen Seitenaufrufen
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+# Buckets für Anzahlen (z.B. gefundene Job-Karten)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Buckets für Speicher in Bytes (Prozessbaum einer Browser-Sitzung)
+MEMORY_BUCKETS = tuple(mb * 1024 * 1024 for mb in (64, 128, 256, 512, 768, 1024, 1536, 2048, 3072, 4096))
+
+# Buckets für offene Dateideskriptoren
+FD_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: erwartete Labels {self.labelnames}, erhalten {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+
+class Counter(_Metric):
+    """Monoton steigender Zähler"""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    """Verteilung von Messwerten in kumulativen Buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][index] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Misst die Laufzeit des Blocks in Sekunden"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_sample(self, key, state):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, state["counts"]):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+        lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+def render_metrics():
+    """Alle registrierten Kennzahlen im Prometheus-Textformat"""
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Scraper
+CHROME_STARTUP_SECONDS = Histogram(
+    "jobbig_chrome_startup_seconds", "Dauer des Browserstarts in get_selenium_browser", ["outcome"])
+PAGE_LOAD_SECONDS = Histogram(
+    "jobbig_page_load_seconds", "Laden einer Seite mit Selenium inkl. Warten und Scrollen", ["host", "outcome"])
+PARSE_SECONDS = Histogram(
+    "jobbig_parse_seconds", "HTML parsen und Job-Karten suchen", ["source"])
+CARDS_FOUND = Histogram(
+    "jobbig_cards_found", "Gefundene Job-Karten je Seite und passendem Selektor", ["source", "selector"],
+    buckets=COUNT_BUCKETS)
+SCRAPER_FALLBACKS = Counter(
+    "jobbig_scraper_fallbacks_total", "Beispieldaten statt echter Treffer", ["source", "reason"])
+
+# Browser-Sitzungen (Prozessbaum unter chromedriver, siehe browser_resources.py)
+BROWSER_PEAK_RSS_BYTES = Histogram(
+    "jobbig_browser_peak_rss_bytes", "Höchster RSS des Browser-Prozessbaums je Seitenaufruf", ["host"],
+    buckets=MEMORY_BUCKETS)
+BROWSER_CPU_SECONDS = Histogram(
+    "jobbig_browser_cpu_seconds", "CPU-Zeit des Browser-Prozessbaums je Seitenaufruf", ["host"])
+BROWSER_OPEN_FDS = Histogram(
+    "jobbig_browser_open_fds", "Höchste Zahl offener Dateideskriptoren des Browsers je Seitenaufruf", ["host"],
+    buckets=FD_BUCKETS)
+BROWSER_PROCESSES = Histogram(
+    "jobbig_browser_processes", "Höchste Zahl der Browser-Prozesse je Seitenaufruf", ["host"],
+    buckets=COUNT_BUCKETS)
+BROWSER_TREES_KILLED = Counter(
+    "jobbig_browser_trees_killed_total", "Vom Supervisor beendete Browser-Prozessbäume", ["reason"])
+BROWSER_RECLAIMED_BYTES = Counter(
+    "jobbig_browser_reclaimed_bytes_total", "Durch beendete Browser freigegebener Speicher (RSS)", ["reason"])
+
+# Ergebnis-Cache
+CACHE_REQUESTS = Counter(
+    "jobbig_scrape_cache_requests_total", "Abfragen des Ergebnis-Caches", ["source", "result"])
+
+# Datenbank
+DB_CONNECT_SECONDS = Histogram(
+    "jobbig_db_connect_seconds", "Verbindung aus dem Pool holen (inkl. Neuaufbau)", ["role"])
+DB_QUERY_SECONDS = Histogram(
+    "jobbig_db_query_seconds", "Laufzeit von Datenbankabfragen und Inserts", ["query"])
+
+# HTTP
+HTTP_REQUEST_SECONDS = Histogram(
+    "jobbig_http_request_duration_seconds", "Bearbeitungsdauer der HTTP-Anfragen", ["method", "endpoint", "status"])
+
+# Logging
+LOG_RECORDS_DROPPED = Counter(
+    "jobbig_log_records_dropped_total", "Verworfene Log-Meldungen (Sampling, Rate-Limit, volle Queue)",
+    ["category", "reason"])
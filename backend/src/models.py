@@ -1,31 +1,28 @@
 """SQLAlchemy models for Jobbig."""
 
 import logging
-import os
+
+from .database import SEARCH_VECTOR_EXPRESSION, SEARCH_INDEX_NAME
+from .engine import get_engine, resolve_database_url
 
 # Logging konfigurieren
 logger = logging.getLogger(__name__)
 
-# Versuchen, zusätzliche Module zu installieren, falls sie fehlen
-try:
-    import subprocess
-    logger.info("Versuche, fehlende Datenbankmodule zu installieren...")
-    
-    # Liste der zu installierenden Module
-    db_modules = ["Flask-SQLAlchemy==3.0.5", "SQLAlchemy==1.4.41", "psycopg2-binary", "psycopg", "psycopg2"]
-    for module in db_modules:
-        try:
-            subprocess.check_call(["pip", "install", module, "--no-cache-dir"])
-            logger.info(f"Modul {module} erfolgreich installiert")
-        except Exception as e:
-            logger.warning(f"Konnte Modul {module} nicht installieren: {e}")
-except Exception as e:
-    logger.warning(f"Konnte zusätzliche Module nicht installieren: {e}")
-
 # Bedingte Importe für SQLAlchemy - darf nicht fehlschlagen für Healthcheck
 try:
     from flask_sqlalchemy import SQLAlchemy
-    db = SQLAlchemy()
+    from sqlalchemy import Computed
+    from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+
+    class SharedEngineSQLAlchemy(SQLAlchemy):
+        """Flask-SQLAlchemy, das die gemeinsame Engine aus engine.py verwendet statt einer eigenen"""
+
+        def _make_engine(self, bind_key, options, app):
+            if bind_key is None:
+                return get_engine()
+            return super()._make_engine(bind_key, options, app)
+
+    db = SharedEngineSQLAlchemy()
     sqlalchemy_available = True
     logger.info("SQLAlchemy erfolgreich importiert")
 except ImportError as e:
@@ -53,7 +50,37 @@ if sqlalchemy_available:
 
         url = db.Column(db.String(200), nullable=False)
 
-        source = db.Column(db.String(200), nullable=False)
+        source = db.Column(db.String(200), primary_key=True, nullable=False)
+
+        # Zeitpunkt des Scrapings, zugleich Partitionsschlüssel (monatlich)
+        scraped_at = db.Column(
+            db.DateTime(timezone=True),
+            primary_key=True,
+            nullable=False,
+            server_default=db.func.now(),
+        )
+
+        # Generierte Spalte für die deutsche Volltextsuche (siehe database.ensure_search_index)
+        search_vector = db.Column(
+            TSVECTOR,
+            Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+        )
+
+        # Duplikat-Cluster und MinHash/LSH-Fingerabdruck (siehe database.ensure_dedupe_columns)
+        cluster_id = db.Column(db.String(16))
+
+        minhash = db.Column(ARRAY(db.BigInteger))
+
+        lsh_bands = db.Column(ARRAY(db.BigInteger))
+
+        # Das Schema legt database.create_tables_if_not_exist an (inkl. Partitionen)
+        __table_args__ = (
+            db.Index(SEARCH_INDEX_NAME, "search_vector", postgresql_using="gin"),
+            db.Index("ix_jobs_lsh_bands", "lsh_bands", postgresql_using="gin"),
+            db.Index("ix_jobs_cluster_id", "cluster_id"),
+            db.Index("ix_jobs_url_scraped_at", "url", "scraped_at", "id"),
+            {"postgresql_partition_by": "RANGE (scraped_at)"},
+        )
 
 else:
     # Dummy-Klasse für den Fall, dass SQLAlchemy nicht verfügbar ist
@@ -70,8 +97,8 @@ def refresh_db():
         return
 
     try:
-        db.session.query(Job).delete()
-        db.session.execute("ALTER SEQUENCE jobs_id_seq RESTART WITH 1")
+        # TRUNCATE leert alle Partitionen sofort, statt jede Zeile zu löschen
+        db.session.execute(db.text("TRUNCATE TABLE jobs, job_stats, job_stats_urls RESTART IDENTITY"))
         db.session.commit()
         logger.info("Datenbank erfolgreich zurückgesetzt")
     except Exception as e:
@@ -90,20 +117,8 @@ def connect_db(app):
         logger.warning("SQLAlchemy nicht verfügbar, Datenbank kann nicht verbunden werden")
         return False
     
-    # Prüfe, ob DATABASE_URL gesetzt ist
-    database_url = os.environ.get("DATABASE_URL")
-    if not database_url:
-        database_url = os.environ.get("DATABASE_PUBLIC_URL")
-    
-    if not database_url:
-        logger.warning("Keine Datenbank-URL gefunden, Datenbank kann nicht verbunden werden")
-        return False
-        
-    # Railway verwendet 'postgres://' anstatt 'postgresql://'
-    if database_url and database_url.startswith("postgres://"):
-        database_url = database_url.replace("postgres://", "postgresql://", 1)
-        app.config["SQLALCHEMY_DATABASE_URI"] = database_url
-        logger.info("Datenbankstring von postgres:// auf postgresql:// korrigiert")
+    # Dieselbe URL wie der Pool in engine.py; die Engine selbst wird geteilt
+    app.config["SQLALCHEMY_DATABASE_URI"] = resolve_database_url()
         
     try:
         db.app = app
@@ -132,6 +147,8 @@ def serialize_job(job):
             "location": getattr(job, 'location', ''),
             "url": getattr(job, 'url', ''),
             "source": getattr(job, 'source', ''),
+            "scraped_at": job.scraped_at.isoformat() if getattr(job, 'scraped_at', None) else None,
+            "cluster_id": getattr(job, 'cluster_id', None),
         }
     except Exception as e:
         logger.error(f"Fehler beim Serialisieren eines Jobs: {e}")
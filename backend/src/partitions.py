@@ -0,0 +1,234 @@
+"""Monatliche Range-Partitionierung der Jobs-Tabelle und Aufbewahrung.
+
+Die Jobs-Tabelle ist nach ``scraped_at`` in Monatspartitionen (``jobs_pYYYY_MM``)
+aufgeteilt, optional zusätzlich nach Quelle. Alte Monate werden per
+DROP TABLE entfernt statt per DELETE - das ist unabhängig von der Zeilenzahl
+sofort erledigt.
+
+Aufbewahrungsjob (z.B. als Cron):
+
+    python -m src.partitions retention
+"""
+
+import argparse
+import logging
+import os
+import re
+from datetime import datetime, timedelta, timezone
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "jobs_p"
+PARTITION_NAME_PATTERN = re.compile(r"^jobs_p(\d{4})_(\d{2})$")
+
+# Anzahl Monate, die behalten werden (inklusive des laufenden Monats)
+RETENTION_MONTHS = int(os.environ.get("JOBS_RETENTION_MONTHS", "6"))
+
+# Anzahl zukünftiger Monatspartitionen, die vorab angelegt werden
+PARTITIONS_AHEAD = int(os.environ.get("JOBS_PARTITIONS_AHEAD", "1"))
+
+# Optional: Monatspartitionen zusätzlich nach Quelle unterteilen
+PARTITION_BY_SOURCE = os.environ.get("JOBS_PARTITION_BY_SOURCE") == "1"
+SOURCE_PARTITIONS = ["stepstone", "monster"]
+
+# Standard-Zeitfenster für Abfragen, damit Partition Pruning greift
+QUERY_WINDOW_DAYS = int(os.environ.get("JOBS_QUERY_WINDOW_DAYS", "30"))
+
+# Monate, für die laufende und Vorab-Partitionen in diesem Prozess angelegt und committet wurden
+_ensured_months = set()
+
+
+def month_start(dt):
+    """Gibt den Monatsanfang (UTC) für einen Zeitpunkt zurück"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    dt = dt.astimezone(timezone.utc)
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month, count):
+    """Verschiebt einen Monatsanfang um count Monate"""
+    index = month.year * 12 + (month.month - 1) + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month):
+    """Name der Monatspartition, z.B. jobs_p2024_05"""
+    return f"{PARTITION_PREFIX}{month.year:04d}_{month.month:02d}"
+
+
+def ensure_partition(cur, month):
+    """Legt die Partition für einen Monat an, falls sie noch nicht existiert"""
+    name = partition_name(month)
+    lower = month.isoformat()
+    upper = add_months(month, 1).isoformat()
+
+    if PARTITION_BY_SOURCE:
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {name} PARTITION OF jobs
+            FOR VALUES FROM ('{lower}') TO ('{upper}')
+            PARTITION BY LIST (source)
+        """)
+        for source in SOURCE_PARTITIONS:
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {name}_{source} PARTITION OF {name}
+                FOR VALUES IN ('{source}')
+            """)
+        cur.execute(f"CREATE TABLE IF NOT EXISTS {name}_default PARTITION OF {name} DEFAULT")
+    else:
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {name} PARTITION OF jobs
+            FOR VALUES FROM ('{lower}') TO ('{upper}')
+        """)
+
+    return name
+
+
+def ensure_partitions(cur, now=None, ahead=PARTITIONS_AHEAD):
+    """Stellt die Partitionen für den laufenden und die nächsten Monate sicher"""
+    current = month_start(now or datetime.now(timezone.utc))
+    names = [ensure_partition(cur, add_months(current, offset)) for offset in range(ahead + 1)]
+    logger.info(f"Jobs-Partitionen sichergestellt: {', '.join(names)}")
+    return names
+
+
+def ensure_current_partition(conn):
+    """
+    Stellt die Partitionen für den laufenden und die nächsten Monate sicher
+
+    Läuft in einer eigenen, sofort committeten Transaktion vor dem Insert:
+    schlägt danach der Insert fehl, nimmt der Rollback die Partition nicht
+    mit. Einmal pro Prozess und Monatswechsel wird tatsächlich DDL ausgeführt
+    (und die Vorab-Partition weitergeschoben), sonst ist der Aufruf kostenlos.
+    """
+    current = month_start(datetime.now(timezone.utc))
+    if current in _ensured_months:
+        return
+    try:
+        with conn.cursor() as cur:
+            ensure_partitions(cur, now=current)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    _ensured_months.add(current)
+
+
+def query_window_start(days=None):
+    """
+    Untergrenze für scraped_at in Abfragen
+
+    days=None verwendet das Standardfenster, days<=0 schaltet es ab.
+    """
+    if days is None:
+        days = QUERY_WINDOW_DAYS
+    if days <= 0:
+        return None
+    return datetime.now(timezone.utc).replace(microsecond=0) - timedelta(days=days)
+
+
+def list_partitions(cur):
+    """Listet die Monatspartitionen der Jobs-Tabelle als (Name, Monatsanfang)"""
+    cur.execute("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = 'jobs'
+    """)
+    partitions = []
+    for (name,) in cur.fetchall():
+        match = PARTITION_NAME_PATTERN.match(name)
+        if match:
+            month = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+            partitions.append((name, month))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def drop_expired_partitions(retention_months=RETENTION_MONTHS, now=None):
+    """
+    Entfernt Monatspartitionen, die älter als retention_months Monate sind
+
+    Gibt die Namen der entfernten Partitionen zurück.
+    """
+    from .database import get_database
+    from .stats import drop_expired_stats
+
+    cutoff = add_months(month_start(now or datetime.now(timezone.utc)), -(retention_months - 1))
+
+    conn = get_database()
+    if not conn:
+        logger.error("Keine Datenbankverbindung vorhanden, Aufbewahrung kann nicht durchgeführt werden")
+        return []
+
+    dropped = []
+    try:
+        with conn.cursor() as cur:
+            for name, month in list_partitions(cur):
+                if month < cutoff:
+                    cur.execute(f"DROP TABLE IF EXISTS {name}")
+                    _ensured_months.discard(month)
+                    dropped.append(name)
+            # Die Zähler der entfernten Monate gleich mit entfernen
+            drop_expired_stats(cur, cutoff)
+            conn.commit()
+
+        if dropped:
+            logger.info(f"Abgelaufene Jobs-Partitionen entfernt: {', '.join(dropped)}")
+        else:
+            logger.info(f"Keine Jobs-Partitionen älter als {cutoff.date()} gefunden")
+    except Exception as e:
+        logger.error(f"Fehler beim Entfernen abgelaufener Partitionen: {e}")
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        return []
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    return dropped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Partitionen der Jobs-Tabelle verwalten")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    retention = subparsers.add_parser("retention", help="Abgelaufene Monatspartitionen entfernen")
+    retention.add_argument("--months", type=int, default=RETENTION_MONTHS,
+                           help=f"Aufbewahrte Monate (Standard: {RETENTION_MONTHS})")
+
+    subparsers.add_parser("ensure", help="Schema und kommende Monatspartitionen anlegen")
+    subparsers.add_parser("list", help="Vorhandene Monatspartitionen anzeigen")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from .database import create_tables_if_not_exist, get_database
+
+    if args.command == "retention":
+        dropped = drop_expired_partitions(args.months)
+        print(f"{len(dropped)} Partition(en) entfernt")
+        return 0
+
+    if args.command == "ensure":
+        return 0 if create_tables_if_not_exist() else 1
+
+    conn = get_database()
+    if not conn:
+        return 1
+    try:
+        with conn.cursor() as cur:
+            for name, month in list_partitions(cur):
+                print(f"{name}\t{month.date()}")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,121 @@
+"""Vorab-Crawl der beliebtesten Suchen, damit der Ergebnis-Cache warm bleibt.
+
+Der Scheduler liest in jeder Runde die ``PRECRAWL_TOP`` beliebtesten Suchen
+aus den Abfragezählern (result_cache.py) und legt dafür Crawl-Aufträge an,
+die die Worker (worker.py) abarbeiten - mit Ergebnis in Datenbank und Cache.
+
+Die Aufträge einer Runde werden über das Intervall verteilt: je Quelle in
+gleichen Abständen, die Quellen gegeneinander versetzt und jeder Startpunkt
+zufällig verschoben (Jitter), damit keine Quelle Lastspitzen sieht. Nach jeder
+Runde werden die Zähler gedämpft, sodass sich die Rangliste an die aktuelle
+Nachfrage anpasst. Mehrere Scheduler stören sich nicht: offene Aufträge für
+dieselbe Suche werden nicht doppelt angelegt.
+
+    python -m src.precrawl            # Dauerbetrieb
+    python -m src.precrawl --once     # eine Runde (z.B. per Cron)
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import signal
+import threading
+
+from .crawl_tasks import enqueue_tasks
+from .result_cache import CACHE_TTL, decay_scores, top_queries
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+# Anzahl der Suchen, die vorab gecrawlt werden
+PRECRAWL_TOP = int(os.environ.get("PRECRAWL_TOP", "200"))
+
+# Länge einer Runde in Sekunden (sollte unter SCRAPE_CACHE_TTL liegen)
+PRECRAWL_INTERVAL = int(os.environ.get("PRECRAWL_INTERVAL", str(max(60, CACHE_TTL // 2))))
+
+# Zufällige Verschiebung der Startzeit, Anteil des Abstands zwischen zwei Aufträgen
+PRECRAWL_JITTER = float(os.environ.get("PRECRAWL_JITTER", "0.3"))
+
+# Faktor, mit dem die Zähler nach jeder Runde multipliziert werden
+PRECRAWL_DECAY = float(os.environ.get("PRECRAWL_DECAY", "0.8"))
+
+# Vorab-Aufträge hinter manuell angelegten einreihen
+PRECRAWL_PRIORITY = -1
+
+
+def plan_round(queries, interval, jitter=PRECRAWL_JITTER, rng=random):
+    """
+    Verteilt die Suchen einer Runde über das Intervall
+
+    Gibt [(source, title, city, delay_seconds), ...] zurück, nach Startzeit sortiert.
+    """
+    by_source = {}
+    for source, title, city in queries:
+        by_source.setdefault(source, []).append((title, city))
+
+    planned = []
+    for position, (source, items) in enumerate(sorted(by_source.items())):
+        spacing = interval / len(items)
+        # Quellen um einen Bruchteil des Abstands gegeneinander versetzen
+        offset = spacing * position / len(by_source)
+        for index, (title, city) in enumerate(items):
+            delay = index * spacing + offset + rng.uniform(-jitter, jitter) * spacing
+            planned.append((source, title, city, round(min(max(delay, 0.0), interval), 1)))
+    return sorted(planned, key=lambda item: item[3])
+
+
+def run_round(top=PRECRAWL_TOP, interval=PRECRAWL_INTERVAL):
+    """Plant eine Runde ein und dämpft danach die Zähler; gibt eine Zusammenfassung zurück"""
+    # Suchen, deren Cache noch frisch genug für die ganze Runde ist, überspringen
+    queries = top_queries(top, fresher_than=max(0, CACHE_TTL - interval))
+    planned = plan_round(queries, interval)
+    created = enqueue_tasks(planned, priority=PRECRAWL_PRIORITY) if planned else 0
+    decay_scores(PRECRAWL_DECAY)
+
+    sources = {}
+    for source, *_ in planned:
+        sources[source] = sources.get(source, 0) + 1
+    summary = {"queries": len(queries), "created": created, "intervalSeconds": interval, "perSource": sources}
+    logger.info(f"Vorab-Crawl eingeplant: {created} Aufträge für {len(queries)} Suchen über {interval}s")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Beliebte Suchen regelmäßig vorab crawlen")
+    parser.add_argument("--once", action="store_true", help="Nur eine Runde einplanen")
+    parser.add_argument("--top", type=int, default=PRECRAWL_TOP)
+    parser.add_argument("--interval", type=int, default=PRECRAWL_INTERVAL, help="Sekunden pro Runde")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from .database import create_tables_if_not_exist
+    from .storage import get_storage
+
+    if get_storage().name != "postgres":
+        logger.error("Vorab-Crawl benötigt das Postgres-Backend")
+        return 1
+    if not create_tables_if_not_exist():
+        logger.error("Schema konnte nicht erstellt werden")
+        return 1
+
+    if args.once:
+        print(json.dumps(run_round(args.top, args.interval), indent=2, ensure_ascii=False))
+        return 0
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    while not stop.is_set():
+        try:
+            run_round(args.top, args.interval)
+        except Exception as e:
+            logger.error(f"Fehler beim Einplanen des Vorab-Crawls: {type(e).__name__}: {e}")
+        stop.wait(args.interval)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,145 @@
+"""Sampling-Profiler für einzelne Anfragen oder den ganzen Prozess.
+
+Ein Hintergrund-Thread liest in festen Abständen die Python-Stacks der
+beobachteten Threads (``sys._current_frames()``) und zählt gleiche Stacks.
+Das Ergebnis ist im "collapsed"-Format (eine Zeile ``a;b;c <anzahl>``), das
+flamegraph.pl, speedscope und inferno direkt lesen.
+
+Nur für Admins (siehe admin.py):
+
+- eine Anfrage: ``?profile=1`` oder Header ``X-Profile: 1`` - statt der
+  Antwort kommen die Stacks dieser Anfrage zurück
+- der Prozess: ``POST /api/admin/profile?seconds=N`` sampelt alle Threads
+  für N Sekunden, ``GET /api/admin/profile`` liefert danach das Ergebnis
+
+Solange kein Profil läuft, gibt es keinen Sampler-Thread; die Anfragen
+prüfen nur, ob der Parameter gesetzt ist.
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Abstand zwischen zwei Samples in Millisekunden
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+
+# Obergrenze für die Dauer eines Prozess-Profils in Sekunden
+PROFILE_MAX_SECONDS = int(os.environ.get("PROFILE_MAX_SECONDS", "60"))
+
+_BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _frame_label(code):
+    """Funktionsname mit Datei und erster Zeile; ';' trennt im Format die Frames"""
+    filename = code.co_filename
+    if filename.startswith(_BASE_DIR):
+        filename = os.path.relpath(filename, _BASE_DIR)
+    else:
+        # Bibliotheken: ab dem Paketverzeichnis kürzen (…/site-packages/bs4/element.py -> bs4/element.py)
+        parts = filename.replace("\\", "/").split("/")
+        filename = "/".join(parts[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+
+def collapse_stack(frame, prefix=None):
+    """Stack vom äußersten bis zum innersten Frame als 'a;b;c'"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    if prefix:
+        labels.append(prefix)
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """
+    Zählt die Stacks der beobachteten Threads, solange er läuft
+
+    thread_ids: nur diese Threads sampeln (None = alle außer dem Sampler selbst;
+    dann wird jedem Stack der Thread-Name vorangestellt).
+    """
+
+    def __init__(self, thread_ids=None, interval_ms=PROFILE_INTERVAL_MS):
+        self.thread_ids = set(thread_ids) if thread_ids else None
+        self.interval = max(0.001, interval_ms / 1000)
+        self.stacks = {}
+        self.samples = 0
+        self.started_at = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            names = None
+            if self.thread_ids is None:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in frames.items():
+                if thread_id == own_id or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                prefix = names.get(thread_id, str(thread_id)).replace(";", ",") if names else None
+                stack = collapse_stack(frame, prefix)
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+                self.samples += 1
+            # Frames nicht über die Wartezeit hinweg festhalten
+            del frames
+
+    def collapsed(self):
+        """Ergebnis im collapsed-Format, häufigste Stacks zuerst"""
+        lines = [f"{stack} {count}" for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1])]
+        return "\n".join(lines) + "\n"
+
+
+_process_lock = threading.Lock()
+_process_profile = None
+
+
+def start_process_profile(seconds, interval_ms=PROFILE_INTERVAL_MS):
+    """
+    Sampelt alle Threads des Prozesses für seconds Sekunden im Hintergrund
+
+    Die Anfrage, die das Profil startet, wartet nicht darauf - sonst würde ein
+    Sync-Worker nur sich selbst messen. Es läuft höchstens ein Prozess-Profil
+    gleichzeitig; ein zweites löst RuntimeError aus. seconds außerhalb von
+    1..PROFILE_MAX_SECONDS ergibt ValueError.
+    """
+    global _process_profile
+    if not 1 <= seconds <= PROFILE_MAX_SECONDS:
+        raise ValueError(f"seconds muss zwischen 1 und {PROFILE_MAX_SECONDS} liegen")
+    with _process_lock:
+        if _process_profile is not None and _process_profile["running"]:
+            raise RuntimeError("Es läuft bereits ein Prozess-Profil")
+        profiler = SamplingProfiler(interval_ms=interval_ms).start()
+        state = {"profiler": profiler, "seconds": seconds, "running": True}
+        _process_profile = state
+
+    def finish():
+        profiler.stop()
+        state["running"] = False
+
+    timer = threading.Timer(seconds, finish)
+    timer.daemon = True
+    timer.start()
+    return state
+
+
+def process_profile():
+    """Zuletzt gestartetes Prozess-Profil ({"profiler", "seconds", "running"}) oder None"""
+    return _process_profile
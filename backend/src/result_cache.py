@@ -0,0 +1,168 @@
+"""Ergebnis-Cache und Abfragezähler für die Scrape-Routen (Postgres).
+
+Die Tabelle ``scrape_cache`` hat eine Zeile je (Quelle, Titel, Stadt) und
+dient zweierlei:
+
+- Cache: die zuletzt gescrapten Jobs; jünger als ``SCRAPE_CACHE_TTL``
+  Sekunden werden sie ohne Selenium ausgeliefert
+- Zähler: ``score`` wird bei jeder Anfrage erhöht und bei jeder
+  Vorab-Crawl-Runde gedämpft, sodass die aktuell beliebtesten Suchen oben
+  stehen (siehe precrawl.py)
+
+Mit einem anderen Speicher-Backend als Postgres ist der Cache deaktiviert.
+"""
+
+import json
+import logging
+import os
+
+from .metrics import CACHE_REQUESTS
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+# Maximales Alter eines Cache-Eintrags in Sekunden (0 = Cache aus)
+CACHE_TTL = int(os.environ.get("SCRAPE_CACHE_TTL", "3600"))
+
+
+def ensure_scrape_cache_table(cur):
+    """Legt die Cache-Tabelle an"""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS scrape_cache (
+            source VARCHAR(20) NOT NULL,
+            title_key VARCHAR(200) NOT NULL,
+            city_key VARCHAR(200) NOT NULL,
+            title VARCHAR(200) NOT NULL,
+            city VARCHAR(200) NOT NULL,
+            jobs JSONB,
+            scraped_at TIMESTAMPTZ,
+            requests BIGINT NOT NULL DEFAULT 0,
+            score DOUBLE PRECISION NOT NULL DEFAULT 0,
+            last_requested_at TIMESTAMPTZ,
+            PRIMARY KEY (source, title_key, city_key)
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_scrape_cache_score ON scrape_cache (score DESC)")
+    logger.info("Scrape-Cache-Tabelle überprüft")
+
+
+def cache_enabled():
+    from .storage import get_storage
+    return CACHE_TTL > 0 and get_storage().name == "postgres"
+
+
+def query_key(title, city):
+    """Normalisierter Schlüssel, damit 'Koch'/'koch ' denselben Eintrag treffen"""
+    return " ".join(title.lower().split())[:200], " ".join(city.lower().split())[:200]
+
+
+def _execute(sql, params, fetch=False):
+    from .database import get_database
+
+    conn = get_database()
+    if not conn:
+        return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            result = cur.fetchone() if fetch else cur.rowcount
+        conn.commit()
+        return result
+    except Exception as e:
+        logger.error(f"Fehler beim Zugriff auf den Scrape-Cache: {type(e).__name__}: {e}")
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        return None
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def lookup(source, title, city, max_age=CACHE_TTL):
+    """
+    Zählt die Anfrage und liefert gecachte Jobs, falls frisch genug
+
+    Gibt {"jobs": [...], "age": Sekunden} oder None zurück. Ein Roundtrip:
+    Zähler und Cache-Eintrag werden im selben UPSERT gelesen.
+    """
+    if not title or not city or not cache_enabled():
+        return None
+    title_key, city_key = query_key(title, city)
+    row = _execute(
+        """
+        INSERT INTO scrape_cache (source, title_key, city_key, title, city, requests, score, last_requested_at)
+        VALUES (%s, %s, %s, %s, %s, 1, 1, now())
+        ON CONFLICT (source, title_key, city_key) DO UPDATE
+        SET requests = scrape_cache.requests + 1, score = scrape_cache.score + 1, last_requested_at = now()
+        RETURNING jobs, EXTRACT(EPOCH FROM now() - scraped_at)
+        """,
+        (source, title_key, city_key, title[:200], city[:200]),
+        fetch=True
+    )
+    if not row or row[0] is None or row[1] is None or row[1] > max_age:
+        CACHE_REQUESTS.inc(source=source, result="miss")
+        return None
+    CACHE_REQUESTS.inc(source=source, result="hit")
+    jobs = row[0] if isinstance(row[0], list) else json.loads(row[0])
+    return {"jobs": jobs, "age": round(float(row[1]), 1)}
+
+
+def store(source, title, city, jobs):
+    """Legt das Ergebnis eines erfolgreichen Scrapes im Cache ab"""
+    if not title or not city or not cache_enabled():
+        return False
+    title_key, city_key = query_key(title, city)
+    cached = [{key: value for key, value in job.items() if key != "error_info"} for job in jobs]
+    return bool(_execute(
+        """
+        INSERT INTO scrape_cache (source, title_key, city_key, title, city, jobs, scraped_at)
+        VALUES (%s, %s, %s, %s, %s, %s::jsonb, now())
+        ON CONFLICT (source, title_key, city_key) DO UPDATE
+        SET jobs = EXCLUDED.jobs, scraped_at = EXCLUDED.scraped_at
+        """,
+        (source, title_key, city_key, title[:200], city[:200], json.dumps(cached, default=str))
+    ))
+
+
+def top_queries(limit, fresher_than=None):
+    """
+    Die beliebtesten Suchen nach gedämpftem Zähler
+
+    fresher_than: Einträge überspringen, deren Cache jünger als so viele
+    Sekunden ist. Gibt [(source, title, city), ...] zurück.
+    """
+    from .database import get_database
+
+    conn = get_database(readonly=True)
+    if not conn:
+        return []
+    try:
+        with conn.cursor() as cur:
+            sql = "SELECT source, title, city FROM scrape_cache WHERE score > 0"
+            params = []
+            if fresher_than:
+                sql += " AND (scraped_at IS NULL OR scraped_at < now() - make_interval(secs => %s))"
+                params.append(fresher_than)
+            sql += " ORDER BY score DESC LIMIT %s"
+            params.append(limit)
+            cur.execute(sql, params)
+            return [tuple(row) for row in cur.fetchall()]
+    except Exception as e:
+        logger.error(f"Fehler beim Lesen der beliebtesten Suchen: {type(e).__name__}: {e}")
+        return []
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def decay_scores(factor):
+    """Dämpft alle Zähler (ältere Anfragen zählen weniger) und entfernt bedeutungslose Einträge"""
+    _execute("UPDATE scrape_cache SET score = score * %s WHERE score > 0", (factor,))
+    # Nie wieder angefragte Einträge ohne Ergebnis aufräumen
+    _execute("DELETE FROM scrape_cache WHERE score < 0.01 AND (scraped_at IS NULL OR scraped_at < now() - interval '7 days')", ())
@@ -3,20 +3,22 @@ from bs4 import BeautifulSoup
 import logging
 import time
 import random
-import requests
 import os
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from fake_useragent import UserAgent
-from webdriver_manager.chrome import ChromeDriverManager
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from .metrics import (
+    CARDS_FOUND, CHROME_STARTUP_SECONDS, PAGE_LOAD_SECONDS, PARSE_SECONDS, SCRAPER_FALLBACKS,
+)
+from .tracing import record_span, span, traced
+from .browser_resources import track_session
+from .browser_supervisor import begin_use, end_use, register_browser, release_browser
+
+# Selenium, fake_useragent und webdriver_manager werden erst beim ersten
+# Browserstart importiert, damit der Import dieses Moduls den App-Start nicht bremst
 
 # Logging konfigurieren
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # HTTP-Client mit Timeout konfigurieren
@@ -37,10 +39,29 @@ USE_SELENIUM = True
 # Debug-Level für Logging (0=nur Fehler, 1=Warnungen, 2=Info, 3=Debug)
 DEBUG_LEVEL = 2
 
+# Basis-URLs der Suchseiten; für Benchmarks und Lasttests auf lokale Stand-in-Server umstellbar.
+# Links in den Ergebnissen zeigen weiterhin auf die echten Seiten.
+STEPSTONE_BASE_URL = os.environ.get("STEPSTONE_BASE_URL", "https://www.stepstone.de").rstrip("/")
+MONSTER_BASE_URL = os.environ.get("MONSTER_BASE_URL", "https://www.monster.de").rstrip("/")
+
+# Nach so vielen Seiten wird ein Browser aus dem DriverPool ersetzt (Speicherlecks von Chrome)
+DRIVER_MAX_USES = int(os.environ.get("SCRAPER_DRIVER_MAX_USES", "50"))
+
+# Browser, den der aktuelle Thread gerade aus einem DriverPool verwendet
+_pooled = threading.local()
+
 # Browser-Konfiguration
+@traced("chrome_startup")
 def get_selenium_browser():
     """Konfiguriert und gibt einen Selenium Browser zurück"""
+    startup_start = time.perf_counter()
     try:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        from fake_useragent import UserAgent
+        from webdriver_manager.chrome import ChromeDriverManager
+
         # Chrome-Optionen konfigurieren
         chrome_options = Options()
         chrome_options.add_argument("--headless")  # Headless-Modus für Server
@@ -162,52 +183,139 @@ def get_selenium_browser():
         driver.implicitly_wait(10)
         
         logger.info("Selenium Browser erfolgreich initialisiert")
+        register_browser(driver)
+        CHROME_STARTUP_SECONDS.observe(time.perf_counter() - startup_start, outcome="ok")
         return driver
     except Exception as e:
         logger.error(f"Fehler bei der Browser-Initialisierung: {type(e).__name__}: {e}")
+        CHROME_STARTUP_SECONDS.observe(time.perf_counter() - startup_start, outcome="failed")
         return None
 
 # Seitenlade-Hilfsfunktion für Selenium
+@traced("page_load")
 def load_page_with_selenium(url, wait_for_selector=None, timeout=15):
     """Lädt eine Seite mit Selenium und wartet auf ein bestimmtes Element"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+
+    # Browser aus dem DriverPool des Threads wiederverwenden, sonst einen eigenen starten
+    pooled = getattr(_pooled, "driver", None)
     driver = None
+    usage = None
+    load_start = None
+    outcome = "error"
     try:
-        driver = get_selenium_browser()
+        driver = pooled or get_selenium_browser()
         if not driver:
             return None
+        # Speicher, CPU und Dateideskriptoren des Browser-Prozessbaums mitmessen
+        usage = track_session(driver, urlparse(url).netloc, include_startup=not pooled)
+        begin_use(driver)
         
-        logger.info(f"Lade URL mit Selenium: {url}")
+        load_start = time.perf_counter()
+        logger.info("Lade URL mit Selenium: %s", url)
         driver.get(url)
         
         # Warte auf Ladevorgang und ggf. auf bestimmtes Element
-        if wait_for_selector:
-            WebDriverWait(driver, timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, wait_for_selector))
-            )
-            logger.info(f"Element '{wait_for_selector}' erfolgreich geladen")
-        else:
-            # Sonst warte kurz, damit JavaScript laden kann
-            time.sleep(3)
+        with span("wait_for_selector", selector=wait_for_selector or ""):
+            if wait_for_selector:
+                WebDriverWait(driver, timeout).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, wait_for_selector))
+                )
+                logger.debug("Element '%s' erfolgreich geladen", wait_for_selector)
+            else:
+                # Sonst warte kurz, damit JavaScript laden kann
+                time.sleep(3)
         
         # Führe Scroll-Operationen durch, um dynamische Inhalte zu laden
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-        time.sleep(1)
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(1)
+        with span("scroll_sleep"):
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
+            time.sleep(1)
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            time.sleep(1)
         
         # HTML der geladenen Seite zurückgeben
         page_source = driver.page_source
-        logger.info(f"Seite erfolgreich geladen, HTML-Länge: {len(page_source)}")
+        logger.info("Seite erfolgreich geladen, HTML-Länge: %d", len(page_source))
+        outcome = "ok"
         return page_source
     except TimeoutException:
         logger.warning(f"Timeout beim Laden der Seite: {url}")
+        outcome = "timeout"
         return None if not driver else driver.page_source
     except Exception as e:
         logger.error(f"Fehler beim Laden der Seite mit Selenium: {type(e).__name__}: {e}")
+        if pooled:
+            # Browser in unklarem Zustand nicht an den nächsten Auftrag weitergeben
+            _pooled.broken = True
         return None
     finally:
+        if load_start is not None:
+            PAGE_LOAD_SECONDS.observe(time.perf_counter() - load_start, host=urlparse(url).netloc, outcome=outcome)
+        if usage is not None:
+            usage.finish()
         if driver:
-            driver.quit()
+            end_use(driver)
+        if driver and not pooled:
+            release_browser(driver)
+
+class DriverPool:
+    """
+    Begrenzter Pool wiederverwendbarer Browser für Batch-Crawls
+    
+    Innerhalb von ``with pool.driver():`` verwendet load_page_with_selenium im
+    aktuellen Thread einen Browser aus dem Pool, statt für jede Seite Chrome
+    neu zu starten. Defekte Browser und solche mit mehr als max_uses Aufträgen
+    werden beendet und bei Bedarf neu gestartet.
+    """
+    
+    def __init__(self, size, max_uses=DRIVER_MAX_USES):
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.slots = threading.BoundedSemaphore(self.size)
+        self.idle = []
+        self.uses = {}
+        self.started = 0
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def driver(self):
+        self.slots.acquire()
+        with self._lock:
+            driver = self.idle.pop() if self.idle else None
+        try:
+            if driver is None:
+                driver = get_selenium_browser()
+                if driver is not None:
+                    self.started += 1
+                    self.uses[id(driver)] = 0
+            _pooled.driver = driver
+            _pooled.broken = False
+            yield driver
+        finally:
+            broken = getattr(_pooled, "broken", False)
+            _pooled.driver = None
+            if driver is not None:
+                self.uses[id(driver)] += 1
+                if broken or self.uses[id(driver)] >= self.max_uses:
+                    self._quit(driver)
+                else:
+                    with self._lock:
+                        self.idle.append(driver)
+            self.slots.release()
+    
+    def _quit(self, driver):
+        self.uses.pop(id(driver), None)
+        release_browser(driver)
+    
+    def close(self):
+        """Beendet alle freien Browser"""
+        with self._lock:
+            idle, self.idle = self.idle, []
+        for driver in idle:
+            self._quit(driver)
 
 # Erweiterte User-Agent-Rotation zur Vermeidung von Blocking
 USER_AGENTS = [
@@ -281,7 +389,7 @@ def find_stepstone_jobs(title, city, max_jobs=3):
     start_time = time.time()
     if not title or not city:
         logger.info("Stepstone-Beispieldaten zurückgegeben, da Titel oder Stadt fehlen")
-        return get_example_jobs(title, city, "stepstone", max_jobs)
+        return get_example_jobs(title, city, "stepstone", max_jobs, reason="missing_input")
         
     # Sicherheitscheck - Stellen Sie sicher, dass DEBUG_MODE False ist
     assert DEBUG_MODE == False, "DEBUG_MODE muss für Produktion deaktiviert sein"
@@ -289,9 +397,9 @@ def find_stepstone_jobs(title, city, max_jobs=3):
     # Debug-Modus: Immer Beispieldaten zurückgeben - SOLLTE NIE AUSGEFÜHRT WERDEN
     if DEBUG_MODE:
         logger.error("DEBUG-MODUS IST AKTIVIERT! Nur Beispieldaten werden zurückgegeben!")
-        return get_example_jobs(title, city, "stepstone", max_jobs)
+        return get_example_jobs(title, city, "stepstone", max_jobs, reason="debug_mode")
 
-    logger.info(f"Stepstone-Suche gestartet für Titel='{title}', Stadt='{city}'")
+    logger.info("Stepstone-Suche gestartet für Titel='%s', Stadt='%s'", title, city)
     
     try:
         # URL-Formatierung verbessert - Leerzeichen durch Bindestrich ersetzen und Sonderzeichen behandeln
@@ -299,14 +407,14 @@ def find_stepstone_jobs(title, city, max_jobs=3):
         search_city = city.replace(" ", "-").replace("ä", "ae").replace("ö", "oe").replace("ü", "ue").replace("ß", "ss").lower()
         
         # Search-Variante für Selenium (mit Query-Parametern)
-        selenium_url = f"https://www.stepstone.de/jobs-in-{search_city}/{search_title}"
+        selenium_url = f"{STEPSTONE_BASE_URL}/jobs-in-{search_city}/{search_title}"
         
         # Alternative URLs für den Fall, dass die Haupturl nicht funktioniert
         alternative_urls = [
             selenium_url,
-            f"https://www.stepstone.de/jobs/{search_title}/in-{search_city}",
-            f"https://www.stepstone.de/stellenangebote/suche?q={search_title}&l={search_city}",
-            f"https://www.stepstone.de/stellenangebote/suche?what={search_title}&where={search_city}"
+            f"{STEPSTONE_BASE_URL}/jobs/{search_title}/in-{search_city}",
+            f"{STEPSTONE_BASE_URL}/stellenangebote/suche?q={search_title}&l={search_city}",
+            f"{STEPSTONE_BASE_URL}/stellenangebote/suche?what={search_title}&where={search_city}"
         ]
         
         jobs = []
@@ -319,20 +427,22 @@ def find_stepstone_jobs(title, city, max_jobs=3):
             
             # Versuche jede URL mit Selenium
             for current_url in alternative_urls:
-                html_content = load_page_with_selenium(
-                    current_url, 
-                    wait_for_selector=".sc-dkmUuB, .Teaser-sc-574p6w-0, [data-testid='job-item'], article",
-                    timeout=20
-                )
+                with span("try_url", url=current_url):
+                    html_content = load_page_with_selenium(
+                        current_url, 
+                        wait_for_selector=".sc-dkmUuB, .Teaser-sc-574p6w-0, [data-testid='job-item'], article",
+                        timeout=20
+                    )
                 
                 if html_content and len(html_content) > 1000:  # Prüfe auf valides HTML
                     used_url = current_url
-                    logger.info(f"Erfolgreich HTML von URL geladen: {current_url}")
+                    logger.info("Erfolgreich HTML von URL geladen: %s", current_url)
                     break
-                logger.warning(f"Konnte keine valide Seite von {current_url} laden")
+                logger.warning("Konnte keine valide Seite von %s laden", current_url)
             
             # Mit dem HTML weitermachen, falls gefunden
             if html_content:
+                parse_start = time.perf_counter()
                 soup = BeautifulSoup(html_content, "html.parser")
                 
                 # Nach dem typischen "Keine Jobs gefunden" Text suchen
@@ -342,7 +452,7 @@ def find_stepstone_jobs(title, city, max_jobs=3):
                     "Keine Stellenangebote gefunden"
                 ]):
                     logger.warning(f"Stepstone meldet 'Keine Jobs gefunden' für {used_url}")
-                    return get_example_jobs(title, city, "stepstone", max_jobs)
+                    return get_example_jobs(title, city, "stepstone", max_jobs, reason="no_results")
             
                 # Versuche verschiedene Selektoren für die Stellenangebote
                 card_selectors = [
@@ -355,114 +465,122 @@ def find_stepstone_jobs(title, city, max_jobs=3):
                 ]
                 
                 job_listings = []
+                matched_selector = "none"
                 for selector in card_selectors:
                     listings = soup.select(selector)
                     if listings:
-                        logger.info(f"Gefunden {len(listings)} Jobs mit Selektor '{selector}'")
+                        logger.info("Gefunden %d Jobs mit Selektor '%s'", len(listings), selector)
                         job_listings = listings
+                        matched_selector = selector
                         break
+                parse_seconds = time.perf_counter() - parse_start
+                PARSE_SECONDS.observe(parse_seconds, source="stepstone")
+                record_span("parse", parse_seconds, source="stepstone", selector=matched_selector)
+                CARDS_FOUND.observe(len(job_listings), source="stepstone", selector=matched_selector)
                 
                 # Verarbeite die gefundenen Stellenangebote
                 if job_listings:
-                    logger.info(f"Insgesamt {len(job_listings)} Stellenangebote gefunden")
+                    logger.info("Insgesamt %d Stellenangebote gefunden", len(job_listings))
                     
-                    for job_card in job_listings[:max_jobs]:
-                        try:
-                            # Verschiedene Selektoren für Titel versuchen
-                            title_selectors = [
-                                "h2", "h3", "h5", 
-                                "[data-testid='job-element-title']",
-                                "[data-at='job-item-title']",
-                                ".sc-dkmUuB-title",
-                                ".JobCard-sc-aq7yxf-0 h2"
-                            ]
+                    with span("card_loop", source="stepstone", cards=len(job_listings)):
+                        for job_card in job_listings[:max_jobs]:
+                            try:
+                                # Verschiedene Selektoren für Titel versuchen
+                                title_selectors = [
+                                    "h2", "h3", "h5", 
+                                    "[data-testid='job-element-title']",
+                                    "[data-at='job-item-title']",
+                                    ".sc-dkmUuB-title",
+                                    ".JobCard-sc-aq7yxf-0 h2"
+                                ]
                             
-                            job_title = None
-                            for selector in title_selectors:
-                                title_elem = job_card.select_one(selector)
-                                if title_elem and title_elem.text.strip():
-                                    job_title = title_elem.text.strip()
-                                    break
+                                job_title = None
+                                for selector in title_selectors:
+                                    title_elem = job_card.select_one(selector)
+                                    if title_elem and title_elem.text.strip():
+                                        job_title = title_elem.text.strip()
+                                        break
                             
-                            # Verschiedene Selektoren für Unternehmen
-                            company_selectors = [
-                                "[data-testid='job-element-company']",
-                                "[data-at='job-item-company-name']",
-                                ".sc-dkmUuB-company",
-                                ".JobCard-sc-aq7yxf-0 .company"
-                            ]
+                                # Verschiedene Selektoren für Unternehmen
+                                company_selectors = [
+                                    "[data-testid='job-element-company']",
+                                    "[data-at='job-item-company-name']",
+                                    ".sc-dkmUuB-company",
+                                    ".JobCard-sc-aq7yxf-0 .company"
+                                ]
                             
-                            company = None
-                            for selector in company_selectors:
-                                company_elem = job_card.select_one(selector)
-                                if company_elem and company_elem.text.strip():
-                                    company = company_elem.text.strip()
-                                    break
+                                company = None
+                                for selector in company_selectors:
+                                    company_elem = job_card.select_one(selector)
+                                    if company_elem and company_elem.text.strip():
+                                        company = company_elem.text.strip()
+                                        break
                                     
-                            # Verschiedene Selektoren für Standort
-                            location_selectors = [
-                                "[data-testid='job-element-location']",
-                                "[data-at='job-item-location']",
-                                ".sc-dkmUuB-location",
-                                ".JobCard-sc-aq7yxf-0 .location"
-                            ]
+                                # Verschiedene Selektoren für Standort
+                                location_selectors = [
+                                    "[data-testid='job-element-location']",
+                                    "[data-at='job-item-location']",
+                                    ".sc-dkmUuB-location",
+                                    ".JobCard-sc-aq7yxf-0 .location"
+                                ]
                             
-                            location = None
-                            for selector in location_selectors:
-                                location_elem = job_card.select_one(selector)
-                                if location_elem and location_elem.text.strip():
-                                    location = location_elem.text.strip()
-                                    break
-                            
-                            # URL extrahieren
-                            url_element = job_card.select_one("a") or None
-                            if url_element:
-                                job_url = url_element.get("href", "")
-                                # Relative URLs korrigieren
-                                if job_url and not job_url.startswith("http"):
-                                    job_url = f"https://www.stepstone.de{job_url}"
-                            else:
-                                # Versuche alternative Methoden, um die URL zu extrahieren
-                                all_links = job_card.select("a")
-                                for link in all_links:
-                                    href = link.get("href", "")
-                                    if href and ("stellenangebot" in href or "job-details" in href):
-                                        job_url = href if href.startswith("http") else f"https://www.stepstone.de{href}"
+                                location = None
+                                for selector in location_selectors:
+                                    location_elem = job_card.select_one(selector)
+                                    if location_elem and location_elem.text.strip():
+                                        location = location_elem.text.strip()
                                         break
+                            
+                                # URL extrahieren
+                                url_element = job_card.select_one("a") or None
+                                if url_element:
+                                    job_url = url_element.get("href", "")
+                                    # Relative URLs korrigieren
+                                    if job_url and not job_url.startswith("http"):
+                                        job_url = f"https://www.stepstone.de{job_url}"
                                 else:
-                                    job_url = f"https://www.stepstone.de/stellenangebote/suche?q={search_title}&l={search_city}"
+                                    # Versuche alternative Methoden, um die URL zu extrahieren
+                                    all_links = job_card.select("a")
+                                    for link in all_links:
+                                        href = link.get("href", "")
+                                        if href and ("stellenangebot" in href or "job-details" in href):
+                                            job_url = href if href.startswith("http") else f"https://www.stepstone.de{href}"
+                                            break
+                                    else:
+                                        job_url = f"https://www.stepstone.de/stellenangebote/suche?q={search_title}&l={search_city}"
                             
-                            # Validiere extrahierte Daten
-                            if not job_title:
-                                logger.warning(f"Kein Jobtitel gefunden für Stepstone-Job")
-                                continue
+                                # Validiere extrahierte Daten
+                                if not job_title:
+                                    logger.warning(f"Kein Jobtitel gefunden für Stepstone-Job")
+                                    continue
                             
-                            if not company:
-                                company = "Unbekanntes Unternehmen"
+                                if not company:
+                                    company = "Unbekanntes Unternehmen"
                             
-                            if not location:
-                                location = city
+                                if not location:
+                                    location = city
                             
-                            # Job-Objekt erstellen und zur Liste hinzufügen
-                            job_object = {
-                                "title": job_title,
-                                "company": company,
-                                "location": location,
-                                "url": job_url,
-                                "source": "stepstone"
-                            }
+                                # Job-Objekt erstellen und zur Liste hinzufügen
+                                job_object = {
+                                    "title": job_title,
+                                    "company": company,
+                                    "location": location,
+                                    "url": job_url,
+                                    "source": "stepstone"
+                                }
                             
-                            jobs.append(job_object)
-                            logger.info(f"Job gefunden: {job_title} bei {company} in {location}")
+                                jobs.append(job_object)
+                                logger.debug("Job gefunden: %s bei %s in %s", job_title, company, location,
+                                             extra={"category": "job_found"})
                         
-                        except Exception as e:
-                            logger.error(f"Fehler beim Verarbeiten eines Stepstone-Jobs: {type(e).__name__}: {e}")
-                            continue
+                            except Exception as e:
+                                logger.error(f"Fehler beim Verarbeiten eines Stepstone-Jobs: {type(e).__name__}: {e}")
+                                continue
                         
-                        # Prüfen ob Maximum erreicht
-                        if len(jobs) >= max_jobs:
-                            logger.info(f"Maximale Anzahl von {max_jobs} Jobs erreicht")
-                            break
+                            # Prüfen ob Maximum erreicht
+                            if len(jobs) >= max_jobs:
+                                logger.debug("Maximale Anzahl von %d Jobs erreicht", max_jobs)
+                                break
                 else:
                     logger.warning("Keine Job-Listings in der Stepstone-Antwort gefunden")
                     raise ValueError("Keine Job-Listings in der Stepstone-Antwort gefunden")
@@ -476,15 +594,15 @@ def find_stepstone_jobs(title, city, max_jobs=3):
         # Nach allen Versuchen, wenn keine Jobs gefunden wurden, verwende Beispieldaten
         if not jobs:
             logger.warning("Keine Stepstone-Jobs gefunden, verwende Beispieldaten")
-            jobs = get_example_jobs(title, city, "stepstone", max_jobs)
+            jobs = get_example_jobs(title, city, "stepstone", max_jobs, reason="no_cards")
         
         execution_time = time.time() - start_time
-        logger.info(f"Stepstone-Suche abgeschlossen in {execution_time:.2f}s, {len(jobs)} Jobs gefunden")
+        logger.info("Stepstone-Suche abgeschlossen in %.2fs, %d Jobs gefunden", execution_time, len(jobs))
         return jobs
     
     except Exception as e:
         logger.error(f"Fehler bei der Stepstone-Suche: {type(e).__name__}: {e}")
-        example_jobs = get_example_jobs(title, city, "stepstone", max_jobs)
+        example_jobs = get_example_jobs(title, city, "stepstone", max_jobs, reason="error")
         execution_time = time.time() - start_time
         # Füge Fehlerinformationen zu den Beispieldaten hinzu
         for job in example_jobs:
@@ -500,7 +618,7 @@ def find_monster_jobs(title, city, max_jobs=3):
     start_time = time.time()
     if not title or not city:
         logger.info("Monster-Beispieldaten zurückgegeben, da Titel oder Stadt fehlen")
-        return get_example_jobs(title, city, "monster", max_jobs)
+        return get_example_jobs(title, city, "monster", max_jobs, reason="missing_input")
         
     # Sicherheitscheck - Stellen Sie sicher, dass DEBUG_MODE False ist  
     assert DEBUG_MODE == False, "DEBUG_MODE muss für Produktion deaktiviert sein"
@@ -508,9 +626,9 @@ def find_monster_jobs(title, city, max_jobs=3):
     # Debug-Modus: Immer Beispieldaten zurückgeben - SOLLTE NIE AUSGEFÜHRT WERDEN
     if DEBUG_MODE:
         logger.error("DEBUG-MODUS IST AKTIVIERT! Nur Beispieldaten werden zurückgegeben!")
-        return get_example_jobs(title, city, "monster", max_jobs)
+        return get_example_jobs(title, city, "monster", max_jobs, reason="debug_mode")
 
-    logger.info(f"Monster-Suche gestartet für Titel='{title}', Stadt='{city}'")
+    logger.info("Monster-Suche gestartet für Titel='%s', Stadt='%s'", title, city)
     
     try:
         # URL-Formatierung verbessert
@@ -518,13 +636,13 @@ def find_monster_jobs(title, city, max_jobs=3):
         search_city = city.strip().replace(" ", "+")
         
         # Direkte Jobsuche-URL (aktuelles Format 2024)
-        selenium_url = f"https://www.monster.de/jobs/suche?q={search_title}&where={search_city}"
+        selenium_url = f"{MONSTER_BASE_URL}/jobs/suche?q={search_title}&where={search_city}"
         
         # Alternative URLs für den Fall, dass die Haupturl nicht funktioniert
         alternative_urls = [
             selenium_url,
-            f"https://www.monster.de/jobs/suche/?q={search_title}&where={search_city}",
-            f"https://www.monster.de/jobs/search/?q={search_title}&where={search_city}"
+            f"{MONSTER_BASE_URL}/jobs/suche/?q={search_title}&where={search_city}",
+            f"{MONSTER_BASE_URL}/jobs/search/?q={search_title}&where={search_city}"
         ]
         
         jobs = []
@@ -537,20 +655,22 @@ def find_monster_jobs(title, city, max_jobs=3):
             
             # Versuche jede URL mit Selenium
             for current_url in alternative_urls:
-                html_content = load_page_with_selenium(
-                    current_url, 
-                    wait_for_selector="[data-testid='jobCard'], .job-search-card, article.job-card",
-                    timeout=20
-                )
+                with span("try_url", url=current_url):
+                    html_content = load_page_with_selenium(
+                        current_url, 
+                        wait_for_selector="[data-testid='jobCard'], .job-search-card, article.job-card",
+                        timeout=20
+                    )
                 
                 if html_content and len(html_content) > 1000:  # Prüfe auf valides HTML
                     used_url = current_url
-                    logger.info(f"Erfolgreich HTML von URL geladen: {current_url}")
+                    logger.info("Erfolgreich HTML von URL geladen: %s", current_url)
                     break
-                logger.warning(f"Konnte keine valide Seite von {current_url} laden")
+                logger.warning("Konnte keine valide Seite von %s laden", current_url)
             
             # Mit dem HTML weitermachen, falls gefunden
             if html_content:
+                parse_start = time.perf_counter()
                 soup = BeautifulSoup(html_content, "html.parser")
                 
                 # Nach dem typischen "Keine Jobs gefunden" Text suchen
@@ -560,7 +680,7 @@ def find_monster_jobs(title, city, max_jobs=3):
                     "Keine Treffer gefunden"
                 ]):
                     logger.warning(f"Monster meldet 'Keine Jobs gefunden' für {used_url}")
-                    return get_example_jobs(title, city, "monster", max_jobs)
+                    return get_example_jobs(title, city, "monster", max_jobs, reason="no_results")
             
                 # Versuche verschiedene Selektoren für die Stellenangebote
                 card_selectors = [
@@ -573,122 +693,130 @@ def find_monster_jobs(title, city, max_jobs=3):
                 ]
                 
                 job_listings = []
+                matched_selector = "none"
                 for selector in card_selectors:
                     listings = soup.select(selector)
                     if listings:
-                        logger.info(f"Gefunden {len(listings)} Jobs mit Selektor '{selector}'")
+                        logger.info("Gefunden %d Jobs mit Selektor '%s'", len(listings), selector)
                         job_listings = listings
+                        matched_selector = selector
                         break
+                parse_seconds = time.perf_counter() - parse_start
+                PARSE_SECONDS.observe(parse_seconds, source="monster")
+                record_span("parse", parse_seconds, source="monster", selector=matched_selector)
+                CARDS_FOUND.observe(len(job_listings), source="monster", selector=matched_selector)
                 
                 # Verarbeite die gefundenen Stellenangebote
                 if job_listings:
-                    logger.info(f"Insgesamt {len(job_listings)} Stellenangebote gefunden")
+                    logger.info("Insgesamt %d Stellenangebote gefunden", len(job_listings))
                     
-                    for job_card in job_listings[:max_jobs]:
-                        try:
-                            # Verschiedene Selektoren für Titel versuchen
-                            title_selectors = [
-                                "[data-testid='jobTitle']",
-                                ".job-card-title",
-                                ".title",
-                                "h2",
-                                "h3.title"
-                            ]
+                    with span("card_loop", source="monster", cards=len(job_listings)):
+                        for job_card in job_listings[:max_jobs]:
+                            try:
+                                # Verschiedene Selektoren für Titel versuchen
+                                title_selectors = [
+                                    "[data-testid='jobTitle']",
+                                    ".job-card-title",
+                                    ".title",
+                                    "h2",
+                                    "h3.title"
+                                ]
                             
-                            job_title = None
-                            for selector in title_selectors:
-                                title_elem = job_card.select_one(selector)
-                                if title_elem and title_elem.text.strip():
-                                    job_title = title_elem.text.strip()
-                                    break
+                                job_title = None
+                                for selector in title_selectors:
+                                    title_elem = job_card.select_one(selector)
+                                    if title_elem and title_elem.text.strip():
+                                        job_title = title_elem.text.strip()
+                                        break
                             
-                            # Verschiedene Selektoren für Unternehmen
-                            company_selectors = [
-                                "[data-testid='company']",
-                                ".job-card-company",
-                                ".company",
-                                ".name"
-                            ]
+                                # Verschiedene Selektoren für Unternehmen
+                                company_selectors = [
+                                    "[data-testid='company']",
+                                    ".job-card-company",
+                                    ".company",
+                                    ".name"
+                                ]
                             
-                            company = None
-                            for selector in company_selectors:
-                                company_elem = job_card.select_one(selector)
-                                if company_elem and company_elem.text.strip():
-                                    company = company_elem.text.strip()
-                                    break
+                                company = None
+                                for selector in company_selectors:
+                                    company_elem = job_card.select_one(selector)
+                                    if company_elem and company_elem.text.strip():
+                                        company = company_elem.text.strip()
+                                        break
                                     
-                            # Verschiedene Selektoren für Standort
-                            location_selectors = [
-                                "[data-testid='location']",
-                                ".job-card-location",
-                                ".location",
-                                ".address"
-                            ]
+                                # Verschiedene Selektoren für Standort
+                                location_selectors = [
+                                    "[data-testid='location']",
+                                    ".job-card-location",
+                                    ".location",
+                                    ".address"
+                                ]
                             
-                            location = None
-                            for selector in location_selectors:
-                                location_elem = job_card.select_one(selector)
-                                if location_elem and location_elem.text.strip():
-                                    location = location_elem.text.strip()
-                                    break
+                                location = None
+                                for selector in location_selectors:
+                                    location_elem = job_card.select_one(selector)
+                                    if location_elem and location_elem.text.strip():
+                                        location = location_elem.text.strip()
+                                        break
                             
-                            # URL extrahieren
-                            url_selectors = [
-                                "a[data-testid='jobDetailUrl']",
-                                "a.job-card-link",
-                                "a.title-link",
-                                "h2 a", 
-                                "h3 a",
-                                "a[href*='job-view']",
-                                "a"
-                            ]
+                                # URL extrahieren
+                                url_selectors = [
+                                    "a[data-testid='jobDetailUrl']",
+                                    "a.job-card-link",
+                                    "a.title-link",
+                                    "h2 a", 
+                                    "h3 a",
+                                    "a[href*='job-view']",
+                                    "a"
+                                ]
                             
-                            job_url = None
-                            for selector in url_selectors:
-                                url_element = job_card.select_one(selector)
-                                if url_element:
-                                    job_url = url_element.get("href", "")
-                                    if job_url:
-                                        # Relative URLs korrigieren
-                                        if not job_url.startswith("http"):
-                                            job_url = f"https://www.monster.de{job_url}"
-                                        break
+                                job_url = None
+                                for selector in url_selectors:
+                                    url_element = job_card.select_one(selector)
+                                    if url_element:
+                                        job_url = url_element.get("href", "")
+                                        if job_url:
+                                            # Relative URLs korrigieren
+                                            if not job_url.startswith("http"):
+                                                job_url = f"https://www.monster.de{job_url}"
+                                            break
                             
-                            # Fallback für URL
-                            if not job_url:
-                                job_url = f"https://www.monster.de/jobs/suche?q={search_title}&where={search_city}"
+                                # Fallback für URL
+                                if not job_url:
+                                    job_url = f"https://www.monster.de/jobs/suche?q={search_title}&where={search_city}"
                             
-                            # Validiere extrahierte Daten
-                            if not job_title:
-                                logger.warning(f"Kein Jobtitel gefunden für Monster-Job")
-                                continue
+                                # Validiere extrahierte Daten
+                                if not job_title:
+                                    logger.warning(f"Kein Jobtitel gefunden für Monster-Job")
+                                    continue
                             
-                            if not company:
-                                company = "Unbekanntes Unternehmen"
+                                if not company:
+                                    company = "Unbekanntes Unternehmen"
                             
-                            if not location:
-                                location = city
+                                if not location:
+                                    location = city
                             
-                            # Job-Objekt erstellen und zur Liste hinzufügen
-                            job_object = {
-                                "title": job_title,
-                                "company": company,
-                                "location": location,
-                                "url": job_url,
-                                "source": "monster"
-                            }
+                                # Job-Objekt erstellen und zur Liste hinzufügen
+                                job_object = {
+                                    "title": job_title,
+                                    "company": company,
+                                    "location": location,
+                                    "url": job_url,
+                                    "source": "monster"
+                                }
                             
-                            jobs.append(job_object)
-                            logger.info(f"Job gefunden: {job_title} bei {company} in {location}")
+                                jobs.append(job_object)
+                                logger.debug("Job gefunden: %s bei %s in %s", job_title, company, location,
+                                             extra={"category": "job_found"})
                         
-                        except Exception as e:
-                            logger.error(f"Fehler beim Verarbeiten eines Monster-Jobs: {type(e).__name__}: {e}")
-                            continue
+                            except Exception as e:
+                                logger.error(f"Fehler beim Verarbeiten eines Monster-Jobs: {type(e).__name__}: {e}")
+                                continue
                         
-                        # Prüfen ob Maximum erreicht
-                        if len(jobs) >= max_jobs:
-                            logger.info(f"Maximale Anzahl von {max_jobs} Jobs erreicht")
-                            break
+                            # Prüfen ob Maximum erreicht
+                            if len(jobs) >= max_jobs:
+                                logger.debug("Maximale Anzahl von %d Jobs erreicht", max_jobs)
+                                break
                 else:
                     logger.warning("Keine Job-Listings in der Monster-Antwort gefunden")
                     raise ValueError("Keine Job-Listings in der Monster-Antwort gefunden")
@@ -696,15 +824,15 @@ def find_monster_jobs(title, city, max_jobs=3):
         # Nach allen Versuchen, wenn keine Jobs gefunden wurden, verwende Beispieldaten
         if not jobs:
             logger.warning("Keine Monster-Jobs gefunden, verwende Beispieldaten")
-            jobs = get_example_jobs(title, city, "monster", max_jobs)
+            jobs = get_example_jobs(title, city, "monster", max_jobs, reason="no_cards")
             
         execution_time = time.time() - start_time
-        logger.info(f"Monster-Suche abgeschlossen in {execution_time:.2f}s, {len(jobs)} Jobs gefunden")
+        logger.info("Monster-Suche abgeschlossen in %.2fs, %d Jobs gefunden", execution_time, len(jobs))
         return jobs
     
     except Exception as e:
         logger.error(f"Fehler bei der Monster-Suche: {type(e).__name__}: {e}")
-        example_jobs = get_example_jobs(title, city, "monster", max_jobs)
+        example_jobs = get_example_jobs(title, city, "monster", max_jobs, reason="error")
         execution_time = time.time() - start_time
         # Füge Fehlerinformationen zu den Beispieldaten hinzu
         for job in example_jobs:
@@ -726,10 +854,13 @@ def get_text(element, selectors):
             continue
     return ""
 
-def get_example_jobs(title, city, source, max_jobs=3):
+def get_example_jobs(title, city, source, max_jobs=3, reason="unknown"):
     """
     Generiert Beispiel-Jobs für den Fall, dass das Scraping fehlschlägt
+    
+    reason wird für die Kennzahl jobbig_scraper_fallbacks_total mitgezählt.
     """
+    SCRAPER_FALLBACKS.inc(source=source, reason=reason)
     jobs = [
         {
             "title": f"Erfahrener {title}",
@@ -754,4 +885,27 @@ def get_example_jobs(title, city, source, max_jobs=3):
         }
     ]
     logger.info(f"Beispiel-Jobs für {source} generiert")
-    return jobs[:max_jobs]
\ No newline at end of file
+    return jobs[:max_jobs]
+# Scraper je Quelle (für Crawl-Worker und Batch-Crawler)
+SCRAPERS = {
+    "stepstone": find_stepstone_jobs,
+    "monster": find_monster_jobs,
+}
+
+# Host, den der Scraper einer Quelle abfragt (für Rate-Limits)
+SCRAPER_HOSTS = {
+    "stepstone": urlparse(STEPSTONE_BASE_URL).netloc,
+    "monster": urlparse(MONSTER_BASE_URL).netloc,
+}
+
+def is_fallback_result(jobs):
+    """
+    True, wenn die Scraper statt echter Treffer Beispieldaten geliefert haben
+    
+    Die Scraper werfen keine Fehler, sondern geben bei Problemen Beispiel-Jobs
+    (Quelle "... (example)", ggf. mit error_info) zurück.
+    """
+    return not jobs or all(
+        "error_info" in job or str(job.get("source", "")).endswith("(example)")
+        for job in jobs
+    )
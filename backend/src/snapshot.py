@@ -0,0 +1,286 @@
+"""Snapshot und Wiederherstellung des Job-Bestands (Postgres).
+
+Ein Snapshot ist ein unkomprimiertes tar-Archiv mit:
+
+- ``manifest.json``: Formatversion, Zeitpunkt, Spalten und Zeilenzahlen
+- ``jobs.copy.gz``: die Jobs inkl. Cluster-ID, MinHash und LSH-Bändern
+- ``job_stats.copy.gz``: die vorberechneten Zähler
+
+Die Tabellen werden per ``COPY ... TO STDOUT (FORMAT binary)`` in einer
+REPEATABLE-READ-Transaktion gelesen, also konsistent zueinander, und per
+``COPY ... FROM STDIN`` zurückgeschrieben. search_vector ist eine generierte
+Spalte und wird beim Einspielen neu berechnet.
+
+Ist ``JOBS_SNAPSHOT_PATH`` gesetzt, spielt der Schema-Bootstrap den Snapshot
+ein, solange die Jobs-Tabelle leer ist - ein neuer Knoten startet so mit
+dem letzten Bestand statt alles neu zu scrapen.
+
+    python -m src.snapshot create jobs.snapshot
+    python -m src.snapshot restore jobs.snapshot [--replace]
+    python -m src.snapshot info jobs.snapshot
+"""
+
+import argparse
+import gzip
+import io
+import json
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+from datetime import date, datetime, timezone
+
+from .bulk_import import IMPORT_LOCK_ID
+from .database import create_tables_if_not_exist, get_database
+from .partitions import ensure_partition
+from .stats import refill_stats_urls
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "jobbig-snapshot"
+
+# Bei inkompatiblen Änderungen am Inhalt erhöhen
+SNAPSHOT_VERSION = 1
+
+# Gesicherte Tabellen und Spalten (in dieser Reihenfolge eingespielt)
+SNAPSHOT_TABLES = {
+    "jobs": ["id", "title", "company", "location", "url", "source", "scraped_at",
+             "cluster_id", "minhash", "lsh_bands"],
+    "job_stats": ["month", "source", "city", "title_norm", "job_count"],
+}
+
+# Snapshot, der beim Start in eine leere Datenbank eingespielt wird
+SNAPSHOT_PATH = os.environ.get("JOBS_SNAPSHOT_PATH", "")
+
+# Bytes pro read()/write() beim COPY
+COPY_CHUNK_SIZE = 1 << 20
+
+# gzip-Stufe: schnell statt maximal klein, der Snapshot soll zügig entstehen
+GZIP_LEVEL = 3
+
+
+def _member_name(table):
+    return f"{table}.copy.gz"
+
+
+def create_snapshot(path):
+    """
+    Schreibt Jobs und Zähler in die Snapshot-Datei path
+
+    Die Datei wird zunächst unter einem temporären Namen geschrieben und erst
+    nach Erfolg umbenannt. Gibt das Manifest zurück.
+    """
+    conn = get_database()
+    if not conn:
+        raise RuntimeError("Keine Datenbankverbindung vorhanden, Snapshot nicht möglich")
+
+    start = time.perf_counter()
+    workdir = tempfile.mkdtemp(prefix="jobbig-snapshot-", dir=os.path.dirname(os.path.abspath(path)))
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "tables": {},
+    }
+
+    try:
+        # Verbindungen aus dem Pool können schon in einer Transaktion stecken (pool_pre_ping);
+        # SET TRANSACTION muss die erste Anweisung einer neuen Transaktion sein
+        conn.rollback()
+        with conn.cursor() as cur:
+            # Ein Snapshot-Zeitpunkt für alle Tabellen
+            cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+            cur.execute("SHOW server_version_num")
+            manifest["server_version_num"] = int(cur.fetchone()[0])
+            cur.execute("SELECT DISTINCT date_trunc('month', scraped_at AT TIME ZONE 'UTC')::date FROM jobs ORDER BY 1")
+            manifest["months"] = [row[0].isoformat() for row in cur.fetchall()]
+
+            for table, columns in SNAPSHOT_TABLES.items():
+                with gzip.open(os.path.join(workdir, _member_name(table)), "wb", compresslevel=GZIP_LEVEL) as target:
+                    cur.copy_expert(
+                        f"COPY (SELECT {', '.join(columns)} FROM {table}) TO STDOUT WITH (FORMAT binary)",
+                        target,
+                        size=COPY_CHUNK_SIZE
+                    )
+                manifest["tables"][table] = {"columns": columns, "rows": cur.rowcount}
+        conn.rollback()
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    try:
+        partial = f"{path}.partial"
+        with tarfile.open(partial, "w") as archive:
+            data = json.dumps(manifest, indent=2).encode("utf-8")
+            info = tarfile.TarInfo("manifest.json")
+            info.size = len(data)
+            info.mtime = int(time.time())
+            archive.addfile(info, io.BytesIO(data))
+            for table in SNAPSHOT_TABLES:
+                archive.add(os.path.join(workdir, _member_name(table)), arcname=_member_name(table))
+        os.replace(partial, path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    logger.info(
+        f"Snapshot {path} erstellt: {manifest['tables']['jobs']['rows']} Jobs, "
+        f"{size_mb:.1f} MB in {elapsed:.1f}s"
+    )
+    return manifest
+
+
+def read_manifest(archive):
+    """Liest und prüft das Manifest eines geöffneten Snapshot-Archivs"""
+    try:
+        manifest = json.load(archive.extractfile("manifest.json"))
+    except (KeyError, ValueError) as e:
+        raise ValueError(f"Keine gültige Snapshot-Datei: {e}")
+
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError("Keine gültige Snapshot-Datei: unbekanntes Format")
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(
+            f"Snapshot-Version {manifest.get('version')} wird nicht unterstützt (erwartet {SNAPSHOT_VERSION})"
+        )
+    for table, columns in SNAPSHOT_TABLES.items():
+        if manifest.get("tables", {}).get(table, {}).get("columns") != columns:
+            raise ValueError(f"Snapshot passt nicht zum Schema der Tabelle {table}")
+    return manifest
+
+
+def snapshot_info(path):
+    """Manifest einer Snapshot-Datei"""
+    with tarfile.open(path, "r") as archive:
+        return read_manifest(archive)
+
+
+def restore_snapshot(path, replace=False):
+    """
+    Spielt eine Snapshot-Datei ein
+
+    Ohne replace muss die Jobs-Tabelle leer sein, sonst wird ValueError
+    geworfen; mit replace werden Jobs und Zähler vorher geleert. Alles läuft
+    in einer Transaktion. Gibt eine Zusammenfassung zurück.
+    """
+    start = time.perf_counter()
+    with tarfile.open(path, "r") as archive:
+        manifest = read_manifest(archive)
+
+        if not create_tables_if_not_exist():
+            raise RuntimeError("Schema konnte nicht erstellt werden, Wiederherstellung nicht möglich")
+
+        conn = get_database()
+        if not conn:
+            raise RuntimeError("Keine Datenbankverbindung vorhanden, Wiederherstellung nicht möglich")
+
+        try:
+            with conn.cursor() as cur:
+                # Nicht gleichzeitig mit einem Bulk-Import oder einer zweiten Wiederherstellung
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (IMPORT_LOCK_ID,))
+                cur.execute("SELECT EXISTS (SELECT 1 FROM jobs)")
+                if cur.fetchone()[0]:
+                    if not replace:
+                        raise ValueError("Jobs-Tabelle ist nicht leer, Wiederherstellung nur mit replace")
+                    logger.info("Leere Jobs und Zähler vor der Wiederherstellung")
+                    cur.execute("TRUNCATE jobs, job_stats, job_stats_urls")
+
+                for month in manifest.get("months", []):
+                    ensure_partition(cur, date.fromisoformat(month))
+
+                for table, columns in SNAPSHOT_TABLES.items():
+                    with gzip.GzipFile(fileobj=archive.extractfile(_member_name(table))) as source:
+                        cur.copy_expert(
+                            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT binary)",
+                            source,
+                            size=COPY_CHUNK_SIZE
+                        )
+                    logger.info(f"{cur.rowcount} Zeilen in {table} eingespielt")
+
+                # Gezählte URLs je Monat gehören nicht zum Snapshot, sie folgen aus den Jobs
+                refill_stats_urls(cur)
+                cur.execute("SELECT setval('jobs_id_seq', COALESCE((SELECT MAX(id) FROM jobs), 0) + 1, false)")
+                cur.execute("ANALYZE jobs")
+                cur.execute("ANALYZE job_stats")
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "createdAt": manifest["created_at"],
+        "jobs": manifest["tables"]["jobs"]["rows"],
+        "stats": manifest["tables"]["job_stats"]["rows"],
+        "seconds": round(elapsed, 2),
+    }
+    logger.info(f"Snapshot {path} eingespielt: {summary['jobs']} Jobs in {elapsed:.1f}s")
+    return summary
+
+
+def restore_on_start(path=SNAPSHOT_PATH):
+    """
+    Spielt JOBS_SNAPSHOT_PATH beim Start ein, falls die Jobs-Tabelle leer ist
+
+    Fehler werden nur protokolliert: ein fehlender oder defekter Snapshot soll
+    den Start nicht verhindern.
+    """
+    if not path:
+        return None
+    if not os.path.exists(path):
+        logger.warning(f"Snapshot {path} nicht gefunden, starte ohne Bestand")
+        return None
+    try:
+        return restore_snapshot(path)
+    except ValueError as e:
+        logger.info(f"Snapshot {path} nicht eingespielt: {e}")
+    except Exception as e:
+        logger.error(f"Fehler beim Einspielen des Snapshots {path}: {type(e).__name__}: {e}")
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot des Job-Bestands erstellen oder einspielen")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="Snapshot schreiben")
+    create.add_argument("path")
+    restore = commands.add_parser("restore", help="Snapshot einspielen")
+    restore.add_argument("path")
+    restore.add_argument("--replace", action="store_true", help="Vorhandene Jobs und Zähler ersetzen")
+    info = commands.add_parser("info", help="Manifest anzeigen")
+    info.add_argument("path")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    try:
+        if args.command == "create":
+            result = create_snapshot(args.path)
+        elif args.command == "restore":
+            result = restore_snapshot(args.path, replace=args.replace)
+        else:
+            result = snapshot_info(args.path)
+    except (ValueError, RuntimeError, OSError) as e:
+        logger.error(str(e))
+        return 1
+
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
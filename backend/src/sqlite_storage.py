@@ -0,0 +1,547 @@
+"""Eingebettetes SQLite-Backend (WAL, FTS5) mit denselben Semantiken wie Postgres.
+
+Für Single-Node-Betrieb, CI und Benchmarks ohne externe Datenbank:
+
+- Filter (Titel, Stadt, Quelle, Zeitfenster) und Keyset-Pagination nach ID
+- Volltextsuche über einen FTS5-Index auf Titel, Firma und Ort mit
+  Präfixsuche, websearch-Syntax ("Phrase", -Ausschluss, or) und Gewichtung
+  Titel > Firma > Ort; paginiert nach (rank, id)
+- Duplikat-Cluster per MinHash/LSH (Bänder in job_bands) und vorberechnete
+  Zähler in job_stats (jede URL einmal pro Monat, siehe job_stats_urls)
+
+Mit dem Pfad ":memory:" liegt alles im Speicher (eine gemeinsame Verbindung).
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from .database import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, STREAM_BATCH_SIZE, decode_cursor, encode_cursor, prepare_job_row,
+)
+from .dedupe import LSHIndex, fingerprint_job, lsh_band_keys
+from .partitions import RETENTION_MONTHS, add_months, month_start, query_window_start
+from .stats import STATS_DEFAULT_LIMIT, STATS_DIMENSIONS, STATS_MAX_LIMIT, stats_key
+from .storage import JobStorage
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+# Wartezeit in Sekunden, wenn ein anderer Schreiber die Datenbank sperrt
+BUSY_TIMEOUT = 5.0
+
+# Gewichte für bm25 in der Reihenfolge title, company, location (wie A/B/C in Postgres)
+FTS_WEIGHTS = (3.0, 2.0, 1.0)
+
+# Maximale Anzahl Parameter pro IN-Liste
+MAX_IN_PARAMS = 500
+
+# Trefferzahl je Seite höchstens bis hierhin exakt zählen (statt COUNT(*) über alles)
+SQLITE_COUNT_LIMIT = int(os.environ.get("SQLITE_COUNT_LIMIT", "1000"))
+
+JOB_COLUMNS = "id, title, company, location, url, source, scraped_at, cluster_id"
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        company TEXT NOT NULL,
+        location TEXT NOT NULL,
+        url TEXT NOT NULL,
+        source TEXT NOT NULL,
+        scraped_at TEXT NOT NULL,
+        cluster_id TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_jobs_scraped_at ON jobs (scraped_at)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_source ON jobs (source, id)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_cluster_id ON jobs (cluster_id)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_url ON jobs (url, scraped_at, id)",
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, company, location,
+        content='jobs', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts (rowid, title, company, location)
+        VALUES (new.id, new.title, new.company, new.location);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location)
+        VALUES ('delete', old.id, old.title, old.company, old.location);
+    END
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS job_clusters (
+        cluster_id TEXT PRIMARY KEY,
+        minhash TEXT NOT NULL,
+        last_seen TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS job_bands (
+        band INTEGER NOT NULL,
+        cluster_id TEXT NOT NULL,
+        PRIMARY KEY (band, cluster_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS job_stats (
+        month TEXT NOT NULL,
+        source TEXT NOT NULL,
+        city TEXT NOT NULL,
+        title_norm TEXT NOT NULL,
+        job_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (month, source, city, title_norm)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS job_stats_urls (
+        month TEXT NOT NULL,
+        url TEXT NOT NULL,
+        PRIMARY KEY (month, url)
+    ) WITHOUT ROWID
+    """,
+]
+
+SEARCH_TOKEN_PATTERN = re.compile(r'(-?)"([^"]*)"|(\S+)')
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def format_timestamp(dt):
+    """UTC-Zeitstempel mit fester Länge, damit Textvergleiche chronologisch sind"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")
+
+
+def job_from_row(row):
+    """Wandelt eine Zeile mit den Spalten aus JOB_COLUMNS in ein Job-Dict (wie database.job_from_row)"""
+    return {
+        "id": row[0],
+        "title": row[1],
+        "company": row[2],
+        "location": row[3],
+        "url": row[4],
+        "source": row[5],
+        "scraped_at": datetime.fromisoformat(row[6]).isoformat() if row[6] else None,
+        "cluster_id": row[7]
+    }
+
+
+def fts_query(text):
+    """
+    Übersetzt websearch-Syntax in eine FTS5-Abfrage mit Präfixsuche
+
+    Wörter werden per UND verknüpft und als Präfix gesucht, "..." ist eine
+    Phrase, -wort schließt aus, "or" verknüpft die Nachbarn per ODER.
+    Liefert None, wenn kein positiver Suchbegriff übrig bleibt.
+    """
+    positive, negative = [], []
+    pending_or = False
+
+    for match in SEARCH_TOKEN_PATTERN.finditer(text or ""):
+        negated, phrase, word = match.group(1) == "-", match.group(2), match.group(3)
+        if word is not None:
+            if word.lower() == "or":
+                pending_or = bool(positive)
+                continue
+            if word.startswith("-") and len(word) > 1:
+                negated, word = True, word[1:]
+
+        terms = WORD_PATTERN.findall((phrase if phrase is not None else word).lower())
+        if not terms:
+            continue
+
+        if phrase is not None:
+            expression = '"' + " ".join(terms) + '"*'
+        else:
+            expression = " AND ".join(f'"{term}"*' for term in terms)
+            if len(terms) > 1:
+                expression = f"({expression})"
+
+        if negated:
+            negative.append(expression)
+        elif pending_or:
+            positive[-1] = f"({positive[-1]} OR {expression})"
+        else:
+            positive.append(expression)
+        pending_or = False
+
+    if not positive:
+        return None
+
+    expression = " AND ".join(positive)
+    for excluded in negative:
+        expression = f"({expression}) NOT {excluded}"
+    return expression
+
+
+def _casefold(value):
+    return value.casefold() if isinstance(value, str) else value
+
+
+class SqliteStorage(JobStorage):
+    """Speicher-Backend auf Basis einer eingebetteten SQLite-Datenbank"""
+
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self.memory = path == ":memory:"
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._shared = None
+        self._schema_ready = False
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, check_same_thread=not self.memory)
+        if not self.memory:
+            # WAL: Leser blockieren den Schreiber nicht und umgekehrt
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(BUSY_TIMEOUT * 1000)}")
+        # Unicode-fähiges Gegenstück zu ILIKE (SQLite-lower kennt nur ASCII)
+        conn.create_function("casefold", 1, _casefold, deterministic=True)
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """
+        Verbindung für den aktuellen Thread (Datei) bzw. die gemeinsame Verbindung (Speicher)
+        """
+        if self.memory:
+            with self._lock:
+                if self._shared is None:
+                    self._shared = self._open()
+                self._ensure_schema(self._shared)
+                yield self._shared
+        else:
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._local.conn = self._open()
+            self._ensure_schema(conn)
+            yield conn
+
+    def _ensure_schema(self, conn):
+        if self._schema_ready:
+            return
+        with self._lock:
+            if not self._schema_ready:
+                for statement in SCHEMA:
+                    conn.execute(statement)
+                conn.commit()
+                self._schema_ready = True
+                logger.info(f"SQLite-Schema sichergestellt ({self.path})")
+
+    def bootstrap(self):
+        """Schema anlegen und Daten außerhalb der Aufbewahrungsfrist löschen"""
+        cutoff = add_months(month_start(datetime.now(timezone.utc)), -(RETENTION_MONTHS - 1))
+        try:
+            with self._connection() as conn:
+                deleted = conn.execute("DELETE FROM jobs WHERE scraped_at < ?", (format_timestamp(cutoff),)).rowcount
+                conn.execute("DELETE FROM job_stats WHERE month < ?", (cutoff.date().isoformat(),))
+                conn.execute("DELETE FROM job_stats_urls WHERE month < ?", (cutoff.date().isoformat(),))
+                conn.execute("DELETE FROM job_clusters WHERE last_seen < ?", (format_timestamp(cutoff),))
+                conn.execute("DELETE FROM job_bands WHERE cluster_id NOT IN (SELECT cluster_id FROM job_clusters)")
+                conn.commit()
+            if deleted:
+                logger.info(f"{deleted} Jobs älter als {cutoff.date()} entfernt")
+            return True
+        except Exception as e:
+            logger.error(f"Fehler beim Einrichten der SQLite-Datenbank: {e}")
+            return False
+
+    def verify(self):
+        try:
+            with self._connection() as conn:
+                conn.execute("SELECT 1").fetchone()
+            return True
+        except Exception as e:
+            logger.error(f"SQLite-Datenbank nicht verfügbar: {e}")
+            return False
+
+    def _load_lsh_candidates(self, conn, band_keys):
+        """Bekannte Cluster, die mindestens ein LSH-Band mit den neuen Jobs teilen"""
+        index = LSHIndex()
+        band_keys = list(band_keys)
+        since = query_window_start()
+        for start in range(0, len(band_keys), MAX_IN_PARAMS):
+            chunk = band_keys[start:start + MAX_IN_PARAMS]
+            sql = (
+                "SELECT DISTINCT c.cluster_id, c.minhash FROM job_bands b "
+                "JOIN job_clusters c ON c.cluster_id = b.cluster_id "
+                f"WHERE b.band IN ({', '.join('?' * len(chunk))})"
+            )
+            params = list(chunk)
+            if since is not None:
+                sql += " AND c.last_seen >= ?"
+                params.append(format_timestamp(since))
+            for cluster_id, minhash in conn.execute(sql, params):
+                signature = json.loads(minhash)
+                index.add(signature, lsh_band_keys(signature), cluster_id)
+        return index
+
+    def save_jobs(self, jobs):
+        if not jobs:
+            logger.info("Keine Jobs zum Speichern vorhanden")
+            return 0
+
+        # Gleiche Prüfung und Spaltenlängen wie in Postgres
+        valid_jobs = [job for job in (prepare_job_row(job) for job in jobs) if job is not None]
+
+        now = datetime.now(timezone.utc)
+        scraped_at = format_timestamp(now)
+        fingerprints = [fingerprint_job(job) for job in valid_jobs]
+        month = month_start(now).date()
+
+        with self._connection() as conn:
+            try:
+                # Eine Transaktion für den Batch, ein Savepoint je Job (wie insert_jobs in Postgres)
+                if not conn.in_transaction:
+                    conn.execute("BEGIN")
+                index = self._load_lsh_candidates(conn, {key for _, bands in fingerprints for key in bands})
+                stats = {}
+                saved = 0
+                for job, (signature, band_keys) in zip(valid_jobs, fingerprints):
+                    cluster_id = index.assign(signature, band_keys)
+                    conn.execute("SAVEPOINT insert_job")
+                    try:
+                        counted = self._insert_job(conn, job, cluster_id, signature, band_keys, scraped_at, month)
+                    except sqlite3.Error as e:
+                        # Gesperrte oder kaputte Datenbank betrifft den ganzen Batch
+                        if isinstance(e, sqlite3.OperationalError):
+                            raise
+                        conn.execute("ROLLBACK TO SAVEPOINT insert_job")
+                        conn.execute("RELEASE SAVEPOINT insert_job")
+                        logger.warning(f"Job konnte nicht eingefügt werden, überspringe ({job['url']}): {e}")
+                        continue
+                    conn.execute("RELEASE SAVEPOINT insert_job")
+                    job["cluster_id"] = cluster_id
+                    saved += 1
+                    if counted:
+                        key = stats_key(job, month)
+                        stats[key] = stats.get(key, 0) + 1
+
+                # Vorberechnete Statistik in derselben Transaktion fortschreiben
+                conn.executemany(
+                    "INSERT INTO job_stats (month, source, city, title_norm, job_count) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (month, source, city, title_norm) "
+                    "DO UPDATE SET job_count = job_stats.job_count + excluded.job_count",
+                    [(key[0].isoformat(), *key[1:], count) for key, count in sorted(stats.items())]
+                )
+                conn.commit()
+                logger.info(f"{saved} von {len(jobs)} Jobs in der SQLite-Datenbank gespeichert")
+                return saved
+            except Exception as e:
+                logger.error(f"Fehler beim Speichern der Jobs in der SQLite-Datenbank: {e}")
+                conn.rollback()
+                return 0
+
+    def _insert_job(self, conn, job, cluster_id, signature, band_keys, scraped_at, month):
+        """Schreibt einen Job samt Cluster und Bändern; True, wenn die URL im Monat neu gezählt wird"""
+        conn.execute(
+            "INSERT INTO jobs (title, company, location, url, source, scraped_at, cluster_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job["title"], job["company"], job["location"], job["url"], job["source"],
+             scraped_at, cluster_id)
+        )
+        conn.execute(
+            "INSERT INTO job_clusters (cluster_id, minhash, last_seen) VALUES (?, ?, ?) "
+            "ON CONFLICT (cluster_id) DO UPDATE SET last_seen = excluded.last_seen",
+            (cluster_id, json.dumps(signature), scraped_at)
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO job_bands (band, cluster_id) VALUES (?, ?)",
+            [(key, cluster_id) for key in band_keys]
+        )
+        # Nur URLs zählen, die im Monat noch nicht gezählt wurden
+        return conn.execute(
+            "INSERT OR IGNORE INTO job_stats_urls (month, url) VALUES (?, ?)",
+            (month.isoformat(), job["url"])
+        ).rowcount > 0
+
+    def _filters(self, title="", city="", source="", days=None, prefix=""):
+        # Nur die neueste Zeile je URL (wie LATEST_ROW_CONDITION in Postgres)
+        outer = prefix or "jobs."
+        where = (
+            " WHERE NOT EXISTS (SELECT 1 FROM jobs newer WHERE newer.url = "
+            f"{outer}url AND (newer.scraped_at, newer.id) > ({outer}scraped_at, {outer}id))"
+        )
+        params = []
+
+        since = query_window_start(days)
+        if since is not None:
+            where += f" AND {prefix}scraped_at >= ?"
+            params.append(format_timestamp(since))
+
+        if title:
+            where += f" AND casefold({prefix}title) LIKE ?"
+            params.append(f"%{title.casefold()}%")
+
+        if city:
+            where += f" AND casefold({prefix}location) LIKE ?"
+            params.append(f"%{city.casefold()}%")
+
+        if source:
+            where += f" AND {prefix}source = ?"
+            params.append(source)
+
+        return where, params
+
+    def _search(self, conn, match, source, days, limit, after):
+        where, params = self._filters(source=source, days=days, prefix="j.")
+        weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+        sql = f"""
+            SELECT {JOB_COLUMNS}, rank FROM (
+                SELECT j.id, j.title, j.company, j.location, j.url, j.source, j.scraped_at, j.cluster_id,
+                       -bm25(jobs_fts, {weights}) AS rank
+                FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid
+                {where} AND jobs_fts MATCH ?
+            ) WHERE 1=1
+        """
+        params.append(match)
+        if after is not None:
+            sql += " AND (rank < ? OR (rank = ? AND id < ?))"
+            params.extend([float(after[0]), float(after[0]), int(after[1])])
+        sql += " ORDER BY rank DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        jobs = []
+        for row in conn.execute(sql, params):
+            job = job_from_row(row)
+            job["rank"] = row[8]
+            jobs.append(job)
+        return jobs
+
+    def _count(self, conn, title, city, source, match, days):
+        """
+        Trefferzahl, gezählt bis höchstens SQLITE_COUNT_LIMIT
+
+        Wie die Schätzung in Postgres kein exaktes COUNT(*) über alle Treffer
+        je Seite; ab der Grenze ist der Wert eine Untergrenze.
+        """
+        if match:
+            where, params = self._filters(source=source, days=days, prefix="j.")
+            sql = f"SELECT 1 FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid{where} AND jobs_fts MATCH ?"
+            params.append(match)
+        else:
+            where, params = self._filters(title, city, source, days)
+            sql = "SELECT 1 FROM jobs" + where
+        params.append(SQLITE_COUNT_LIMIT)
+        return conn.execute(f"SELECT COUNT(*) FROM ({sql} LIMIT ?)", params).fetchone()[0]
+
+    def query_jobs(self, title="", city="", source="", query="", page_size=None, cursor=None, days=None):
+        page_size = max(1, min(int(page_size or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+        match = fts_query(query) if query else None
+
+        # Cursor vor dem Datenbankzugriff prüfen, damit ungültige Werte als ValueError ankommen
+        if query:
+            after = decode_cursor(cursor, "rank") if cursor else None
+        else:
+            after = decode_cursor(cursor, "id") if cursor else None
+
+        jobs, total = [], 0
+        try:
+            with self._connection() as conn:
+                if query:
+                    if match:
+                        jobs = self._search(conn, match, source, days, page_size + 1, after)
+                        total = self._count(conn, title, city, source, match, days)
+                else:
+                    where, params = self._filters(title, city, source, days)
+                    sql = f"SELECT {JOB_COLUMNS} FROM jobs" + where
+                    if after is not None:
+                        sql += " AND id < ?"
+                        params.append(after)
+                    sql += " ORDER BY id DESC LIMIT ?"
+                    params.append(page_size + 1)
+                    jobs = [job_from_row(row) for row in conn.execute(sql, params)]
+                    total = self._count(conn, title, city, source, None, days)
+        except Exception as e:
+            logger.error(f"Fehler beim Abrufen der Jobs aus der SQLite-Datenbank: {e}")
+
+        next_cursor = None
+        if len(jobs) > page_size:
+            jobs = jobs[:page_size]
+            last = jobs[-1]
+            if query:
+                next_cursor = encode_cursor("rank", [last["rank"], last["id"]])
+            else:
+                next_cursor = encode_cursor("id", [last["id"]])
+
+        return {
+            "jobs": jobs,
+            "nextCursor": next_cursor,
+            "estimatedTotal": total,
+            "pageSize": page_size
+        }
+
+    def stream_jobs(self, title="", city="", source="", days=None):
+        """
+        Liefert alle passenden Jobs nach ID, in Keyset-Batches von STREAM_BATCH_SIZE
+
+        Die Verbindung (im Speicher-Modus samt Lock) wird nur für jeden Batch
+        gehalten, nicht über die ganze gestreamte Antwort.
+        """
+        where, params = self._filters(title, city, source, days)
+        sql = f"SELECT {JOB_COLUMNS} FROM jobs" + where + " AND id > ? ORDER BY id LIMIT ?"
+        last_id = 0
+        while True:
+            with self._connection() as conn:
+                rows = conn.execute(sql, params + [last_id, STREAM_BATCH_SIZE]).fetchall()
+            for row in rows:
+                yield job_from_row(row)
+            if len(rows) < STREAM_BATCH_SIZE:
+                break
+            last_id = rows[-1][0]
+
+    def job_stats(self, by="source", source="", days=None, limit=None):
+        if by not in STATS_DIMENSIONS:
+            raise ValueError(f"Unbekannte Dimension '{by}', erlaubt: {', '.join(STATS_DIMENSIONS)}")
+
+        column = STATS_DIMENSIONS[by]
+        limit = max(1, min(int(limit or STATS_DEFAULT_LIMIT), STATS_MAX_LIMIT))
+
+        sql = f"SELECT {column}, SUM(job_count) FROM job_stats WHERE 1=1"
+        params = []
+
+        since = query_window_start(days)
+        if since is not None:
+            sql += " AND month >= ?"
+            params.append(month_start(since).date().isoformat())
+
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+
+        sql += f" GROUP BY {column} ORDER BY 2 DESC, 1 LIMIT ?"
+        params.append(limit)
+
+        try:
+            with self._connection() as conn:
+                return [{"key": row[0], "count": int(row[1])} for row in conn.execute(sql, params)]
+        except Exception as e:
+            logger.error(f"Fehler beim Abrufen der Statistik aus der SQLite-Datenbank: {e}")
+            return []
+
+    def info(self):
+        info = {"backend": self.name, "path": self.path}
+        try:
+            with self._connection() as conn:
+                info["journal_mode"] = conn.execute("PRAGMA journal_mode").fetchone()[0]
+                info["jobs"] = conn.execute("SELECT MAX(id) FROM jobs").fetchone()[0] or 0
+        except Exception as e:
+            info["error"] = str(e)
+        return info
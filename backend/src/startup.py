@@ -0,0 +1,113 @@
+"""Startphasen-Messung und einmaliger Schema-Bootstrap.
+
+Der Start des Web-Prozesses darf nicht auf die Datenbank warten: das Schema
+wird einmal pro Prozess in einem Hintergrund-Thread sichergestellt (bei
+Fehlschlag mit Backoff wiederholt, bis es klappt), und die
+Dauer der einzelnen Startphasen wird für /diagnostics und den
+Startup-Benchmark (benchmarks/startup.py) festgehalten.
+"""
+
+import logging
+import os
+import threading
+import time
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+# Zeitpunkt, an dem das Paket zum ersten Mal importiert wurde
+_last_mark = time.perf_counter()
+
+# Dauer der Startphasen in Sekunden, in Reihenfolge ihres Abschlusses
+STARTUP_PHASES = {}
+
+# Wartezeit vor dem n-ten erneuten Bootstrap-Versuch: BASE * 2^(n-1), höchstens MAX
+SCHEMA_RETRY_BASE = float(os.environ.get("SCHEMA_RETRY_BASE", "1"))
+SCHEMA_RETRY_MAX = float(os.environ.get("SCHEMA_RETRY_MAX", "60"))
+
+_schema_lock = threading.Lock()
+_schema_state = {
+    "status": "pending",  # pending | running | ok | failed
+    "duration_seconds": None,
+    "error": None,
+    "attempts": 0,
+}
+
+
+def mark_phase(name):
+    """Speichert die Dauer seit der letzten Marke als Startphase name"""
+    global _last_mark
+    now = time.perf_counter()
+    STARTUP_PHASES[name] = round(now - _last_mark, 4)
+    _last_mark = now
+    return STARTUP_PHASES[name]
+
+
+def ensure_schema():
+    """
+    Stellt das Datenbankschema einmal pro Prozess sicher
+
+    Nach einem Erfolg kehrt der Aufruf sofort zurück; nach einem Fehlschlag
+    (z.B. Datenbank noch nicht bereit) versucht es der nächste Aufruf erneut.
+    """
+    if _schema_state["status"] == "ok":
+        return True
+
+    with _schema_lock:
+        if _schema_state["status"] == "ok":
+            return True
+
+        from .storage import get_storage
+
+        _schema_state["status"] = "running"
+        _schema_state["attempts"] += 1
+        start = time.perf_counter()
+        try:
+            # Schema anlegen und Aufbewahrung anwenden (je nach Speicher-Backend)
+            ok = get_storage().bootstrap()
+            _schema_state["status"] = "ok" if ok else "failed"
+            _schema_state["error"] = None if ok else "Schema konnte nicht erstellt werden"
+        except Exception as e:
+            logger.error(f"Fehler beim Schema-Bootstrap: {type(e).__name__}: {e}")
+            _schema_state["status"] = "failed"
+            _schema_state["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            _schema_state["duration_seconds"] = round(time.perf_counter() - start, 4)
+
+        if "schema_bootstrap" not in STARTUP_PHASES:
+            STARTUP_PHASES["schema_bootstrap"] = _schema_state["duration_seconds"]
+        logger.info(f"Schema-Bootstrap: {_schema_state['status']} in {_schema_state['duration_seconds']:.2f}s")
+        return _schema_state["status"] == "ok"
+
+
+def retry_delay(attempts):
+    """Wartezeit nach attempts fehlgeschlagenen Bootstrap-Versuchen"""
+    return min(SCHEMA_RETRY_BASE * 2 ** max(0, attempts - 1), SCHEMA_RETRY_MAX)
+
+
+def _bootstrap_until_ok(stop_event=None):
+    """Wiederholt ensure_schema mit Backoff, bis das Schema steht (sonst bliebe /ready auf 503)"""
+    stop_event = stop_event or threading.Event()
+    while not ensure_schema():
+        delay = retry_delay(_schema_state["attempts"])
+        logger.warning(f"Schema-Bootstrap fehlgeschlagen, neuer Versuch in {delay:.0f}s")
+        if stop_event.wait(delay):
+            return False
+    return True
+
+
+def start_schema_bootstrap():
+    """Startet den Bootstrap in einem Hintergrund-Thread, ohne den Start zu blockieren"""
+    if _schema_state["status"] != "pending":
+        return None
+    thread = threading.Thread(target=_bootstrap_until_ok, name="schema-bootstrap", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_startup_info():
+    """Startphasen und Bootstrap-Status für /diagnostics"""
+    return {
+        "phases_seconds": dict(STARTUP_PHASES),
+        "schema": dict(_schema_state),
+    }
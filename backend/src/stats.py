@@ -0,0 +1,272 @@
+"""Vorberechnete Job-Statistiken (Anzahl nach Quelle, Stadt und Titel).
+
+Die Zähler liegen in der kleinen Tabelle ``job_stats`` (ein Eintrag pro
+Monat, Quelle, Stadt und normalisiertem Titel) und werden beim Speichern
+neuer Jobs inkrementell hochgezählt. Abfragen lesen nur diese Tabelle und
+sind damit unabhängig von der Größe der Jobs-Tabelle.
+
+Gezählt wird jede URL einmal pro Monat (wie ``COUNT(DISTINCT url)``), mit
+Quelle, Stadt und Titel ihrer ersten Zeile im Monat. Welche URLs ein Monat
+schon enthält, steht in ``job_stats_urls``; erneut gescrapte Jobs legen nur
+eine weitere Zeile in der Historie an und zählen nicht noch einmal.
+
+Komplett neu aufbauen (z.B. nach einer Migration):
+
+    python -m src.stats rebuild
+"""
+
+import argparse
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from .dedupe import normalize_location, normalize_title
+from .engine import timed_query
+from .partitions import month_start, query_window_start
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+# Erlaubte Dimensionen für /api/stats und die zugehörige Spalte
+STATS_DIMENSIONS = {
+    "source": "source",
+    "city": "city",
+    "title": "title_norm",
+}
+
+STATS_DEFAULT_LIMIT = 20
+STATS_MAX_LIMIT = 500
+
+# Monat (UTC) einer Jobs-Zeile in SQL, passend zu month_start()
+STATS_MONTH_SQL = "(date_trunc('month', scraped_at AT TIME ZONE 'UTC'))::date"
+
+
+def ensure_stats_table(cur):
+    """
+    Legt die Tabellen für die vorberechneten Zähler an
+
+    Gibt True zurück, wenn job_stats_urls neu angelegt wurde - die Zähler
+    müssen dann einmal neu aufgebaut werden (rebuild_job_stats).
+    """
+    cur.execute("SELECT to_regclass('job_stats_urls')")
+    created = cur.fetchone()[0] is None
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS job_stats (
+            month DATE NOT NULL,
+            source VARCHAR(200) NOT NULL,
+            city VARCHAR(200) NOT NULL,
+            title_norm VARCHAR(200) NOT NULL,
+            job_count BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, source, city, title_norm)
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS job_stats_urls (
+            month DATE NOT NULL,
+            url VARCHAR(200) NOT NULL,
+            PRIMARY KEY (month, url)
+        )
+    """)
+    logger.info("Statistik-Tabelle überprüft")
+    return created
+
+
+def stats_key(job, month):
+    """Zählschlüssel (Monat, Quelle, Stadt, normalisierter Titel) für einen Job"""
+    return (
+        month,
+        (job.get("source") or "unbekannt")[:200],
+        (normalize_location(job.get("location")) or "unbekannt")[:200],
+        (normalize_title(job.get("title")) or "unbekannt")[:200],
+    )
+
+
+def record_job_stats(cur, jobs, scraped_at=None):
+    """
+    Zählt neu gespeicherte Jobs in job_stats hoch (in der Transaktion des Aufrufers)
+
+    Nur URLs, die im Monat noch nicht gezählt wurden; kommt eine URL im Batch
+    mehrfach vor, zählt die erste Zeile.
+    """
+    month = month_start(scraped_at or datetime.now(timezone.utc)).date()
+    first = {}
+    for job in jobs:
+        if isinstance(job, dict) and job.get("url"):
+            first.setdefault(job["url"], job)
+    if not first:
+        return 0
+
+    # Feste Reihenfolge wie in record_stats_counts; parallele Schreiber warten auf den Konflikt
+    cur.execute(
+        """
+        INSERT INTO job_stats_urls (month, url)
+        SELECT %s, url FROM unnest(%s::varchar[]) AS url ORDER BY url
+        ON CONFLICT (month, url) DO NOTHING
+        RETURNING url
+        """,
+        (month, sorted(first))
+    )
+    counts = Counter(stats_key(first[row[0]], month) for row in cur.fetchall())
+    return record_stats_counts(cur, counts)
+
+
+def record_stats_counts(cur, counts):
+    """
+    Addiert fertige Zähler {(Monat, Quelle, Stadt, Titel): Anzahl} zu job_stats
+    """
+    if not counts:
+        return 0
+
+    # Feste Reihenfolge, damit parallele Schreiber sich nicht gegenseitig blockieren
+    for key in sorted(counts):
+        cur.execute(
+            """
+            INSERT INTO job_stats (month, source, city, title_norm, job_count)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (month, source, city, title_norm)
+            DO UPDATE SET job_count = job_stats.job_count + EXCLUDED.job_count
+            """,
+            (*key, counts[key])
+        )
+    return len(counts)
+
+
+def drop_expired_stats(cur, cutoff):
+    """Entfernt Zähler von Monaten, deren Partitionen gelöscht wurden"""
+    cur.execute("DELETE FROM job_stats WHERE month < %s", (cutoff.date(),))
+    cur.execute("DELETE FROM job_stats_urls WHERE month < %s", (cutoff.date(),))
+
+
+def refill_stats_urls(cur):
+    """Füllt job_stats_urls neu aus der Jobs-Tabelle (nach Neuaufbau oder Wiederherstellung)"""
+    cur.execute("DELETE FROM job_stats_urls")
+    cur.execute(f"INSERT INTO job_stats_urls (month, url) SELECT DISTINCT {STATS_MONTH_SQL}, url FROM jobs")
+
+
+def get_job_stats(by="source", source="", days=None, limit=STATS_DEFAULT_LIMIT):
+    """
+    Liefert die Job-Anzahl gruppiert nach Quelle, Stadt oder Titel
+
+    Gelesen wird ausschließlich die Zähler-Tabelle, nicht die Jobs selbst
+    (vom Replikat, falls eines konfiguriert ist).
+    """
+    from .database import get_database
+
+    if by not in STATS_DIMENSIONS:
+        raise ValueError(f"Unbekannte Dimension '{by}', erlaubt: {', '.join(STATS_DIMENSIONS)}")
+
+    column = STATS_DIMENSIONS[by]
+    limit = max(1, min(int(limit), STATS_MAX_LIMIT))
+
+    conn = get_database(readonly=True)
+    if not conn:
+        logger.error("Keine Datenbankverbindung vorhanden, Statistik kann nicht abgerufen werden")
+        return []
+
+    counts = []
+    try:
+        with conn.cursor() as cur:
+            sql = f"SELECT {column}, SUM(job_count) FROM job_stats WHERE 1=1"
+            params = []
+
+            since = query_window_start(days)
+            if since is not None:
+                sql += " AND month >= %s"
+                params.append(month_start(since).date())
+
+            if source:
+                sql += " AND source = %s"
+                params.append(source)
+
+            sql += f" GROUP BY {column} ORDER BY 2 DESC, 1 LIMIT %s"
+            params.append(limit)
+
+            with timed_query("job_stats"):
+                cur.execute(sql, params)
+            counts = [{"key": row[0], "count": int(row[1])} for row in cur.fetchall()]
+    except Exception as e:
+        logger.error(f"Fehler beim Abrufen der Statistik: {e}")
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    return counts
+
+
+def rebuild_job_stats():
+    """
+    Baut job_stats und job_stats_urls komplett aus der Jobs-Tabelle neu auf
+
+    Pro Monat und URL zählt die erste Zeile, wie bei record_job_stats. Die
+    Zeilen werden über einen serverseitigen Cursor gelesen, der Speicherbedarf
+    hängt nur von der Anzahl der Zähler ab.
+    """
+    from .database import get_database
+
+    start_time = time.time()
+    conn = get_database()
+    if not conn:
+        logger.error("Keine Datenbankverbindung vorhanden, Statistik kann nicht neu aufgebaut werden")
+        return False
+
+    try:
+        counts = Counter()
+        with conn.cursor(name="rebuild_job_stats") as stream:
+            stream.itersize = 10000
+            stream.execute(f"""
+                SELECT DISTINCT ON (month, url) month, title, location, source
+                FROM (SELECT {STATS_MONTH_SQL} AS month, url, title, location, source, scraped_at, id FROM jobs) j
+                ORDER BY month, url, scraped_at, id
+            """)
+            for month, title, location, job_source in stream:
+                counts[stats_key({"title": title, "location": location, "source": job_source}, month)] += 1
+
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM job_stats")
+            for key in sorted(counts):
+                cur.execute(
+                    "INSERT INTO job_stats (month, source, city, title_norm, job_count) VALUES (%s, %s, %s, %s, %s)",
+                    (*key, counts[key])
+                )
+            refill_stats_urls(cur)
+            conn.commit()
+        logger.info(f"Statistik mit {len(counts)} Zählern in {time.time() - start_time:.2f}s neu aufgebaut")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Neuaufbau der Statistik: {e}")
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        return False
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vorberechnete Job-Statistiken verwalten")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild", help="job_stats aus der Jobs-Tabelle neu aufbauen")
+    show = subparsers.add_parser("show", help="Zähler nach einer Dimension anzeigen")
+    show.add_argument("--by", choices=sorted(STATS_DIMENSIONS), default="source")
+    show.add_argument("--limit", type=int, default=STATS_DEFAULT_LIMIT)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == "rebuild":
+        return 0 if rebuild_job_stats() else 1
+
+    for entry in get_job_stats(by=args.by, days=0, limit=args.limit):
+        print(f"{entry['count']}\t{entry['key']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
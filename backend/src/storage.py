@@ -0,0 +1,158 @@
+"""Austauschbares Speicher-Backend für Jobs.
+
+Die App spricht nur noch über ``get_storage()`` mit der Datenbank. Es gibt
+zwei Implementierungen mit derselben Schnittstelle:
+
+- ``postgres``: die Funktionen aus database.py/stats.py (Partitionen,
+  Volltextsuche, Replikat, Pool)
+- ``sqlite``: eingebettete Datenbank (WAL, FTS5) für Single-Node-Betrieb,
+  CI und Benchmarks - siehe sqlite_storage.py; ``memory`` ist dieselbe
+  Implementierung ohne Datei
+
+Auswahl über ``JOBS_STORAGE``. Ohne Angabe wird Postgres verwendet, wenn der
+Treiber installiert ist, sonst SQLite - statt Daten stillschweigend zu verwerfen.
+"""
+
+import importlib.util
+import logging
+import os
+import threading
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+STORAGE_BACKENDS = ["postgres", "sqlite", "memory"]
+
+# Datei der eingebetteten Datenbank (JOBS_STORAGE=sqlite)
+SQLITE_PATH = os.environ.get("JOBS_SQLITE_PATH", "jobbig.sqlite3")
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+class JobStorage:
+    """
+    Schnittstelle eines Speicher-Backends
+
+    Alle Methoden fangen Datenbankfehler selbst ab und liefern leere
+    Ergebnisse; nur ungültige Parameter (Cursor, Dimension) werfen ValueError.
+    """
+
+    name = None
+
+    def bootstrap(self):
+        """Legt das Schema an und entfernt abgelaufene Daten; True bei Erfolg"""
+        raise NotImplementedError
+
+    def verify(self):
+        """Prüft, ob das Backend erreichbar ist"""
+        raise NotImplementedError
+
+    def save_jobs(self, jobs):
+        """Speichert gescrapte Jobs (inkl. Duplikat-Cluster und Statistik), gibt die Anzahl zurück"""
+        raise NotImplementedError
+
+    def query_jobs(self, title="", city="", source="", query="", page_size=None, cursor=None, days=None):
+        """
+        Eine Seite von Jobs: {"jobs", "nextCursor", "estimatedTotal", "pageSize"}
+
+        Ohne query gefiltert und nach ID absteigend, mit query per Volltextsuche
+        (Präfixsuche, websearch-Syntax) nach Relevanz sortiert.
+        """
+        raise NotImplementedError
+
+    def stream_jobs(self, title="", city="", source="", days=None):
+        """
+        Alle passenden Jobs als Generator mit konstantem Speicher
+
+        Datenbankfehler werden auch mitten im Stream geworfen, nicht verschluckt.
+        """
+        raise NotImplementedError
+
+    def job_stats(self, by="source", source="", days=None, limit=None):
+        """Vorberechnete Job-Anzahl nach Quelle, Stadt oder Titel"""
+        raise NotImplementedError
+
+    def info(self):
+        """Kurzbeschreibung des Backends für /diagnostics"""
+        return {"backend": self.name}
+
+
+class PostgresStorage(JobStorage):
+    """Postgres-Backend: delegiert an database.py und stats.py"""
+
+    name = "postgres"
+
+    def bootstrap(self):
+        from .database import create_tables_if_not_exist
+        from .partitions import drop_expired_partitions
+        from .snapshot import restore_on_start
+
+        if not create_tables_if_not_exist():
+            return False
+        # Warmstart: JOBS_SNAPSHOT_PATH einspielen, solange die Jobs-Tabelle leer ist
+        restore_on_start()
+        # Aufbewahrung: abgelaufene Monatspartitionen entfernen (DROP statt DELETE)
+        drop_expired_partitions()
+        return True
+
+    def verify(self):
+        from .database import verify_database_connection
+        return verify_database_connection()
+
+    def save_jobs(self, jobs):
+        from .database import save_new_jobs
+        return save_new_jobs(jobs)
+
+    def query_jobs(self, title="", city="", source="", query="", page_size=None, cursor=None, days=None):
+        from .database import DEFAULT_PAGE_SIZE, get_jobs_page
+        return get_jobs_page(title, city, source, query,
+                             page_size=page_size or DEFAULT_PAGE_SIZE, cursor=cursor, days=days)
+
+    def stream_jobs(self, title="", city="", source="", days=None):
+        from .database import stream_jobs_by_criteria
+        return stream_jobs_by_criteria(title, city, source, days=days)
+
+    def job_stats(self, by="source", source="", days=None, limit=None):
+        from .stats import STATS_DEFAULT_LIMIT, get_job_stats
+        return get_job_stats(by, source, days, limit or STATS_DEFAULT_LIMIT)
+
+    def info(self):
+        from .engine import get_query_stats, pool_status
+        return {"backend": self.name, "pool": pool_status(), "queries": get_query_stats()}
+
+
+def postgres_driver_available():
+    """True, wenn psycopg2 und SQLAlchemy installiert sind"""
+    return bool(importlib.util.find_spec("psycopg2") and importlib.util.find_spec("sqlalchemy"))
+
+
+def create_storage(backend=None):
+    """Erstellt das Backend backend (Standard: JOBS_STORAGE bzw. automatisch)"""
+    backend = (backend or os.environ.get("JOBS_STORAGE", "")).lower()
+    if not backend:
+        if postgres_driver_available():
+            backend = "postgres"
+        else:
+            backend = "sqlite"
+            logger.warning(f"psycopg2 nicht installiert, verwende eingebettete SQLite-Datenbank {SQLITE_PATH}")
+
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unbekanntes Speicher-Backend '{backend}', erlaubt: {', '.join(STORAGE_BACKENDS)}")
+
+    if backend == "postgres":
+        return PostgresStorage()
+
+    from .sqlite_storage import SqliteStorage
+    return SqliteStorage(":memory:" if backend == "memory" else SQLITE_PATH)
+
+
+def get_storage():
+    """Gibt das Speicher-Backend des Prozesses zurück (wird beim ersten Aufruf erstellt)"""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage()
+                logger.info(f"Speicher-Backend: {_storage.name}")
+    return _storage
@@ -0,0 +1,57 @@
+"""Generatoren für gestreamte Antworten (NDJSON und CSV)."""
+
+import csv
+import io
+import json
+import logging
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+# Spalten, in der Reihenfolge, in der Jobs exportiert werden
+JOB_COLUMNS = ["id", "title", "company", "location", "url", "source", "scraped_at"]
+
+# Zeilen, die vor dem Senden zu einem Block zusammengefasst werden
+CHUNK_ROWS = 500
+
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def ndjson_chunks(rows, chunk_rows=CHUNK_ROWS):
+    """Formatiert Zeilen als NDJSON (ein JSON-Objekt pro Zeile) in Blöcken"""
+    buffer = []
+    for row in rows:
+        buffer.append(json.dumps(row, ensure_ascii=False, default=str))
+        if len(buffer) >= chunk_rows:
+            yield "\n".join(buffer) + "\n"
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+def csv_chunks(rows, columns=JOB_COLUMNS, chunk_rows=CHUNK_ROWS):
+    """Formatiert Zeilen als CSV mit Kopfzeile in Blöcken"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 1
+    for row in rows:
+        writer.writerow([row.get(column, "") for column in columns])
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+
+def format_chunks(rows, fmt):
+    """Wählt den passenden Formatierer für das gewünschte Format"""
+    if fmt == "csv":
+        return csv_chunks(rows)
+    return ndjson_chunks(rows)
@@ -0,0 +1,296 @@
+"""Leichtgewichtiges Tracing mit Spans pro Verarbeitungsstufe.
+
+Jede HTTP-Anfrage öffnet einen Trace (Trace-ID aus einem eingehenden
+W3C-``traceparent``-Header oder neu erzeugt). Innerhalb davon messen
+``span()``/``@traced`` einzelne Stufen - Browserstart, Seitenladen, jede
+alternative URL, Parsen, Datenbankzugriffe. Außerhalb eines Traces kosten
+sie nur einen ContextVar-Zugriff.
+
+Am Ende der Anfrage wird
+
+- die Aufschlüsselung je Stufe als ``Server-Timing``-Header gesetzt
+  (sichtbar in den Browser-Devtools unter "Timing")
+- der Span-Baum im Zipkin-v2-JSON-Format exportiert, wenn ``TRACE_EXPORT``
+  gesetzt ist: ein Dateipfad (eine Zeile pro Trace) oder die URL eines
+  Collectors (z.B. ``http://zipkin:9411/api/v2/spans``; Jaeger und der
+  OpenTelemetry-Collector nehmen das Format ebenfalls an). Exportiert wird
+  in einem Hintergrund-Thread, ``TRACE_SAMPLE_RATE`` begrenzt den Anteil.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "1") != "0"
+
+# Ziel für den Export: Dateipfad oder http(s)-URL eines Collectors (leer = kein Export)
+TRACE_EXPORT = os.environ.get("TRACE_EXPORT", "")
+
+# Anteil der exportierten Traces (Server-Timing gibt es immer)
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "1.0"))
+
+SERVICE_NAME = os.environ.get("TRACE_SERVICE_NAME", "jobbig-backend")
+
+# Obergrenze je Trace, damit Schleifen mit Spans den Speicher nicht füllen
+MAX_SPANS_PER_TRACE = 500
+
+# Wartende Traces im Export; ist die Queue voll, werden Traces verworfen
+EXPORT_QUEUE_SIZE = 1000
+
+TRACEPARENT_PATTERN = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current_span = contextvars.ContextVar("jobbig_current_span", default=None)
+
+
+class Trace:
+    """Alle Spans einer Anfrage bzw. eines Hintergrund-Vorgangs"""
+
+    def __init__(self, trace_id=None, remote_parent_id=None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.remote_parent_id = remote_parent_id
+        self.spans = []
+        self.dropped = 0
+        self.sampled = random.random() < TRACE_SAMPLE_RATE
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attrs", "start_wall", "start", "duration")
+
+    def __init__(self, trace, name, parent_id, attrs):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs
+        self.start_wall = time.time()
+        self.start = time.perf_counter()
+        self.duration = None
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.start
+        if len(self.trace.spans) < MAX_SPANS_PER_TRACE:
+            self.trace.spans.append(self)
+        else:
+            self.trace.dropped += 1
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_zipkin(self):
+        span = {
+            "traceId": self.trace.trace_id,
+            "id": self.span_id,
+            "name": self.name,
+            "timestamp": int(self.start_wall * 1_000_000),
+            "duration": max(1, int((self.duration or 0) * 1_000_000)),
+            "localEndpoint": {"serviceName": SERVICE_NAME},
+        }
+        if self.parent_id:
+            span["parentId"] = self.parent_id
+        if self.attrs:
+            span["tags"] = {key: str(value) for key, value in self.attrs.items()}
+        return span
+
+
+@contextmanager
+def span(name, **attrs):
+    """Misst den Block als Span unterhalb des aktuellen; ohne aktiven Trace ein No-op"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    current = Span(parent.trace, name, parent.span_id, attrs)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        current.finish()
+        _current_span.reset(token)
+
+
+def traced(name):
+    """Decorator: die Funktion als Span name messen"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_span(name, duration, **attrs):
+    """Hängt eine bereits gemessene Dauer (Sekunden) als Kind-Span an den aktuellen"""
+    parent = _current_span.get()
+    if parent is None:
+        return
+    current = Span(parent.trace, name, parent.span_id, attrs)
+    current.start_wall -= duration
+    current.start -= duration
+    current.finish()
+
+
+def annotate(**attrs):
+    """Ergänzt Attribute am aktuellen Span; ohne aktiven Trace ein No-op"""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attrs)
+
+
+def start_trace(name, traceparent=None, **attrs):
+    """
+    Öffnet einen Trace mit Wurzel-Span name und gibt ein Token für finish_trace zurück
+
+    traceparent: optionaler W3C-Header eines Aufrufers, dessen Trace fortgesetzt wird.
+    """
+    if not TRACING_ENABLED:
+        return None
+    trace_id = remote_parent = None
+    match = TRACEPARENT_PATTERN.match((traceparent or "").strip().lower())
+    if match and match.group(1) != "0" * 32:
+        trace_id, remote_parent = match.groups()
+    root = Span(Trace(trace_id, remote_parent), name, remote_parent, attrs)
+    return root, _current_span.set(root)
+
+
+def finish_trace(handle):
+    """Schließt den Trace aus start_trace, stößt den Export an und gibt den Wurzel-Span zurück"""
+    if handle is None:
+        return None
+    root, token = handle
+    root.finish()
+    try:
+        _current_span.reset(token)
+    except ValueError:
+        # Token aus einem anderen Kontext (z.B. Streaming-Antwort) - nur zurücksetzen
+        _current_span.set(None)
+    if TRACE_EXPORT and root.trace.sampled:
+        get_exporter().submit(root.trace)
+    return root
+
+
+@contextmanager
+def trace(name, **attrs):
+    """Eigener Trace für Hintergrund-Vorgänge (z.B. Ingest-Batches)"""
+    if _current_span.get() is not None:
+        with span(name, **attrs) as current:
+            yield current
+        return
+    handle = start_trace(name, **attrs)
+    try:
+        yield handle[0] if handle else None
+    finally:
+        finish_trace(handle)
+
+
+def current_trace_id():
+    """Trace-ID des aktiven Traces oder None"""
+    current = _current_span.get()
+    return current.trace.trace_id if current else None
+
+
+def current_span_id():
+    current = _current_span.get()
+    return current.span_id if current else None
+
+
+def server_timing(root):
+    """
+    Server-Timing-Header: Dauer je Stufe (Summe gleichnamiger Spans) plus total
+
+    Beispiel: chrome_startup;dur=812.4, page_load;dur=4321.0;desc="x4", total;dur=6012.7
+    """
+    totals = {}
+    for current in root.trace.spans:
+        if current is root or current.duration is None:
+            continue
+        total, count = totals.get(current.name, (0.0, 0))
+        totals[current.name] = (total + current.duration, count + 1)
+
+    entries = []
+    for name, (total, count) in totals.items():
+        entry = f"{name};dur={total * 1000:.1f}"
+        if count > 1:
+            entry += f';desc="x{count}"'
+        entries.append(entry)
+    entries.append(f"total;dur={(root.duration or 0) * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class TraceExporter:
+    """Schreibt abgeschlossene Traces im Hintergrund in eine Datei oder an einen Collector"""
+
+    def __init__(self, target=TRACE_EXPORT):
+        self.target = target
+        self.queue = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+        self.dropped = 0
+        self.exported = 0
+        self.thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self.thread.start()
+
+    def submit(self, finished):
+        try:
+            self.queue.put_nowait(finished)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            # Was sich inzwischen angesammelt hat, in einem Schreibvorgang mitnehmen
+            while len(batch) < 100:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+                self.exported += len(batch)
+            except Exception as e:
+                self.dropped += len(batch)
+                logger.warning(f"Trace-Export nach {self.target} fehlgeschlagen: {type(e).__name__}: {e}")
+
+    def _write(self, batch):
+        if self.target.startswith(("http://", "https://")):
+            import urllib3
+
+            spans = [current.to_zipkin() for finished in batch for current in finished.spans]
+            response = urllib3.PoolManager().request(
+                "POST", self.target, body=json.dumps(spans).encode("utf-8"),
+                headers={"Content-Type": "application/json"}, timeout=5.0, retries=False
+            )
+            if response.status >= 300:
+                raise RuntimeError(f"HTTP {response.status}")
+        else:
+            with open(self.target, "a", encoding="utf-8") as target:
+                for finished in batch:
+                    target.write(json.dumps([current.to_zipkin() for current in finished.spans]) + "\n")
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter():
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = TraceExporter()
+    return _exporter
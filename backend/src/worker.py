@@ -0,0 +1,186 @@
+"""Crawl-Worker: arbeitet Aufträge aus ``crawl_tasks`` ab.
+
+Jeder Worker-Prozess läuft unabhängig vom Web-Prozess und kann auf jedem
+Knoten gestartet werden, der die Datenbank erreicht. Der Durchsatz skaliert
+über die Anzahl der Prozesse bzw. ``--concurrency`` (ein Chrome je Thread).
+
+Gefundene Jobs werden synchron gespeichert (nicht über die Write-behind-Queue
+des Web-Prozesses) und landen im Ergebnis-Cache der Routen. Erledigt ist ein
+Auftrag erst, wenn die Jobs in der Datenbank stehen. Liefert ein Scraper nur
+Beispieldaten oder wird nichts gespeichert, zählt das als Fehlschlag und der
+Auftrag wird mit Backoff wiederholt.
+
+    python -m src.worker --concurrency 2
+    python -m src.worker enqueue --source stepstone --title Elektriker --city Berlin
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+
+from .crawl_tasks import (
+    STALE_AFTER, claim_task, complete_task, enqueue_tasks, fail_task, heartbeat,
+    requeue_stale_tasks,
+)
+from .logging_config import configure_logging
+from .browser_supervisor import start_supervisor
+
+# Logging konfigurieren
+logger = logging.getLogger(__name__)
+
+# Wartezeit in Sekunden, wenn kein Auftrag fällig ist
+POLL_INTERVAL = float(os.environ.get("CRAWL_WORKER_POLL_INTERVAL", "5"))
+
+# Abstand der Heartbeats für laufende Aufträge
+HEARTBEAT_INTERVAL = float(os.environ.get("CRAWL_WORKER_HEARTBEAT", "15"))
+
+# Wie oft verwaiste Aufträge anderer Worker freigegeben werden
+REAPER_INTERVAL = 60
+
+
+class CrawlWorker:
+    """Holt Aufträge, führt den passenden Scraper aus und speichert die Ergebnisse"""
+
+    def __init__(self, concurrency=1, worker_name=None):
+        self.concurrency = max(1, concurrency)
+        self.worker_name = worker_name or f"{socket.gethostname()}:{os.getpid()}"
+        self.stop_event = threading.Event()
+        self.active = {}
+        self._lock = threading.Lock()
+        self.stats = {"done": 0, "retried": 0, "failed": 0, "jobs": 0}
+
+    def run_task(self, task, worker_id):
+        """Führt einen Auftrag aus; gibt True bei Erfolg zurück"""
+        from . import result_cache
+        from .scraping import SCRAPERS, is_fallback_result
+        from .storage import get_storage
+
+        start = time.perf_counter()
+        try:
+            jobs = SCRAPERS[task["source"]](task["title"], task["city"], max_jobs=task["max_jobs"])
+            if is_fallback_result(jobs):
+                error = next((job["error_info"] for job in jobs or [] if "error_info" in job), None)
+                raise RuntimeError(error or "Keine echten Treffer (nur Beispieldaten)")
+            saved = get_storage().save_jobs(jobs)
+            if not saved:
+                raise RuntimeError(f"Keiner der {len(jobs)} Jobs wurde gespeichert")
+            result_cache.store(task["source"], task["title"], task["city"], jobs)
+        except Exception as e:
+            status = fail_task(task, worker_id, f"{type(e).__name__}: {e}")
+            self._count("retried" if status == "pending" else "failed")
+            logger.warning(
+                f"Auftrag {task['id']} ({task['source']}: {task['title']} / {task['city']}) "
+                f"fehlgeschlagen, Versuch {task['attempts']}/{task['max_attempts']} -> {status}: {e}"
+            )
+            return False
+
+        complete_task(task["id"], worker_id, saved)
+        self._count("done")
+        self._count("jobs", saved)
+        logger.info(
+            f"Auftrag {task['id']} ({task['source']}: {task['title']} / {task['city']}) erledigt: "
+            f"{saved} von {len(jobs)} Jobs gespeichert in {time.perf_counter() - start:.1f}s"
+        )
+        return True
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _loop(self, index):
+        worker_id = f"{self.worker_name}:{index}"
+        while not self.stop_event.is_set():
+            task = claim_task(worker_id)
+            if task is None:
+                self.stop_event.wait(POLL_INTERVAL)
+                continue
+            with self._lock:
+                self.active[task["id"]] = worker_id
+            try:
+                self.run_task(task, worker_id)
+            finally:
+                with self._lock:
+                    self.active.pop(task["id"], None)
+
+    def _heartbeats(self):
+        last_reap = 0.0
+        while not self.stop_event.wait(HEARTBEAT_INTERVAL):
+            with self._lock:
+                by_worker = {}
+                for task_id, worker_id in self.active.items():
+                    by_worker.setdefault(worker_id, []).append(task_id)
+            for worker_id, task_ids in by_worker.items():
+                heartbeat(task_ids, worker_id)
+            if time.monotonic() - last_reap >= REAPER_INTERVAL:
+                requeue_stale_tasks(STALE_AFTER)
+                last_reap = time.monotonic()
+
+    def stop(self, *_):
+        """Beendet die Schleifen nach dem laufenden Auftrag"""
+        if not self.stop_event.is_set():
+            logger.info("Worker wird beendet, laufende Aufträge werden noch abgeschlossen")
+        self.stop_event.set()
+
+    def run(self):
+        """Startet die Worker-Threads und blockiert bis zum Stopp"""
+        requeue_stale_tasks(STALE_AFTER)
+        threads = [threading.Thread(target=self._heartbeats, name="crawl-heartbeat", daemon=True)]
+        threads += [
+            threading.Thread(target=self._loop, args=(index,), name=f"crawl-worker-{index}")
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        logger.info(f"Crawl-Worker {self.worker_name} gestartet ({self.concurrency} parallel)")
+        for thread in threads[1:]:
+            thread.join()
+        logger.info(
+            f"Crawl-Worker beendet: {self.stats['done']} erledigt, {self.stats['retried']} wiederholt, "
+            f"{self.stats['failed']} fehlgeschlagen, {self.stats['jobs']} Jobs"
+        )
+        return self.stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl-Aufträge aus der Datenbank abarbeiten")
+    parser.add_argument("--concurrency", type=int, default=int(os.environ.get("CRAWL_WORKER_CONCURRENCY", "1")),
+                        help="Parallele Aufträge (ein Browser je Auftrag)")
+    commands = parser.add_subparsers(dest="command")
+    enqueue = commands.add_parser("enqueue", help="Auftrag anlegen")
+    enqueue.add_argument("--source", required=True)
+    enqueue.add_argument("--title", required=True)
+    enqueue.add_argument("--city", required=True)
+    enqueue.add_argument("--max-jobs", type=int, default=3)
+    enqueue.add_argument("--priority", type=int, default=0)
+
+    args = parser.parse_args(argv)
+    configure_logging(logging.INFO)
+
+    from .database import create_tables_if_not_exist
+
+    if not create_tables_if_not_exist():
+        logger.error("Schema konnte nicht erstellt werden")
+        return 1
+
+    if args.command == "enqueue":
+        try:
+            enqueue_tasks([(args.source, args.title, args.city)], max_jobs=args.max_jobs, priority=args.priority)
+        except ValueError as e:
+            logger.error(str(e))
+            return 2
+        return 0
+
+    start_supervisor()
+    worker = CrawlWorker(concurrency=args.concurrency)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,22 @@
+import pytest
+
+from src.sqlite_storage import SqliteStorage
+
+
+def make_job(number, title="Elektriker", location="Berlin", source="stepstone", **fields):
+    job = {
+        "title": title,
+        "company": f"Firma {number}",
+        "location": location,
+        "url": f"https://example.org/job/{number}",
+        "source": source,
+    }
+    job.update(fields)
+    return job
+
+
+@pytest.fixture
+def storage():
+    storage = SqliteStorage(":memory:")
+    assert storage.bootstrap()
+    return storage
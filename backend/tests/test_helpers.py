@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+from src import crawl
+from src.crawl import HostRateLimiter
+from src.crawl_tasks import BACKOFF_BASE, BACKOFF_MAX, backoff_seconds
+from src.database import decode_cursor, encode_cursor
+from src.dedupe import dedupe_jobs
+from src.precrawl import plan_round
+
+from .conftest import make_job
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("id", [42]), "id") == 42
+    assert decode_cursor(encode_cursor("rank", [0.25, 7]), "rank") == (0.25, 7)
+    assert "=" not in encode_cursor("id", [1])
+
+
+@pytest.mark.parametrize("token, mode", [
+    ("%%%", "id"),
+    (encode_cursor("rank", [0.5, 1]), "id"),
+    (encode_cursor("id", [1, 2]), "id"),
+    (encode_cursor("rank", [0.5]), "rank"),
+])
+def test_decode_cursor_rejects_invalid_tokens(token, mode):
+    with pytest.raises(ValueError):
+        decode_cursor(token, mode)
+
+
+def test_dedupe_jobs_merges_near_duplicates():
+    jobs = [
+        make_job(1, title="Elektriker (m/w/d)", company="Bayer AG", location="Köln"),
+        make_job(2, title="Elektriker m/w/d", company="Bayer", location="Köln", source="monster"),
+        make_job(3, title="Koch", company="Hotel Adler", location="Bonn"),
+    ]
+
+    result = dedupe_jobs(jobs + ["kein Dict"])
+
+    assert [job["url"] for job in result] == [jobs[0]["url"], jobs[2]["url"]]
+    assert result[0]["duplicates"] == [{"source": "monster", "url": jobs[1]["url"]}]
+    assert "duplicates" not in result[1]
+
+
+def test_dedupe_jobs_keeps_stored_cluster_ids():
+    jobs = [make_job(1, cluster_id="a"), make_job(2, cluster_id="a"), make_job(3, cluster_id="b")]
+
+    assert [job["url"][-1] for job in dedupe_jobs(jobs)] == ["1", "3"]
+
+
+def test_plan_round_spreads_queries_over_interval():
+    queries = [("stepstone", f"Titel {n}", "Berlin") for n in range(4)] + [("monster", "Koch", "Bonn")]
+
+    planned = plan_round(queries, 60, jitter=0)
+
+    assert [item[3] for item in planned] == sorted(item[3] for item in planned)
+    assert [item[3] for item in planned if item[0] == "stepstone"] == [7.5, 22.5, 37.5, 52.5]
+    assert [item[3] for item in planned if item[0] == "monster"] == [0.0]
+    assert plan_round([], 60) == []
+
+
+def test_plan_round_jitter_stays_within_interval():
+    queries = [("stepstone", f"Titel {n}", "Berlin") for n in range(20)]
+
+    planned = plan_round(queries, 30, jitter=0.9, rng=random.Random(1))
+
+    assert len(planned) == 20
+    assert all(0.0 <= item[3] <= 30 for item in planned)
+
+
+def test_backoff_seconds_doubles_up_to_maximum():
+    assert backoff_seconds(0) == BACKOFF_BASE
+    assert backoff_seconds(1) == BACKOFF_BASE
+    assert backoff_seconds(3) == BACKOFF_BASE * 4
+    assert backoff_seconds(100) == BACKOFF_MAX
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_host_rate_limiter_spaces_requests_per_host(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(crawl, "time", clock)
+    limiter = HostRateLimiter(5, overrides={"slow.example": 10})
+
+    assert limiter.wait("a.example") == 0.0
+    assert limiter.wait("a.example") == 5.0
+    assert limiter.wait("b.example") == 0.0
+    assert limiter.wait("slow.example") == 0.0
+    assert limiter.wait("slow.example") == 10.0
+    assert clock.sleeps == [5.0, 10.0]
+
+    clock.now += 60
+    assert limiter.wait("a.example") == 0.0
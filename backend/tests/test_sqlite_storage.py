@@ -0,0 +1,163 @@
+import threading
+
+import pytest
+
+from src import sqlite_storage
+from src.sqlite_storage import fts_query
+
+from .conftest import make_job
+
+
+def test_save_jobs_counts_valid_rows(storage):
+    jobs = [make_job(1), make_job(2), make_job(3, url="https://example.org/" + "x" * 200), "kein Dict"]
+
+    assert storage.save_jobs(jobs) == 2
+    assert storage.save_jobs([]) == 0
+
+    page = storage.query_jobs()
+    assert page["estimatedTotal"] == 2
+    assert {job["url"] for job in page["jobs"]} == {jobs[0]["url"], jobs[1]["url"]}
+    assert all(job["cluster_id"] for job in page["jobs"])
+
+
+def test_save_jobs_truncates_long_fields(storage):
+    storage.save_jobs([make_job(1, title="x" * 300)])
+
+    job = storage.query_jobs()["jobs"][0]
+    assert len(job["title"]) == 200
+
+
+def test_query_filters(storage):
+    storage.save_jobs([
+        make_job(1, title="Elektriker", location="München"),
+        make_job(2, title="Koch", location="Berlin"),
+        make_job(3, title="Elektrikerin", location="Berlin", source="monster"),
+    ])
+
+    assert [job["url"][-1] for job in storage.query_jobs(title="ELEKTRIKER")["jobs"]] == ["3", "1"]
+    assert [job["url"][-1] for job in storage.query_jobs(city="münchen")["jobs"]] == ["1"]
+    assert [job["url"][-1] for job in storage.query_jobs(source="monster")["jobs"]] == ["3"]
+    assert storage.query_jobs(title="Koch", city="München")["jobs"] == []
+
+
+def test_query_returns_latest_row_per_url(storage):
+    storage.save_jobs([make_job(1, title="Alt")])
+    storage.save_jobs([make_job(1, title="Neu")])
+
+    page = storage.query_jobs()
+    assert page["estimatedTotal"] == 1
+    assert page["jobs"][0]["title"] == "Neu"
+    assert [job["title"] for job in storage.stream_jobs()] == ["Neu"]
+
+
+def test_keyset_cursor_walks_all_pages(storage):
+    storage.save_jobs([make_job(number) for number in range(5)])
+
+    seen, cursor = [], None
+    while True:
+        page = storage.query_jobs(page_size=2, cursor=cursor)
+        assert len(page["jobs"]) <= 2
+        seen.extend(job["id"] for job in page["jobs"])
+        cursor = page["nextCursor"]
+        if cursor is None:
+            break
+
+    assert seen == sorted(seen, reverse=True)
+    assert len(seen) == len(set(seen)) == 5
+
+
+def test_invalid_cursor_raises_value_error(storage):
+    with pytest.raises(ValueError):
+        storage.query_jobs(cursor="kaputt")
+
+    # Cursor aus der Volltextsuche passt nicht zur ID-Pagination
+    storage.save_jobs([make_job(number) for number in range(3)])
+    cursor = storage.query_jobs(query="elektriker", page_size=1)["nextCursor"]
+    with pytest.raises(ValueError):
+        storage.query_jobs(cursor=cursor)
+
+
+def test_fulltext_search_with_prefix_and_cursor(storage):
+    storage.save_jobs([
+        make_job(1, title="Elektrikerin"),
+        make_job(2, title="Koch"),
+        make_job(3, title="Elektriker"),
+    ])
+
+    first = storage.query_jobs(query="elektriker", page_size=1)
+    assert first["estimatedTotal"] == 2
+    second = storage.query_jobs(query="elektriker", page_size=1, cursor=first["nextCursor"])
+    assert second["nextCursor"] is None
+    assert {first["jobs"][0]["url"][-1], second["jobs"][0]["url"][-1]} == {"1", "3"}
+
+
+def test_stream_jobs_in_id_order(storage, monkeypatch):
+    monkeypatch.setattr(sqlite_storage, "STREAM_BATCH_SIZE", 2)
+    storage.save_jobs([make_job(number) for number in range(5)] + [make_job(5, source="monster")])
+
+    ids = [job["id"] for job in storage.stream_jobs()]
+    assert ids == sorted(ids)
+    assert len(ids) == 6
+    assert [job["url"][-1] for job in storage.stream_jobs(source="monster")] == ["5"]
+
+
+def test_stream_does_not_block_writers(storage, monkeypatch):
+    monkeypatch.setattr(sqlite_storage, "STREAM_BATCH_SIZE", 2)
+    storage.save_jobs([make_job(number) for number in range(3)])
+
+    stream = storage.stream_jobs()
+    next(stream)
+    writer = threading.Thread(target=storage.save_jobs, args=([make_job(9)],))
+    writer.start()
+    writer.join(timeout=5)
+
+    assert not writer.is_alive()
+    assert len(list(stream)) == 3
+
+
+def test_job_stats_count_each_url_once(storage):
+    storage.save_jobs([make_job(1), make_job(2, source="monster"), make_job(1)])
+    storage.save_jobs([make_job(1)])
+
+    assert storage.job_stats(by="source") == [
+        {"key": "monster", "count": 1},
+        {"key": "stepstone", "count": 1},
+    ]
+    with pytest.raises(ValueError):
+        storage.job_stats(by="firma")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("elektriker", '"elektriker"*'),
+    ("elektriker berlin", '"elektriker"* AND "berlin"*'),
+    ('"junior koch"', '"junior koch"*'),
+    ("koch or bäcker", '("koch"* OR "bäcker"*)'),
+    ("koch -sous", '("koch"*) NOT "sous"*'),
+    ("c++/c#", '("c"* AND "c"*)'),
+    ("-koch", None),
+    ("", None),
+    (None, None),
+])
+def test_fts_query(text, expected):
+    assert fts_query(text) == expected
+
+
+def test_save_jobs_skips_failing_row(storage):
+    with storage._connection() as conn:
+        conn.execute("""
+            CREATE TRIGGER reject_job BEFORE INSERT ON jobs WHEN NEW.url LIKE '%/job/2'
+            BEGIN SELECT RAISE(ABORT, 'abgelehnt'); END
+        """)
+
+    assert storage.save_jobs([make_job(1), make_job(2), make_job(3)]) == 2
+    assert {job["url"][-1] for job in storage.stream_jobs()} == {"1", "3"}
+    assert storage.job_stats() == [{"key": "stepstone", "count": 2}]
+
+
+def test_estimated_total_is_capped(storage, monkeypatch):
+    monkeypatch.setattr(sqlite_storage, "SQLITE_COUNT_LIMIT", 3)
+    storage.save_jobs([make_job(number) for number in range(5)])
+
+    assert storage.query_jobs(page_size=2)["estimatedTotal"] == 3
+    assert storage.query_jobs(query="elektriker", page_size=2)["estimatedTotal"] == 3
+    assert storage.query_jobs(title="nichts")["estimatedTotal"] == 0
@@ -0,0 +1,24 @@
+from unittest import mock
+
+from src import startup
+
+
+def test_schema_bootstrap_retries_until_ok(monkeypatch):
+    monkeypatch.setattr(startup, "SCHEMA_RETRY_BASE", 0.01)
+    monkeypatch.setattr(startup, "_schema_state", {"status": "pending", "duration_seconds": None,
+                                                   "error": None, "attempts": 0})
+    storage = mock.Mock()
+    storage.bootstrap.side_effect = [False, RuntimeError("Datenbank nicht erreichbar"), True]
+
+    with mock.patch("src.storage.get_storage", return_value=storage):
+        thread = startup.start_schema_bootstrap()
+        thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert startup.get_startup_info()["schema"]["status"] == "ok"
+    assert startup.get_startup_info()["schema"]["attempts"] == 3
+
+
+def test_retry_delay_is_capped():
+    assert startup.retry_delay(1) == startup.SCHEMA_RETRY_BASE
+    assert startup.retry_delay(100) == startup.SCHEMA_RETRY_MAX
@@ -12,6 +12,8 @@ export class JobSearchFormComponent implements OnInit {
   sources = [
     { name: 'Monster', value: 'monster' },
     { name: 'Stepstone', value: 'stepstone' },
+    // Beide Quellen, Duplikate zusammengefasst (/api/search)
+    { name: 'Alle Quellen', value: 'search' },
   ];
 
   jobSearch = new FormGroup({